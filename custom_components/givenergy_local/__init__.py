@@ -1,14 +1,42 @@
 """The GivEnergy integration."""
 from __future__ import annotations
 
+from datetime import timedelta
+from pathlib import Path
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
-
-from .const import CONF_HOST, CONF_NUM_BATTERIES, DOMAIN, LOGGER
+from homeassistant.helpers import device_registry as dr
+from homeassistant.util import slugify
+
+from .access import async_get_access_scheduler
+from .connection import InverterConnection
+from .const import (
+    CONF_FAST_POWER_INTERVAL,
+    CONF_HOST,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_NUM_BATTERIES,
+    CONF_PERSISTENT_CONNECTION,
+    CONF_RECORD_REGISTERS,
+    DEFAULT_FAST_POWER_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_PERSISTENT_CONNECTION,
+    DEFAULT_RECORD_REGISTERS,
+    DOMAIN,
+    LOGGER,
+)
 from .coordinator import GivEnergyUpdateCoordinator
+from .energy import FlowEnergy
+from .entity import inverter_device_info
+from .fast_power import FastPowerPoller
+from .recorder import RegisterRecorder
 from .services import async_setup_services, async_unload_services
+from .snapshot_store import SnapshotStore
+from .static_registers import StaticRegisterCache
 
 _PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
@@ -22,14 +50,75 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up GivEnergy from a config entry."""
     host = entry.data.get(CONF_HOST)
     num_batteries = entry.data.get(CONF_NUM_BATTERIES)
+    persistent = entry.options.get(
+        CONF_PERSISTENT_CONNECTION, DEFAULT_PERSISTENT_CONNECTION
+    )
 
-    coordinator = GivEnergyUpdateCoordinator(hass, host, num_batteries)
-    await coordinator.async_refresh()
+    min_update_interval = timedelta(
+        seconds=entry.options.get(
+            CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL.seconds
+        )
+    )
+    max_update_interval = timedelta(
+        seconds=entry.options.get(
+            CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL.seconds
+        )
+    )
 
-    if not coordinator.last_update_success:
-        raise ConfigEntryNotReady
+    recorder = None
+    if entry.options.get(CONF_RECORD_REGISTERS, DEFAULT_RECORD_REGISTERS):
+        recorder = RegisterRecorder(
+            Path(hass.config.path(DOMAIN, "registers", slugify(host)))
+        )
+
+    flow_energy = FlowEnergy(hass, _storage_key(entry, "flow_energy"))
+    await flow_energy.async_load()
+    static_registers = StaticRegisterCache(hass, host)
+    await static_registers.async_load()
+    if (device_values := static_registers.device_values()) is not None:
+        # The inverter is described as it was last read, so that its device is there
+        # even while the inverter can't be reached
+        dr.async_get(hass).async_get_or_create(
+            config_entry_id=entry.entry_id, **inverter_device_info(device_values)
+        )
+
+    access = async_get_access_scheduler(hass)
+    connection = InverterConnection(host, persistent, access)
+    coordinator = GivEnergyUpdateCoordinator(
+        hass,
+        connection,
+        num_batteries,
+        min_update_interval,
+        max_update_interval,
+        recorder,
+        flow_energy,
+        SnapshotStore(hass, _storage_key(entry, "snapshot")),
+        static_registers,
+    )
+    if await coordinator.async_restore():
+        # Entities are set up from the restored data straight away, rather than
+        # waiting on the inverter, which then catches up in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} refresh of {host}"
+        )
+    else:
+        await coordinator.async_refresh()
+        if not coordinator.last_update_success:
+            await connection.async_close()
+            raise ConfigEntryNotReady
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(access.async_register_poller(host))
+    entry.async_on_unload(flow_energy.async_start())
+    entry.async_on_unload(coordinator.async_start_saving())
+    fast_power_interval = entry.options.get(
+        CONF_FAST_POWER_INTERVAL, DEFAULT_FAST_POWER_INTERVAL
+    )
+    if fast_power_interval:
+        poller = FastPowerPoller(
+            hass, coordinator, timedelta(seconds=fast_power_interval)
+        )
+        entry.async_on_unload(poller.async_start())
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
 
     async_setup_services(hass)
@@ -44,12 +133,24 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry, _PLATFORMS
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: GivEnergyUpdateCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.connection.async_close()
         async_unload_services(hass)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete data saved for a config entry that has been removed."""
+    await FlowEnergy(hass, _storage_key(entry, "flow_energy")).async_remove()
+    await SnapshotStore(hass, _storage_key(entry, "snapshot")).async_remove()
+    await StaticRegisterCache(hass, entry.data[CONF_HOST]).async_remove()
+
+
+def _storage_key(entry: ConfigEntry, name: str) -> str:
+    return f"{DOMAIN}.{name}.{entry.entry_id}"
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await async_unload_entry(hass, entry)
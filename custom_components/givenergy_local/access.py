@@ -0,0 +1,141 @@
+"""Integration-wide scheduling of access to inverters."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+import math
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+
+from .const import DOMAIN
+
+_DATA_ACCESS_SCHEDULER = f"{DOMAIN}_access_scheduler"
+
+# Modbus sessions allowed at once, across all inverters and with any single inverter
+_MAX_SESSIONS = 4
+_MAX_SESSIONS_PER_HOST = 1
+
+# Time spent talking to an inverter (in seconds) counts against its share of I/O for a
+# while, halving in weight over this period.
+_USAGE_HALF_LIFE = 60.0
+
+
+class InverterAccessScheduler:
+    """
+    Shares network access fairly between all configured inverters.
+
+    Modbus sessions are limited in number, both overall and for each host. When more
+    sessions are wanted than allowed, the next goes to whichever inverter has had the
+    least I/O time recently, so that a slow or overrunning inverter can't starve
+    the others. Polls of registered inverters are also spread evenly across their
+    interval, rather than all landing at the same moment.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = _MAX_SESSIONS,
+        max_sessions_per_host: int = _MAX_SESSIONS_PER_HOST,
+    ) -> None:
+        """Initialize the scheduler with no inverters."""
+        self.max_sessions = max_sessions
+        self.max_sessions_per_host = max_sessions_per_host
+        self._active: Counter[str] = Counter()
+        self._waiters: list[tuple[str, asyncio.Future[None]]] = []
+        self._usage: dict[str, tuple[float, float]] = {}
+        self._pollers: list[str] = []
+
+    def async_register_poller(self, host: str) -> CALLBACK_TYPE:
+        """Give an inverter its own share of each poll interval, until unregistered."""
+        self._pollers.append(host)
+
+        def _async_unregister() -> None:
+            self._pollers.remove(host)
+
+        return _async_unregister
+
+    def stagger(self, host: str, interval: timedelta, now: float) -> timedelta:
+        """
+        Adjust a poll interval so that polls of each inverter fall in turn.
+
+        Each registered inverter is polled at its own offset within the interval. The
+        first poll may move by up to half an interval to reach it; after that, polls
+        of an inverter at a constant interval aren't moved at all.
+        """
+        if host not in self._pollers:
+            return interval
+        period = interval.total_seconds()
+        offset = period * self._pollers.index(host) / len(self._pollers)
+        target = offset + round((now + period - offset) / period) * period
+        return timedelta(seconds=target - now)
+
+    @asynccontextmanager
+    async def session(self, host: str) -> AsyncIterator[None]:
+        """Wait for a turn to talk to an inverter, holding it until done."""
+        await self._async_acquire(host)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(host, time.monotonic() - started)
+
+    def usage(self, host: str, now: float | None = None) -> float:
+        """Return the recent I/O time of an inverter, weighted towards the present."""
+        if host not in self._usage:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        usage, updated_at = self._usage[host]
+        return usage * math.pow(0.5, (now - updated_at) / _USAGE_HALF_LIFE)
+
+    def _can_start(self, host: str) -> bool:
+        return (
+            sum(self._active.values()) < self.max_sessions
+            and self._active[host] < self.max_sessions_per_host
+        )
+
+    async def _async_acquire(self, host: str) -> None:
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append((host, waiter))
+        self._wake_waiters(time.monotonic())
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(host, 0.0)
+            else:
+                self._waiters.remove((host, waiter))
+            raise
+
+    def _release(self, host: str, duration: float) -> None:
+        now = time.monotonic()
+        self._usage[host] = (self.usage(host, now) + duration, now)
+        self._active[host] -= 1
+        self._wake_waiters(now)
+
+    def _wake_waiters(self, now: float) -> None:
+        """Start sessions for waiters, least recently served inverters first."""
+        while True:
+            eligible = [
+                (host, waiter)
+                for host, waiter in self._waiters
+                if self._can_start(host)
+            ]
+            if not eligible:
+                return
+            # min() keeps the earliest of equals, so waiters are otherwise served in order
+            host, waiter = min(eligible, key=lambda item: self.usage(item[0], now))
+            self._waiters.remove((host, waiter))
+            self._active[host] += 1
+            waiter.set_result(None)
+
+
+def async_get_access_scheduler(hass: HomeAssistant) -> InverterAccessScheduler:
+    """Return the scheduler shared by all inverters."""
+    scheduler: InverterAccessScheduler = hass.data.setdefault(
+        _DATA_ACCESS_SCHEDULER, InverterAccessScheduler()
+    )
+    return scheduler
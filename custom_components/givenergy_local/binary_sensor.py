@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime, time, timedelta
+from operator import itemgetter
 
 from typing import Any, Mapping
 
@@ -73,9 +74,10 @@ class InverterChargeSlotBinarySensor(InverterEntity, BinarySensorEntity):
         """Initialize a sensor based on an entity description."""
         super().__init__(coordinator, config_entry)
         self._attr_unique_id = (
-            f"{self.data.inverter_serial_number}_{entity_description.key}"
+            f"{self.data['inverter_serial_number']}_{entity_description.key}"
         )
         self.entity_description = entity_description
+        self._get_slot = itemgetter(entity_description.key)
 
     async def async_added_to_hass(self) -> None:
         """Entity has been added to HA."""
@@ -148,7 +150,7 @@ class InverterChargeSlotBinarySensor(InverterEntity, BinarySensorEntity):
     @property
     def slot(self) -> tuple[time, time]:
         """Get the slot definition."""
-        return self.data.dict().get(self.entity_description.key)  # type: ignore
+        return self._get_slot(self.data)  # type: ignore[no-any-return]
 
     @property
     def is_on(self) -> bool | None:
@@ -0,0 +1,28 @@
+"""The time that readings from an inverter are taken at."""
+from __future__ import annotations
+
+from datetime import datetime
+import time
+
+from homeassistant.util import dt
+
+
+class Clock:
+    """
+    Tells the time for timing readings, e.g. to work out rates and integrate power.
+
+    This is the real time, unless readings are replayed from a recording, when they
+    are timed as they were recorded instead.
+    """
+
+    def monotonic(self) -> float:
+        """Return the time in seconds from some point, which never goes backwards."""
+        return time.monotonic()
+
+    def utcnow(self) -> datetime:
+        """Return the current date and time, in UTC."""
+        now: datetime = dt.utcnow()
+        return now
+
+
+SYSTEM_CLOCK = Clock()
@@ -1,38 +1,115 @@
 """Config flow for GivEnergy integration."""
 from __future__ import annotations
 
+from collections.abc import Mapping
+from ipaddress import IPv4Network
+
 from typing import Any
 
 import async_timeout
-from givenergy_modbus.client import GivEnergyClient, Plant
+from givenergy_modbus.model.register import HoldingRegister
+from givenergy_modbus.model.register_cache import RegisterCache
+from givenergy_modbus.model.register_getter import RegisterGetter
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.exceptions import HomeAssistantError
 import voluptuous as vol
 
-from .const import CONF_HOST, CONF_NUM_BATTERIES, DOMAIN, LOGGER
+from .connection import InverterConnection
+from .const import (
+    CONF_FAST_POWER_INTERVAL,
+    CONF_HOST,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_NETWORK,
+    CONF_NUM_BATTERIES,
+    CONF_PERSISTENT_CONNECTION,
+    CONF_RECORD_REGISTERS,
+    DEFAULT_FAST_POWER_INTERVAL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_PERSISTENT_CONNECTION,
+    DEFAULT_RECORD_REGISTERS,
+    DOMAIN,
+    LOGGER,
+)
+from .discovery import DiscoveredInverter, async_discover, async_identify
+from .static_registers import CACHED_REGISTERS, StaticRegisterCache
 
+# Without a host, the network is searched. Without a number of batteries, the
+# batteries attached to the inverter are counted.
 STEP_USER_DATA_SCHEMA = vol.Schema(
-    {vol.Required(CONF_HOST): str, vol.Required(CONF_NUM_BATTERIES): int}
+    {vol.Optional(CONF_HOST): str, vol.Optional(CONF_NUM_BATTERIES): int}
+)
+STEP_DISCOVER_DATA_SCHEMA = vol.Schema({vol.Required(CONF_NETWORK): str})
+
+# Networks larger than this would take too long to search
+_MAX_DISCOVERY_ADDRESSES = 1024
+
+# Bounds (in seconds) for the user-configurable range of update intervals
+_UPDATE_INTERVAL_RANGE = vol.All(vol.Coerce(int), vol.Range(min=5, max=600))
+
+# Fast power polling is either off (0) or every few seconds
+_FAST_POWER_INTERVAL_RANGE = vol.All(
+    vol.Coerce(int), vol.Any(0, vol.Range(min=2, max=30))
 )
 
 
 async def read_inverter_serial(hass: HomeAssistant, data: dict[str, Any]) -> str:
-    """Validate user input by reading the inverter serial number."""
-    plant = Plant(number_batteries=data[CONF_NUM_BATTERIES])
-    client = GivEnergyClient(data[CONF_HOST])
+    """
+    Validate user input by reading the inverter serial number.
+
+    Only the static registers describing the inverter are read (in a single request),
+    and they are cached for when the inverter is set up.
+    """
+    connection = InverterConnection(data[CONF_HOST], persistent=False)
     async with async_timeout.timeout(10):
-        await hass.async_add_executor_job(client.refresh_plant, plant, True)
+        registers = await connection.async_read_holding_registers(
+            HoldingRegister(index) for index in CACHED_REGISTERS
+        )
 
-    serial_no: str = plant.inverter.inverter_serial_number
+    await _async_cache_static_registers(hass, data[CONF_HOST], registers)
+    serial_no: str = RegisterGetter(RegisterCache(registers)).get(
+        "inverter_serial_number"
+    )
     return serial_no
 
 
+async def _async_cache_static_registers(
+    hass: HomeAssistant, host: str, registers: Mapping[HoldingRegister, int]
+) -> None:
+    static_registers = StaticRegisterCache(hass, host)
+    static_registers.async_update(registers)
+    await static_registers.async_save()
+
+
+async def _async_default_network(hass: HomeAssistant) -> str | None:
+    """Suggest the /24 network that Home Assistant itself is on."""
+    try:
+        source_ip = await network.async_get_source_ip(hass)
+    except HomeAssistantError:
+        return None
+    return str(IPv4Network(f"{source_ip}/24", strict=False))
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
     """Handle a config flow for GivEnergy."""
 
     VERSION = 2
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._discovered: dict[str, DiscoveredInverter] = {}
+
+    @staticmethod
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -41,15 +118,22 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore[call
             return self.async_show_form(
                 step_id="user", data_schema=STEP_USER_DATA_SCHEMA
             )
+        if not user_input.get(CONF_HOST):
+            return await self.async_step_discover()
 
         errors = {}
 
         try:
-            serial_no = await read_inverter_serial(self.hass, user_input)
+            if CONF_NUM_BATTERIES in user_input:
+                serial_no = await read_inverter_serial(self.hass, user_input)
+            else:
+                inverter = await async_identify(user_input[CONF_HOST])
         except Exception:  # pylint: disable=broad-except
             LOGGER.exception("Failed to validate inverter configuration")
             errors["base"] = "cannot_connect"
         else:
+            if CONF_NUM_BATTERIES not in user_input:
+                return await self._async_create_discovered_entry(inverter)
             return self.async_create_entry(
                 title=f"Solar Inverter (S/N {serial_no})", data=user_input
             )
@@ -61,3 +145,137 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type: ignore[call
             ),
             errors=errors,
         )
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Search a network for inverters."""
+        errors = {}
+        if user_input is not None:
+            try:
+                network_to_search = IPv4Network(user_input[CONF_NETWORK], strict=False)
+            except ValueError:
+                errors["base"] = "invalid_network"
+            else:
+                if network_to_search.num_addresses > _MAX_DISCOVERY_ADDRESSES:
+                    errors["base"] = "invalid_network"
+                else:
+                    configured = {
+                        entry.data[CONF_HOST] for entry in self._async_current_entries()
+                    }
+                    self._discovered = {
+                        inverter.host: inverter
+                        for inverter in await async_discover(network_to_search)
+                        if inverter.host not in configured
+                    }
+                    if self._discovered:
+                        return await self.async_step_pick()
+                    errors["base"] = "no_inverters_found"
+        else:
+            user_input = {}
+            if default_network := await _async_default_network(self.hass):
+                user_input[CONF_NETWORK] = default_network
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=self.add_suggested_values_to_schema(
+                STEP_DISCOVER_DATA_SCHEMA, user_input
+            ),
+            errors=errors,
+        )
+
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose which of the inverters found to set up."""
+        if user_input is not None:
+            return await self._async_create_discovered_entry(
+                self._discovered[user_input[CONF_HOST]]
+            )
+
+        inverters = {
+            host: (
+                f"{inverter.serial_number} at {host} "
+                f"({inverter.num_batteries} batteries)"
+            )
+            for host, inverter in self._discovered.items()
+        }
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(inverters)}),
+        )
+
+    async def _async_create_discovered_entry(
+        self, inverter: DiscoveredInverter
+    ) -> FlowResult:
+        await _async_cache_static_registers(
+            self.hass, inverter.host, inverter.registers
+        )
+        return self.async_create_entry(
+            title=f"Solar Inverter (S/N {inverter.serial_number})",
+            data={CONF_HOST: inverter.host, CONF_NUM_BATTERIES: inverter.num_batteries},
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle options for an existing GivEnergy config entry."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if (
+                user_input[CONF_MIN_UPDATE_INTERVAL]
+                > user_input[CONF_MAX_UPDATE_INTERVAL]
+            ):
+                errors["base"] = "invalid_update_interval"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_PERSISTENT_CONNECTION,
+                        default=options.get(
+                            CONF_PERSISTENT_CONNECTION, DEFAULT_PERSISTENT_CONNECTION
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_MIN_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_MIN_UPDATE_INTERVAL,
+                            DEFAULT_MIN_UPDATE_INTERVAL.seconds,
+                        ),
+                    ): _UPDATE_INTERVAL_RANGE,
+                    vol.Required(
+                        CONF_MAX_UPDATE_INTERVAL,
+                        default=options.get(
+                            CONF_MAX_UPDATE_INTERVAL,
+                            DEFAULT_MAX_UPDATE_INTERVAL.seconds,
+                        ),
+                    ): _UPDATE_INTERVAL_RANGE,
+                    vol.Required(
+                        CONF_RECORD_REGISTERS,
+                        default=options.get(
+                            CONF_RECORD_REGISTERS, DEFAULT_RECORD_REGISTERS
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_FAST_POWER_INTERVAL,
+                        default=options.get(
+                            CONF_FAST_POWER_INTERVAL, DEFAULT_FAST_POWER_INTERVAL
+                        ),
+                    ): _FAST_POWER_INTERVAL_RANGE,
+                }
+            ),
+            errors=errors,
+        )
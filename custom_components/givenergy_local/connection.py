@@ -0,0 +1,316 @@
+"""Long-lived Modbus connection management."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from contextlib import AsyncExitStack, asynccontextmanager
+import time
+
+from typing import TYPE_CHECKING, Callable
+
+import async_timeout
+from givenergy_modbus.client import DEFAULT_SLEEP, GivEnergyClient
+from givenergy_modbus.model.plant import Plant
+from givenergy_modbus.model.register import HoldingRegister
+from givenergy_modbus.model.register_cache import RegisterCache
+
+from .const import LOGGER
+from .register_map import (
+    BLOCK_SIZE,
+    INVERTER_SLAVE_ADDRESS,
+    ReadPlan,
+    RegisterBlock,
+    blocks_for_registers,
+    full_read_plan,
+    without_holding_registers,
+)
+from .retry import CircuitBreaker
+from .transport import DEFAULT_PORT, ModbusTransport, RequestTimeout
+
+if TYPE_CHECKING:
+    from .access import InverterAccessScheduler
+    from .metrics import RefreshMetrics
+
+# Probes of an unreachable inverter are abandoned after this many seconds.
+_PROBE_TIMEOUT = 10.0
+
+# Slaves that may not be there, such as empty battery slots, are given this many
+# seconds to answer, rather than the usual request timeout.
+_ABSENT_SLAVE_TIMEOUT = 1.0
+
+# Connections that have sat unused for longer than this are not trusted, since the
+# data adapter in the inverter may have dropped them without notice.
+_MAX_IDLE_SECONDS = 120.0
+
+
+class _WriteRecorder:
+    """Stands in for the Modbus client of a GivEnergyClient, capturing register writes."""
+
+    def __init__(self) -> None:
+        """Initialize an empty list of writes."""
+        self.writes: list[tuple[HoldingRegister, int]] = []
+
+    def write_holding_register(self, register: HoldingRegister, value: int) -> None:
+        """Record a write to a single holding register."""
+        if not register.write_safe:
+            raise ValueError(f"Register {register.name} is not safe to write to")
+        if value != value & 0xFFFF:
+            raise ValueError(f"Value {value} must fit in 2 bytes")
+        self.writes.append((register, value))
+
+
+def record_writes(
+    func: Callable[[GivEnergyClient], None]
+) -> list[tuple[HoldingRegister, int]]:
+    """
+    Work out which registers a function would write to on a GivEnergy client.
+
+    This allows the high-level client methods (e.g. `enable_charge_target`) to be used
+    without a blocking connection. No I/O is performed.
+    """
+    recorder = _WriteRecorder()
+    func(GivEnergyClient("recorder", modbus_client=recorder))
+    return recorder.writes
+
+
+class InverterConnection:
+    """
+    A Modbus connection to an inverter, shared by polls, writes and services.
+
+    Requests are serialized, since the inverter only handles a single conversation at
+    a time. In persistent mode, a single connection is kept open between requests and
+    health-checked before each use. Otherwise a fresh connection is made for every
+    request and closed afterwards, which has historically been the more reliable
+    option for some data adapter firmware.
+
+    All I/O happens on the event loop, so timeouts genuinely cancel in-flight requests.
+    Repeated failures open a circuit breaker, after which requests fail immediately
+    until a background probe finds the inverter reachable again. If given an access
+    scheduler, each session also waits for its turn alongside other inverters.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        persistent: bool = True,
+        access: InverterAccessScheduler | None = None,
+        port: int = DEFAULT_PORT,
+        transport: ModbusTransport | None = None,
+    ) -> None:
+        """
+        Initialize the connection manager. No connection is made until first use.
+
+        A transport can be given in place of a Modbus connection to the host, e.g. to
+        replay recorded register data.
+        """
+        self.host = host
+        self.persistent = persistent
+        self.access = access
+        self.sleep_between_queries = DEFAULT_SLEEP
+        self._lock = asyncio.Lock()
+        self._transport = transport or ModbusTransport(host, port)
+        self.clock = self._transport.clock
+        self._last_used = 0.0
+        self.breaker = CircuitBreaker(f"Inverter at {host}", self._async_probe)
+
+    async def async_refresh_plant(self, plant: Plant, full_refresh: bool) -> None:
+        """Read every register block from the inverter and batteries into a plant."""
+        plan = full_read_plan(len(plant.batteries_rcs))
+        if not full_refresh:
+            plan = without_holding_registers(plan)
+        await self.async_read_plan(plant, plan)
+
+    async def async_read_plan(
+        self,
+        plant: Plant,
+        plan: ReadPlan,
+        metrics: RefreshMetrics | None = None,
+        on_read: Callable[[RegisterBlock, int | None, dict[int, int]], None]
+        | None = None,
+    ) -> None:
+        """
+        Read the register blocks in a plan into a plant's register caches.
+
+        If given, `metrics` records the connect time, the time taken to read each
+        block, and the total read time (not counting pauses between requests).
+        `on_read` is called with each block, battery index and the raw values read.
+        """
+        reads: list[tuple[RegisterCache, RegisterBlock, int | None]] = [
+            (plant.inverter_rc, block, None) for block in plan.inverter
+        ]
+        for i, blocks in enumerate(plan.batteries):
+            reads.extend((plant.batteries_rcs[i], block, i) for block in blocks)
+
+        reading = 0.0
+        async with self._session(metrics) as transport:
+            for register_cache, block, battery_id in reads:
+                started = time.perf_counter()
+                values = await transport.read_registers(
+                    block.register_type,
+                    block.base_register,
+                    BLOCK_SIZE,
+                    INVERTER_SLAVE_ADDRESS + (battery_id or 0),
+                )
+                elapsed = time.perf_counter() - started
+                reading += elapsed
+                if metrics is not None:
+                    metrics.record_block(block, elapsed, battery_id)
+                if on_read is not None:
+                    on_read(block, battery_id, values)
+                register_cache.set_registers(block.register_type, values)
+                await asyncio.sleep(self.sleep_between_queries)
+
+        if metrics is not None:
+            metrics.phases["read"].record(reading * 1000)
+
+    async def async_read_block(
+        self,
+        block: RegisterBlock,
+        battery_id: int | None = None,
+        metrics: RefreshMetrics | None = None,
+    ) -> dict[int, int]:
+        """Read a single register block, returning values keyed by register index."""
+        async with self._session(metrics) as transport:
+            started = time.perf_counter()
+            values = await transport.read_registers(
+                block.register_type,
+                block.base_register,
+                BLOCK_SIZE,
+                INVERTER_SLAVE_ADDRESS + (battery_id or 0),
+            )
+        if metrics is not None:
+            metrics.record_block(block, time.perf_counter() - started, battery_id)
+        return values
+
+    async def async_probe_block(
+        self,
+        block: RegisterBlock,
+        battery_id: int,
+        metrics: RefreshMetrics | None = None,
+    ) -> dict[int, int] | None:
+        """
+        Read a block from a battery slot that may be empty, or None if not answered.
+
+        Empty slots may not be answered at all, so the request is abandoned after a
+        short timeout. This isn't taken as a failure of the connection, which is kept
+        open, unless a response was cut off partway through.
+        """
+        async with self._session(metrics) as transport:
+            started = time.perf_counter()
+            try:
+                values = await transport.read_registers(
+                    block.register_type,
+                    block.base_register,
+                    BLOCK_SIZE,
+                    INVERTER_SLAVE_ADDRESS + battery_id,
+                    _ABSENT_SLAVE_TIMEOUT,
+                )
+            except RequestTimeout:
+                if not transport.connected:
+                    raise
+                LOGGER.debug("No answer from battery slot %d", battery_id)
+                return None
+        if metrics is not None:
+            metrics.record_block(block, time.perf_counter() - started, battery_id)
+        return values
+
+    async def async_read_holding_registers(
+        self, registers: Iterable[HoldingRegister]
+    ) -> dict[HoldingRegister, int]:
+        """Read specific holding registers, with a request for each block holding any."""
+        wanted = {register.value for register in registers}
+        values: dict[HoldingRegister, int] = {}
+        async with self._session() as transport:
+            for i, block in enumerate(blocks_for_registers(HoldingRegister, wanted)):
+                if i:
+                    await asyncio.sleep(self.sleep_between_queries)
+                read = await transport.read_registers(
+                    HoldingRegister, block.base_register, BLOCK_SIZE
+                )
+                values.update(
+                    (HoldingRegister(index), value)
+                    for index, value in read.items()
+                    if index in wanted
+                )
+        return values
+
+    async def async_call(self, func: Callable[[GivEnergyClient], None]) -> None:
+        """Perform the register writes made by a function on a GivEnergy client."""
+        await self.async_write_registers(record_writes(func))
+
+    async def async_write_registers(
+        self,
+        writes: Iterable[tuple[HoldingRegister, int]],
+        on_written: Callable[[HoldingRegister, int], None] | None = None,
+    ) -> None:
+        """
+        Write values to holding registers in a single session.
+
+        If given, `on_written` is called as each write is accepted, so that a partially
+        successful series of writes can be resumed.
+        """
+        async with self._session() as transport:
+            for register, value in writes:
+                await transport.write_register(register, value)
+                if on_written is not None:
+                    on_written(register, value)
+
+    async def async_close(self) -> None:
+        """Close any open connection, and stop probing an unreachable inverter."""
+        self.breaker.cancel()
+        async with self._lock:
+            self._transport.close()
+
+    async def _async_probe(self) -> None:
+        """Check whether the inverter responds, by reading a single register."""
+        async with self._exclusive():
+            try:
+                async with async_timeout.timeout(_PROBE_TIMEOUT):
+                    await self._transport.connect()
+                    await self._transport.read_registers(HoldingRegister, 0, 1)
+            except BaseException:
+                self._transport.close()
+                raise
+            self._last_used = time.monotonic()
+            if not self.persistent:
+                self._transport.close()
+
+    @asynccontextmanager
+    async def _session(
+        self, metrics: RefreshMetrics | None = None
+    ) -> AsyncIterator[ModbusTransport]:
+        """Hold exclusive use of a healthy connection for a series of requests."""
+        async with self._exclusive():
+            self.breaker.check()
+            try:
+                idle = time.monotonic() - self._last_used
+                if self._transport.connected and idle > _MAX_IDLE_SECONDS:
+                    LOGGER.debug("Discarding idle connection to %s", self.host)
+                    self._transport.close()
+                if not self._transport.connected:
+                    if metrics is None:
+                        await self._transport.connect()
+                    else:
+                        with metrics.time("connect"):
+                            await self._transport.connect()
+
+                yield self._transport
+            except BaseException:
+                self._transport.close()
+                self.breaker.record_failure()
+                raise
+            else:
+                self.breaker.record_success()
+            finally:
+                self._last_used = time.monotonic()
+                if not self.persistent:
+                    self._transport.close()
+
+    @asynccontextmanager
+    async def _exclusive(self) -> AsyncIterator[None]:
+        """Wait for a turn to use the connection, if necessary alongside others."""
+        async with AsyncExitStack() as stack:
+            if self.access is not None:
+                await stack.enter_async_context(self.access.session(self.host))
+            await stack.enter_async_context(self._lock)
+            yield
@@ -1,5 +1,6 @@
 """Constants for the GivEnergy integration."""
 
+from datetime import timedelta
 from enum import Enum
 from logging import Logger, getLogger
 
@@ -8,6 +9,19 @@ LOGGER: Logger = getLogger(__package__)
 
 CONF_HOST = "host"
 CONF_NUM_BATTERIES = "num_batteries"
+CONF_PERSISTENT_CONNECTION = "persistent_connection"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_RECORD_REGISTERS = "record_registers"
+CONF_FAST_POWER_INTERVAL = "fast_power_interval"
+CONF_NETWORK = "network"
+
+DEFAULT_PERSISTENT_CONNECTION = True
+DEFAULT_MIN_UPDATE_INTERVAL = timedelta(seconds=10)
+DEFAULT_MAX_UPDATE_INTERVAL = timedelta(seconds=60)
+DEFAULT_RECORD_REGISTERS = False
+# Fast power polling is off unless an interval (in seconds) is set
+DEFAULT_FAST_POWER_INTERVAL = 0
 
 MANUFACTURER = "GivEnergy"
 
@@ -30,3 +44,7 @@ class Icon(str, Enum):
     GRID_EXPORT = "mdi:transmission-tower-import"
     EPS = "mdi:transmission-tower-off"
     TEMPERATURE = "mdi:thermometer"
+    UPDATE_INTERVAL = "mdi:timer-sync-outline"
+    REFRESH_TIME = "mdi:timer-outline"
+    REFRESH_SUCCESS = "mdi:check-network-outline"
+    DISCARDED_FRAMES = "mdi:delete-alert-outline"
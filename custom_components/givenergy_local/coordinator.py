@@ -1,95 +1,653 @@
 """The GivEnergy update coordinator."""
 from __future__ import annotations
 
+import asyncio
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Mapping
 from datetime import datetime, timedelta
+from itertools import chain
 from logging import getLogger
+from types import MappingProxyType
+
+from typing import Any, NamedTuple
 
 import async_timeout
-from givenergy_modbus.client import GivEnergyClient
 from givenergy_modbus.model.plant import Plant
-from homeassistant.core import HomeAssistant
+from givenergy_modbus.model.register import HoldingRegister
+from givenergy_modbus.model.register_cache import RegisterCache
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt
+
+from .connection import InverterConnection
+from .const import DEFAULT_MAX_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+from .discovery import MAX_BATTERIES, decode_serial_number
+from .energy import FlowEnergy
+from .metrics import RefreshMetrics
+from .plausibility import PlausibilityEngine
+from .recorder import RegisterRecorder
+from .register_map import (
+    BATTERY_BLOCKS,
+    BATTERY_KEY_BLOCKS,
+    BLOCK_SIZE,
+    INVERTER_BLOCKS,
+    INVERTER_KEY_BLOCKS,
+    STATIC_BLOCK,
+    ReadPlan,
+    blocks_for_keys,
+    full_read_plan,
+    without_holding_registers,
+)
+from .scheduler import POWER_KEYS, SLOT_KEYS, PollScheduler
+from .snapshot import PlantSnapshot
+from .snapshot_store import SnapshotStore
+from .static_registers import StaticRegisterCache
+from .transport import TransportError
+from .write_queue import WriteQueue
 
 _LOGGER = getLogger(__name__)
 _FULL_REFRESH_INTERVAL = timedelta(minutes=5)
 
+# Sent with the inverter host when batteries are attached, removed or replaced
+SIGNAL_BATTERIES_CHANGED = "givenergy_local_batteries_changed_{}"
+
+# Battery slots are probed for attached and removed batteries this often (in seconds)
+_BATTERY_PROBE_INTERVAL = 1800.0
+
+# Holding register values read more recently than this (in seconds) are trusted to
+# be current, e.g. so that writes of the same value can be skipped.
+_MAX_HOLDING_REGISTER_AGE = _FULL_REFRESH_INTERVAL.total_seconds()
+
+# The registers behind the current data are saved this often if they have changed,
+# and when Home Assistant stops
+_SNAPSHOT_SAVE_INTERVAL = timedelta(minutes=5)
+
+# Entities are only updated when values they read change, except that every entity is
+# updated at least this often (in seconds) so that staleness remains visible.
+_FORCED_UPDATE_INTERVAL = 600.0
+
+# Inverter values that are always read, whichever entities are enabled: those needed
+# by the plausibility checks, those identifying the inverter device, and those used to
+# schedule polls.
+_REQUIRED_INVERTER_KEYS = (
+    "temp_inverter_heatsink",
+    "temp_charger",
+    "e_inverter_out_total",
+    "inverter_serial_number",
+    "inverter_model",
+    "firmware_version",
+    *POWER_KEYS,
+    *SLOT_KEYS,
+    *set(SLOT_KEYS.values()),
+)
+
 
 class GivEnergyException(Exception):
     """An error encountered when fetching data from the inverter."""
 
 
-class GivEnergyUpdateCoordinator(DataUpdateCoordinator[Plant]):
+class ListenerContext(NamedTuple):
+    """Describes the decoded values read by an entity listening for updates."""
+
+    data_keys: tuple[str, ...]
+    battery_id: int | None = None
+
+
+class GivEnergyUpdateCoordinator(DataUpdateCoordinator[PlantSnapshot]):
     """Update coordinator that enables efficient batched updates to all entities associated with an inverter."""
 
     require_full_refresh = True
-    last_full_refresh = datetime.min
+    last_full_refresh = datetime.min.replace(tzinfo=dt.UTC)
+    # None until the first successful refresh, or data is restored
+    data: PlantSnapshot | None
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: InverterConnection,
+        num_batteries: int,
+        min_update_interval: timedelta = DEFAULT_MIN_UPDATE_INTERVAL,
+        max_update_interval: timedelta = DEFAULT_MAX_UPDATE_INTERVAL,
+        recorder: RegisterRecorder | None = None,
+        flow_energy: FlowEnergy | None = None,
+        snapshot_store: SnapshotStore | None = None,
+        static_registers: StaticRegisterCache | None = None,
+    ) -> None:
+        """
+        Initialize my coordinator.
 
-    def __init__(self, hass: HomeAssistant, host: str, num_batteries: int) -> None:
-        """Initialize my coordinator."""
+        `num_batteries` is only a starting point, as the coordinator counts the
+        batteries attached by probing battery slots itself. If given, `recorder`
+        records every block read, `flow_energy` integrates the power flows of every
+        refresh, and `snapshot_store` saves the registers behind the current data, so
+        that they can be restored after a restart. Static registers read by full
+        refreshes are kept in `static_registers`, if given, to describe the inverter
+        before it is next read.
+        """
         super().__init__(
             hass,
             _LOGGER,
             name="Inverter",
-            update_interval=timedelta(seconds=30),
+            update_interval=min_update_interval,
         )
 
-        self.host = host
+        self.scheduler = PollScheduler(min_update_interval, max_update_interval)
+        self.update_reason = "starting up"
+        self.write_queue = WriteQueue(hass, self)
+        self.metrics = RefreshMetrics()
+        self.plausibility = PlausibilityEngine()
+        self.recorder = recorder
+        self.flow_energy = flow_energy
+        self.snapshot_store = snapshot_store
+        self.static_registers = static_registers
+        # Set while the data was restored from before a restart, and not yet refreshed
+        self.stale = False
+        # Set when the registers behind the current data haven't been saved
+        self._snapshot_changed = False
+
+        # When each holding register was last read, from the clock's monotonic time
+        self._holding_register_read_at: dict[int, float] = {}
+
+        self.connection = connection
+        self.host = connection.host
+        # Readings are timed by the connection's clock, which is only the real time
+        # when reading from an inverter, rather than replaying a recording
+        self.clock = connection.clock
+        # Register caches are double buffered: refreshes read into the back plant,
+        # which only becomes `plant` once its values have passed plausibility checks.
+        # Neither a slow refresh nor a discarded one is ever visible in `plant`.
         self.plant = Plant(number_batteries=num_batteries)
+        self._back_plant = Plant(number_batteries=num_batteries)
+
+        # Number of enabled entities reading each decoded value. Until any entity
+        # has been added, every register is read so that entities can be set up.
+        self._tracking_keys = False
+        self._inverter_keys: Counter[str] = Counter()
+        self._battery_keys: defaultdict[int, Counter[str]] = defaultdict(Counter)
+
+        # Battery slots are probed on the first refresh, then every so often. The
+        # slots of known batteries that read as empty when last probed are kept.
+        self._next_battery_probe = 0.0
+        self._empty_battery_slots: frozenset[int] = frozenset()
+
+        # What entities were last told about, to work out which need updating
+        self._notified_data: PlantSnapshot | None = None
+        self._notified_success = False
+        self._notified_stale = False
+        self._notified_batteries: tuple[str | None, ...] | None = None
+        self._last_forced_update = 0.0
+
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, tracking the values read by the listener."""
+        remove_listener: Callable[[], None] = super().async_add_listener(
+            update_callback, context
+        )
+        if not isinstance(context, ListenerContext):
+            return remove_listener
+
+        untrack = self.async_track_data_keys(context.data_keys, context.battery_id)
+
+        def _async_remove() -> None:
+            remove_listener()
+            untrack()
+
+        return _async_remove
+
+    def async_update_listeners(self) -> None:
+        """
+        Update listeners whose values have changed since they were last updated.
+
+        Writing unchanged states is far from free, since each goes through the state
+        machine and recorder. All listeners are updated on a change of availability
+        or staleness, and periodically regardless. Listeners for batteries that have
+        been removed are never updated, as their entities are about to be removed.
+        """
+        with self.metrics.time("fan_out"):
+            self._async_update_changed_listeners()
+
+    def _async_update_changed_listeners(self) -> None:
+        if self.data is not None:
+            serial_numbers = tuple(
+                battery.get("battery_serial_number") for battery in self.data.batteries
+            )
+            if serial_numbers != self._notified_batteries:
+                self._notified_batteries = serial_numbers
+                async_dispatcher_send(
+                    self.hass, SIGNAL_BATTERIES_CHANGED.format(self.host)
+                )
+
+        previous = self._notified_data
+        changes = None
+        now = self.clock.monotonic()
+        if (
+            previous is not None
+            and self.data is not None
+            and self.last_update_success == self._notified_success
+            and self.stale == self._notified_stale
+            and now - self._last_forced_update < _FORCED_UPDATE_INTERVAL
+        ):
+            changes = self.data.changed_keys(previous)
+
+        self._notified_data = self.data
+        self._notified_success = self.last_update_success
+        self._notified_stale = self.stale
+        if changes is None:
+            self._last_forced_update = now
+
+        num_batteries = len(self.data.batteries) if self.data is not None else None
+        for update_callback, context in list(self._listeners.values()):
+            if isinstance(context, ListenerContext):
+                battery_id = context.battery_id
+                if (
+                    battery_id is not None
+                    and num_batteries is not None
+                    and battery_id >= num_batteries
+                ):
+                    continue
+                if changes is not None:
+                    inverter_changes, battery_changes = changes
+                    changed = (
+                        inverter_changes
+                        if battery_id is None
+                        else battery_changes[battery_id]
+                    )
+                    if changed.isdisjoint(context.data_keys):
+                        continue
+            update_callback()
+
+    def async_track_data_keys(
+        self, keys: Iterable[str], battery_id: int | None = None
+    ) -> CALLBACK_TYPE:
+        """
+        Keep the registers backing some decoded values up to date.
+
+        Returns a callback that stops tracking the values, for when an entity is removed.
+        """
+        counter = (
+            self._inverter_keys
+            if battery_id is None
+            else self._battery_keys[battery_id]
+        )
+        tracked = tuple(keys)
+        counter.update(tracked)
+        self._tracking_keys = True
 
-    async def _async_update_data(self) -> Plant:
+        def _async_untrack() -> None:
+            counter.subtract(tracked)
+
+        return _async_untrack
+
+    def read_plan(self, full_refresh: bool) -> ReadPlan:
+        """Work out which register blocks to read, based on the values in use."""
+        if self._tracking_keys:
+            plan = ReadPlan(
+                blocks_for_keys(
+                    INVERTER_KEY_BLOCKS,
+                    INVERTER_BLOCKS,
+                    chain(_REQUIRED_INVERTER_KEYS, +self._inverter_keys),
+                ),
+                tuple(
+                    blocks_for_keys(
+                        BATTERY_KEY_BLOCKS, BATTERY_BLOCKS, +self._battery_keys[i]
+                    )
+                    for i in range(len(self.plant.batteries_rcs))
+                ),
+            )
+        else:
+            plan = full_read_plan(len(self.plant.batteries_rcs))
+
+        if not full_refresh:
+            plan = without_holding_registers(plan)
+        return plan
+
+    async def _async_update_data(self) -> PlantSnapshot:
         """Fetch data from API endpoint.
 
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
+        The register caches are decoded once here, so entities can cheaply look up
+        their values from the resulting snapshot.
         """
-        if self.last_full_refresh < (datetime.utcnow() - _FULL_REFRESH_INTERVAL):
+        if self.last_full_refresh < (self.clock.utcnow() - _FULL_REFRESH_INTERVAL):
             self.require_full_refresh = True
 
         try:
             async with async_timeout.timeout(10):
-                await self.hass.async_add_executor_job(
-                    self._fetch_data, self.require_full_refresh
-                )
-                return self.plant
+                snapshot = await self._fetch_data(self.require_full_refresh)
         except Exception as err:
+            self.metrics.record_outcome(False)
             raise UpdateFailed(f"Error communicating with API: {err}") from err
+        self.metrics.record_outcome(True)
+        self.stale = False
+        if self.flow_energy is not None:
+            self.flow_energy.add(snapshot.flows, self.clock.utcnow())
+        self._snapshot_changed = True
+
+        self.scheduler.record(snapshot.inverter)
+        interval, self.update_reason = self.scheduler.next_interval(
+            snapshot.inverter,
+            dt.as_local(self.clock.utcnow()).time(),
+            self.write_queue.pending,
+        )
+        if self.connection.access is not None:
+            interval = self.connection.access.stagger(
+                self.host, interval, self.hass.loop.time()
+            )
+        self.update_interval = interval
+        _LOGGER.debug("Next update in %s: %s", self.update_interval, self.update_reason)
+        return snapshot
 
-    def _fetch_data(self, full_refresh: bool) -> None:
+    async def _fetch_data(self, full_refresh: bool) -> PlantSnapshot:
         """Fetch data from the inverter via modbus."""
         _LOGGER.info("Fetching data from %s", self.host)
-        try:
-            client = GivEnergyClient(self.host)
-            if full_refresh:
-                _LOGGER.debug("Performing full refresh")
-                client.refresh_plant(self.plant, full_refresh=True)
-                self.last_full_refresh = datetime.utcnow()
-                self.require_full_refresh = False
+        back = self._back_plant
+        _copy_registers(self.plant, back)
+        plan = self.read_plan(full_refresh)
+        probe_batteries = self.clock.monotonic() >= self._next_battery_probe
+        if probe_batteries:
+            # Batteries are read by the probe instead
+            plan = plan._replace(batteries=((),) * len(plan.batteries))
+        _LOGGER.debug(
+            "Performing %s refresh of %d blocks",
+            "full" if full_refresh else "partial",
+            len(plan.inverter) + sum(len(blocks) for blocks in plan.batteries),
+        )
+        if self.recorder is None:
+            await self.connection.async_read_plan(back, plan, self.metrics)
+        else:
+            try:
+                await self.connection.async_read_plan(
+                    back, plan, self.metrics, self.recorder.record
+                )
+            finally:
+                await self.hass.async_add_executor_job(self.recorder.flush)
+        if probe_batteries:
+            empty_battery_slots = await self._async_probe_batteries(back)
+
+        with self.metrics.time("decode"):
+            snapshot = PlantSnapshot.from_plant(back)
+        with self.metrics.time("validate"):
+            result = self.plausibility.check(snapshot, self.clock.monotonic())
+        if result.discarded_by is not None:
+            self.metrics.discarded_frames += 1
+            raise GivEnergyException(
+                f"Data discarded: failed {result.discarded_by.name} check"
+            )
+
+        # Swap buffers. The old front plant is brought up to date and reused by the
+        # next refresh, rather than allocating new register caches every time.
+        self.plant, self._back_plant = back, self.plant
+        now = self.clock.monotonic()
+        for block in plan.inverter:
+            if block.register_type is HoldingRegister:
+                self._holding_register_read_at.update(
+                    dict.fromkeys(
+                        range(block.base_register, block.base_register + BLOCK_SIZE),
+                        now,
+                    )
+                )
+        if full_refresh:
+            self.last_full_refresh = self.clock.utcnow()
+            self.require_full_refresh = False
+        if probe_batteries:
+            # An unsuccessful refresh leaves the probe due, so its count is never lost
+            self._next_battery_probe = now + _BATTERY_PROBE_INTERVAL
+            self._empty_battery_slots = empty_battery_slots
+            if len(self.plant.batteries_rcs) != len(self._back_plant.batteries_rcs):
+                _LOGGER.info(
+                    "Found %d batteries attached to %s",
+                    len(self.plant.batteries_rcs),
+                    self.host,
+                )
+        if self.static_registers is not None and STATIC_BLOCK in plan.inverter:
+            self.static_registers.async_update(self.plant.inverter_rc)
+        return result.snapshot
+
+    async def _async_probe_batteries(self, plant: Plant) -> frozenset[int]:
+        """
+        Read battery slots into a plant in address order, up to the first empty one.
+
+        The plant gains register caches for batteries attached, and loses those of
+        batteries removed. Returns the slots of known batteries that read as empty,
+        which are only taken to be removed if they are still empty on the next probe,
+        as zeroed frames are not unusual. Until then they keep their previous values.
+        Other slots may not be answered at all while empty, so are only probed briefly.
+        """
+        (block,) = BATTERY_BLOCKS
+        empty_slots: set[int] = set()
+        battery_id = 0
+        while battery_id < MAX_BATTERIES:
+            known = battery_id in self._empty_battery_slots or _has_battery(
+                plant, battery_id
+            )
+            if known:
+                values = await self.connection.async_read_block(
+                    block, battery_id, self.metrics
+                )
             else:
-                _LOGGER.debug("Performing partial refresh")
-                client.refresh_plant(self.plant, full_refresh=False)
-        finally:
-            # We seem to have better reliability when we avoid reusing the client object
-            # Close the underlying socket to clean up resources
-            client.modbus_client.close()
-
-        # The connection sometimes returns what it claims is valid data, but many of the values
-        # are zero. This is particularly painful when values are used in the energy dashboard,
-        # as the dashboard double counts everything up to the point in the day when the figures
-        # go back to normal. Work around this by detecting some extremely unlikely zero values.
-        inverter_data = self.plant.inverter
-
-        # The heatsink and charger temperatures never seem to go below around 10 celsius, even
-        # when idle and temperatures well below zero for an outdoor installation.
-        heatsink_temp = inverter_data.temp_inverter_heatsink
-        charger_temp = inverter_data.temp_charger
-        if heatsink_temp == 0 or charger_temp == 0:
-            raise GivEnergyException("Data discarded: improbable zero temperature")
-
-        # Total inverter output would only ever be zero prior to commissioning.
-        if inverter_data.e_inverter_out_total <= 0:
-            raise GivEnergyException("Data discarded: inverter total output <= 0")
+                try:
+                    probed = await self.connection.async_probe_block(
+                        block, battery_id, self.metrics
+                    )
+                except TransportError:
+                    break
+                if probed is None:
+                    break
+                values = probed
+            await asyncio.sleep(self.connection.sleep_between_queries)
+
+            registers = {
+                block.register_type(index): value for index, value in values.items()
+            }
+            empty = not decode_serial_number(registers, "battery_serial_number")
+            if empty:
+                if not known or battery_id in self._empty_battery_slots:
+                    break
+                # Keep the battery, and its previous values, until the next probe.
+                # Not every zeroed value would be caught by the plausibility checks,
+                # e.g. the serial number, which would look like another battery.
+                empty_slots.add(battery_id)
+            if self.recorder is not None:
+                self.recorder.record(block, battery_id, values)
+            if not empty:
+                if battery_id == len(plant.batteries_rcs):
+                    plant.batteries_rcs.append(RegisterCache())
+                plant.batteries_rcs[battery_id].set_registers(
+                    block.register_type, values
+                )
+            battery_id += 1
+
+        _resize_batteries(plant, battery_id)
+        return frozenset(empty_slots)
+
+    def async_update_holding_registers(
+        self, values: Mapping[HoldingRegister, int]
+    ) -> bool:
+        """
+        Patch freshly read holding register values into the current data.
+
+        This allows the results of a write to be shown straight away, without waiting
+        for the next full refresh. Only entities reading affected values are updated.
+        Returns False, leaving the data as it was, if the values were implausible.
+        """
+        registers = self.plant.inverter_rc
+        previous = {register: registers.get(register) for register in values}
+        registers.update(values)
+        now = self.clock.monotonic()
+        snapshot = None
+        if self.data is not None:
+            result = self.plausibility.check(PlantSnapshot.from_plant(self.plant), now)
+            if result.discarded_by is not None:
+                # Nothing awaits in between, so the values were never seen
+                for register, value in previous.items():
+                    if value is None:
+                        del registers[register]
+                    else:
+                        registers[register] = value
+                return False
+            snapshot = result.snapshot
+
+        # Any refresh in progress carries the values over when its buffer is swapped in
+        self._back_plant.inverter_rc.update(values)
+        self._holding_register_read_at.update(
+            (register.value, now) for register in values
+        )
+        if snapshot is not None:
+            self.data = snapshot
+            self.async_update_listeners()
+        return True
+
+    def async_update_powers(self, powers: Mapping[str, int], publish: bool) -> None:
+        """
+        Patch power readings from a fast poll into the current data.
+
+        Flow energy is integrated from every reading. The readings only become the
+        current data, updating entities that read them, if `publish` is set. There
+        must already be current data to patch.
+        """
+        assert self.data is not None
+        snapshot = PlantSnapshot(
+            MappingProxyType({**self.data.inverter, **powers}), self.data.batteries
+        )
+        result = self.plausibility.check(snapshot, self.clock.monotonic(), powers)
+        if result.discarded_by is not None:
+            return
+        if self.flow_energy is not None:
+            self.flow_energy.add(result.snapshot.flows, self.clock.utcnow())
+        if publish:
+            self.data = result.snapshot
+            # Timed apart from full refreshes, as far fewer entities read powers
+            with self.metrics.time("fast_fan_out"):
+                self._async_update_changed_listeners()
+
+    def cached_holding_register(self, register: HoldingRegister) -> int | None:
+        """Return the value of a holding register, if it was recently read."""
+        read_at = self._holding_register_read_at.get(register.value)
+        if (
+            read_at is None
+            or self.clock.monotonic() - read_at > _MAX_HOLDING_REGISTER_AGE
+        ):
+            return None
+        return self.plant.inverter_rc.get(register)  # type: ignore[no-any-return]
+
+    async def async_restore(self) -> bool:
+        """
+        Restore the data saved before Home Assistant last stopped, if there is any.
+
+        Restored data is marked stale until the next successful refresh. Returns True
+        if data was restored.
+        """
+        if self.snapshot_store is None:
+            return False
+        back = self._back_plant
+        saved_at = await self.snapshot_store.async_load(back)
+        if saved_at is None:
+            return False
+
+        # Checked as if taken when it was saved, so that the first refresh isn't held
+        # for values that have changed a lot while Home Assistant was stopped
+        age = (self.clock.utcnow() - saved_at).total_seconds()
+        result = self.plausibility.check(
+            PlantSnapshot.from_plant(back), self.clock.monotonic() - age
+        )
+        if result.discarded_by is not None:
+            _LOGGER.debug(
+                "Discarded data for %s saved at %s, as %s",
+                self.host,
+                saved_at,
+                result.discarded_by.name,
+            )
+            _copy_registers(self.plant, back)
+            return False
+
+        _copy_registers(back, self.plant)
+        self.data = result.snapshot
+        self.stale = True
+        _LOGGER.debug("Restored data for %s saved at %s", self.host, saved_at)
+        return True
+
+    def async_start_saving(self) -> CALLBACK_TYPE:
+        """
+        Start saving the registers behind the current data, if there is a store.
+
+        Changed registers are saved periodically, and when Home Assistant stops.
+        Returns a callback that stops saving.
+        """
+        cancel_interval = async_track_time_interval(
+            self.hass,
+            self._async_save_snapshot,
+            _SNAPSHOT_SAVE_INTERVAL,
+            name=f"GivEnergy snapshot save {self.host}",
+            cancel_on_shutdown=True,
+        )
+        cancel_stop = self.hass.bus.async_listen(
+            EVENT_HOMEASSISTANT_STOP, self._async_save_snapshot
+        )
+
+        def _async_stop() -> None:
+            cancel_interval()
+            cancel_stop()
+
+        return _async_stop
+
+    async def _async_save_snapshot(self, _: Any = None) -> None:
+        """Save the registers behind the current data, if they have changed."""
+        if self.snapshot_store is not None and self._snapshot_changed:
+            self._snapshot_changed = False
+            await self.snapshot_store.async_save(self.plant)
+
+    async def async_shutdown(self) -> None:
+        """
+        Stop refreshing, and close any register log.
+
+        Flow energy totals and the registers behind the current data are saved.
+        """
+        await super().async_shutdown()
+        if self.recorder is not None:
+            await self.hass.async_add_executor_job(self.recorder.close)
+        if self.flow_energy is not None:
+            await self.flow_energy.async_save()
+        if self.snapshot_store is not None and self.data is not None:
+            await self.snapshot_store.async_save(self.plant)
 
     async def async_request_full_refresh(self) -> None:
         """Force a full update from the inverter."""
         self.require_full_refresh = True
         await self.async_request_refresh()
+
+
+def _copy_registers(source: Plant, target: Plant) -> None:
+    """Make one plant's register caches the same as another's, in place."""
+    # Registers can be removed from a cache (e.g. when a write is rolled back), so
+    # each cache is cleared rather than just updated, leaving no stale values behind
+    _copy_cache(source.inverter_rc, target.inverter_rc)
+    _resize_batteries(target, len(source.batteries_rcs))
+    for target_rc, source_rc in zip(target.batteries_rcs, source.batteries_rcs):
+        _copy_cache(source_rc, target_rc)
+
+
+def _copy_cache(source: RegisterCache, target: RegisterCache) -> None:
+    """Replace the contents of one register cache with another's."""
+    target.clear()
+    target.update(source)
+
+
+def _has_battery(plant: Plant, battery_id: int) -> bool:
+    """Return True if a plant has registers read from a battery in a slot."""
+    if battery_id >= len(plant.batteries_rcs):
+        return False
+    register_cache = plant.batteries_rcs[battery_id]
+    return bool(register_cache) and bool(
+        decode_serial_number(register_cache, "battery_serial_number")
+    )
+
+
+def _resize_batteries(plant: Plant, num_batteries: int) -> None:
+    """Add or remove battery register caches, for batteries attached or removed."""
+    del plant.batteries_rcs[num_batteries:]
+    plant.batteries_rcs.extend(
+        RegisterCache() for _ in range(len(plant.batteries_rcs), num_batteries)
+    )
@@ -0,0 +1,138 @@
+"""Discovery of inverters, and the batteries attached to them, on the local network."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from ipaddress import IPv4Network
+
+from typing import NamedTuple
+
+import async_timeout
+from givenergy_modbus.model.register import HoldingRegister, InputRegister, Register
+from givenergy_modbus.model.register_cache import RegisterCache
+from givenergy_modbus.model.register_getter import RegisterGetter
+
+from .const import LOGGER
+from .register_map import (
+    BATTERY_BLOCKS,
+    BLOCK_SIZE,
+    INVERTER_SLAVE_ADDRESS,
+    STATIC_BLOCK,
+)
+from .transport import DEFAULT_PORT, ModbusTransport, TransportError
+
+# Inverters on the local network accept connections within milliseconds, so anything
+# slower than this is taken not to be one.
+DEFAULT_CONNECT_TIMEOUT = 1.0
+
+# Hosts probed at once. With the default timeout, a /24 network takes a few seconds.
+DEFAULT_MAX_CONCURRENT = 64
+
+# Slots probed for batteries, beyond the size of any real installation
+MAX_BATTERIES = 8
+
+
+class DiscoveredInverter(NamedTuple):
+    """An inverter found on the network."""
+
+    host: str
+    serial_number: str
+    num_batteries: int
+    # The first block of holding registers, read to identify the inverter
+    registers: dict[HoldingRegister, int]
+
+
+async def async_discover(
+    network: IPv4Network,
+    port: int = DEFAULT_PORT,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+) -> list[DiscoveredInverter]:
+    """
+    Scan every host on a network for inverters, probing many hosts at once.
+
+    Hosts that don't accept a connection in time, or don't answer like an inverter,
+    are skipped. Inverters are returned in address order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _async_probe(host: str) -> DiscoveredInverter | None:
+        async with semaphore:
+            try:
+                return await async_identify(host, port, connect_timeout)
+            except TransportError:
+                return None
+
+    results = await asyncio.gather(
+        *(_async_probe(str(host)) for host in network.hosts())
+    )
+    return [inverter for inverter in results if inverter is not None]
+
+
+async def async_identify(
+    host: str,
+    port: int = DEFAULT_PORT,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+) -> DiscoveredInverter:
+    """
+    Read the serial number of the inverter at a host, and count its batteries.
+
+    Battery slots are probed in address order, up to the first empty one. Raises
+    TransportError if there is no inverter at the host.
+    """
+    transport = ModbusTransport(host, port)
+    try:
+        try:
+            async with async_timeout.timeout(connect_timeout):
+                await transport.connect()
+        except asyncio.TimeoutError as err:
+            raise TransportError(f"Timed out connecting to {host}") from err
+
+        # Read as a whole block, like the batteries below
+        values = await transport.read_registers(
+            STATIC_BLOCK.register_type, STATIC_BLOCK.base_register, BLOCK_SIZE
+        )
+        registers = {HoldingRegister(index): value for index, value in values.items()}
+        serial_number = decode_serial_number(registers, "inverter_serial_number")
+        if not serial_number:
+            raise TransportError(f"No inverter serial number at {host}")
+
+        num_batteries = 0
+        while num_batteries < MAX_BATTERIES and await _async_battery_present(
+            transport, num_batteries
+        ):
+            num_batteries += 1
+    except ValueError as err:
+        # A malformed response from something other than an inverter
+        raise TransportError(f"Unexpected response from {host}: {err}") from err
+    finally:
+        transport.close()
+
+    LOGGER.debug(
+        "Found inverter %s at %s with %d batteries", serial_number, host, num_batteries
+    )
+    return DiscoveredInverter(host, serial_number, num_batteries, registers)
+
+
+async def _async_battery_present(transport: ModbusTransport, battery_id: int) -> bool:
+    """Return True if a battery slot has a battery with a serial number in it."""
+    # The whole block is read, as requests not aligned to a block may be rejected
+    (block,) = BATTERY_BLOCKS
+    try:
+        values = await transport.read_registers(
+            block.register_type,
+            block.base_register,
+            BLOCK_SIZE,
+            INVERTER_SLAVE_ADDRESS + battery_id,
+        )
+    except TransportError:
+        # Empty slots may not be answered at all
+        return False
+    registers = {InputRegister(index): value for index, value in values.items()}
+    return bool(decode_serial_number(registers, "battery_serial_number"))
+
+
+def decode_serial_number(registers: Mapping[Register, int], key: str) -> str:
+    """Decode a serial number, which is empty if its registers are all zero."""
+    serial_number: str = RegisterGetter(RegisterCache(registers)).get(key)
+    return serial_number.replace("\x00", "").strip()
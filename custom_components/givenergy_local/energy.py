@@ -0,0 +1,118 @@
+"""Daily energy totals for power flows, integrated from every refresh."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt
+
+from .flows import PowerFlows
+
+_STORAGE_VERSION = 1
+
+# Changed totals are saved this often, and when Home Assistant stops
+_SAVE_INTERVAL = timedelta(minutes=1)
+
+# Power is not assumed to have been steady across longer gaps between readings (e.g.
+# while the inverter was unreachable or Home Assistant was stopped), so energy isn't
+# counted for them.
+_MAX_GAP = timedelta(minutes=10)
+
+
+class FlowEnergy:
+    """
+    Integrates each power flow into a total for the day (in kWh).
+
+    Every refresh is integrated, using the trapezoidal rule between readings, however
+    rarely entity states are written. Totals are persisted, so they carry on where
+    they left off after a restart, and reset at local midnight.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize totals of zero. Call `async_load` to restore saved totals."""
+        self.totals = dict.fromkeys(PowerFlows._fields, 0.0)
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, _STORAGE_VERSION, key)
+        self._day: date | None = None
+        self._last: tuple[datetime, PowerFlows] | None = None
+        self._changed = False
+
+    async def async_load(self) -> None:
+        """Restore the totals and last reading saved previously, if any."""
+        data = await self._store.async_load()
+        if data is None or data["day"] is None:
+            return
+        self._day = date.fromisoformat(data["day"])
+        self.totals.update(
+            (key, value) for key, value in data["totals"].items() if key in self.totals
+        )
+        if data["last"] is not None:
+            read_at = dt.parse_datetime(data["last"]["at"])
+            if read_at is not None:
+                self._last = read_at, PowerFlows(*data["last"]["flows"])
+
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start saving changed totals periodically, returning a callback to stop."""
+        cancel_interval = async_track_time_interval(
+            self._hass,
+            self._async_save_changes,
+            _SAVE_INTERVAL,
+            name="GivEnergy flow energy save",
+            cancel_on_shutdown=True,
+        )
+        cancel_stop = self._hass.bus.async_listen(
+            EVENT_HOMEASSISTANT_STOP, self._async_save_changes
+        )
+
+        def _async_stop() -> None:
+            cancel_interval()
+            cancel_stop()
+
+        return _async_stop
+
+    async def async_save(self) -> None:
+        """Save the totals straight away."""
+        self._changed = False
+        await self._store.async_save(self._data_to_save())
+
+    async def _async_save_changes(self, _: Any = None) -> None:
+        """Save the totals, if they have changed since they were last saved."""
+        if self._changed:
+            await self.async_save()
+
+    async def async_remove(self) -> None:
+        """Delete the saved totals."""
+        await self._store.async_remove()
+
+    def add(self, flows: PowerFlows | None, now: datetime) -> None:
+        """Integrate the flows since the last reading up to a new reading."""
+        midnight = dt.start_of_local_day(dt.as_local(now))
+        if self._day != midnight.date():
+            self._day = midnight.date()
+            self.totals = dict.fromkeys(self.totals, 0.0)
+
+        if flows is not None and self._last is not None:
+            last_at, last_flows = self._last
+            # Only the part of the interval since midnight counts towards today
+            started = max(last_at, midnight)
+            if now - last_at <= _MAX_GAP and now > started:
+                hours = (now - started).total_seconds() / 3600
+                for key, before, after in zip(self.totals, last_flows, flows):
+                    self.totals[key] += (before + after) / 2 * hours / 1000
+
+        self._last = None if flows is None else (now, flows)
+        self._changed = True
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "day": None if self._day is None else self._day.isoformat(),
+            "totals": self.totals,
+            "last": None
+            if self._last is None
+            else {"at": self._last[0].isoformat(), "flows": list(self._last[1])},
+        }
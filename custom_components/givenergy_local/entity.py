@@ -1,12 +1,17 @@
 """Home Assistant entity descriptions."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from typing import Any
+
 from givenergy_modbus.model.inverter import Model
-from givenergy_modbus.model.plant import Battery, Inverter, Plant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, MANUFACTURER
-from .coordinator import GivEnergyUpdateCoordinator
+from .coordinator import GivEnergyUpdateCoordinator, ListenerContext
 
 # Maps battery design capacities (as seen under 'battery_design_capacity_2') to model names.
 # Keys should match the values seen in the datasheets.
@@ -18,9 +23,28 @@ _BATTERY_CAPACITY_TO_MODEL = {
 }
 
 
+def inverter_device_info(data: Mapping[str, Any]) -> DeviceInfo:
+    """Describe the inverter device from decoded inverter values."""
+    model_name = data["inverter_model"]
+    if model_name is None:
+        model_name = "Unknown"
+
+    return DeviceInfo(
+        identifiers={(DOMAIN, data["inverter_serial_number"])},
+        name="Solar Inverter",
+        model=model_name,
+        manufacturer=MANUFACTURER,
+        sw_version=data["firmware_version"],
+        configuration_url="https://givenergy.cloud",
+    )
+
+
 class InverterEntity(CoordinatorEntity[GivEnergyUpdateCoordinator]):
     """An entity that derives data from a GivEnergy inverter."""
 
+    # Decoded values read by the entity, when they differ from the entity key
+    _attr_data_keys: tuple[str, ...] | None = None
+
     def __init__(
         self, coordinator: GivEnergyUpdateCoordinator, config_entry: ConfigEntry
     ) -> None:
@@ -28,37 +52,49 @@ class InverterEntity(CoordinatorEntity[GivEnergyUpdateCoordinator]):
         super().__init__(coordinator)
         self.config_entry = config_entry
 
+    async def async_added_to_hass(self) -> None:
+        """
+        Listen for changes to the values read by the entity.
+
+        Entities that don't read any decoded values are updated on every refresh.
+        """
+        if self.data_keys:
+            self.coordinator_context = ListenerContext(self.data_keys)
+        await super().async_added_to_hass()
+
+    @property
+    def data_keys(self) -> tuple[str, ...]:
+        """Return the decoded inverter values read by the entity."""
+        if self._attr_data_keys is not None:
+            return self._attr_data_keys
+        return (self.entity_description.key,)
+
     @property
     def device_info(self) -> DeviceInfo:
         """Inverter device information for the entity."""
-
-        model_name = self.data.inverter_model
-        if model_name is None:
-            model_name = "Unknown"
-
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.data.inverter_serial_number)},
-            name="Solar Inverter",
-            model=model_name,
-            manufacturer=MANUFACTURER,
-            sw_version=self.data.firmware_version,
-            configuration_url="https://givenergy.cloud",
-        )
+        return inverter_device_info(self.data)
 
     @property
-    def data(self) -> Inverter:
-        """Get inverter data for the entity."""
-        return self.coordinator.data.inverter
+    def data(self) -> Mapping[str, Any]:
+        """Get decoded inverter data for the entity."""
+        data: Mapping[str, Any] = self.coordinator.data.inverter
+        return data
 
     @property
     def available(self) -> bool:
         """Return True if the inverter is online."""
         return self.coordinator.last_update_success  # type: ignore[no-any-return]
 
+    @property
+    def assumed_state(self) -> bool:
+        """Return True while showing data restored from before a restart."""
+        stale: bool = self.coordinator.stale
+        return stale
+
     @property
     def inverter_model(self) -> Model:
         """Get the inverter model."""
-        return self.data.inverter_model
+        return self.data["inverter_model"]
 
     @property
     def inverter_max_battery_power(self) -> Model:
@@ -71,11 +107,14 @@ class InverterEntity(CoordinatorEntity[GivEnergyUpdateCoordinator]):
             return 2600
 
 
-class BatteryEntity(CoordinatorEntity[Plant]):
+class BatteryEntity(CoordinatorEntity[GivEnergyUpdateCoordinator]):
     """An entity associated with a battery device connected to the inverter."""
 
     battery_id: int
 
+    # Decoded values read by the entity, when they differ from the entity key
+    _attr_data_keys: tuple[str, ...] | None = None
+
     def __init__(
         self,
         coordinator: GivEnergyUpdateCoordinator,
@@ -87,30 +126,52 @@ class BatteryEntity(CoordinatorEntity[Plant]):
         self.config_entry = config_entry
         self.battery_id = battery_id
 
+    async def async_added_to_hass(self) -> None:
+        """Listen for changes to the values read by the entity."""
+        self.coordinator_context = ListenerContext(self.data_keys, self.battery_id)
+        await super().async_added_to_hass()
+
+    @property
+    def data_keys(self) -> tuple[str, ...]:
+        """Return the decoded battery values read by the entity."""
+        if self._attr_data_keys is not None:
+            return self._attr_data_keys
+        return (self.entity_description.key,)
+
     @property
     def device_info(self) -> DeviceInfo:
         """Battery device information for the entity."""
 
         return DeviceInfo(
-            identifiers={(DOMAIN, self.data.battery_serial_number)},
+            identifiers={(DOMAIN, self.data["battery_serial_number"])},
             name="Battery",
             manufacturer=MANUFACTURER,
             model=self.battery_model,
-            sw_version=str(self.data.bms_firmware_version),
+            sw_version=str(self.data["bms_firmware_version"]),
             configuration_url="https://givenergy.cloud",
-            via_device=(DOMAIN, self.coordinator.data.inverter.inverter_serial_number),
+            via_device=(
+                DOMAIN,
+                self.coordinator.data.inverter["inverter_serial_number"],
+            ),
         )
 
     @property
-    def data(self) -> Battery:
-        """Get battery data for the entity."""
-        return self.coordinator.data.batteries[self.battery_id]
+    def data(self) -> Mapping[str, Any]:
+        """Get decoded battery data for the entity."""
+        data: Mapping[str, Any] = self.coordinator.data.batteries[self.battery_id]
+        return data
 
     @property
     def available(self) -> bool:
         """Return True if the inverter is online."""
         return self.coordinator.last_update_success  # type: ignore[no-any-return]
 
+    @property
+    def assumed_state(self) -> bool:
+        """Return True while showing data restored from before a restart."""
+        stale: bool = self.coordinator.stale
+        return stale
+
     @property
     def battery_model(self) -> str:
         """
@@ -119,7 +180,7 @@ class BatteryEntity(CoordinatorEntity[Plant]):
         Unrecognised values are described with a capacity in Ah to allow these to be easily added
         in a future release.
         """
-        capacity = int(self.data.battery_design_capacity_2)
+        capacity = int(self.data["battery_design_capacity_2"])
         model_name = _BATTERY_CAPACITY_TO_MODEL.get(capacity)
 
         if model_name is None:
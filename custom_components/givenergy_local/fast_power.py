@@ -0,0 +1,104 @@
+"""Fast polling of instantaneous power readings, between full refreshes."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from givenergy_modbus.model.register import InputRegister
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import LOGGER
+from .coordinator import GivEnergyUpdateCoordinator
+from .flows import FLOW_INPUT_KEYS
+from .register_map import RegisterBlock
+
+# Sent with a dict of power readings (in watts) keyed by decoded value, after every
+# fast poll of an inverter. Format with the inverter host.
+SIGNAL_POWER_UPDATE = "givenergy_local_power_update_{}"
+
+# Power readings that are all held in the first block of input registers
+FAST_POWER_KEYS = (*FLOW_INPUT_KEYS, "p_inverter_out")
+_FAST_POWER_REGISTERS = {key: InputRegister[key.upper()] for key in FAST_POWER_KEYS}
+_FAST_POWER_BLOCK = RegisterBlock(InputRegister, 0)
+
+# Entity states are only written when a reading has moved by at least this many watts
+# since entities were last updated, which smooths out noise at high poll rates.
+_DEADBAND = 25
+
+# Entities are updated with the latest readings at most once in this many seconds,
+# however fast readings are polled, to keep recorder writes down.
+_MIN_PUBLISH_INTERVAL = 10.0
+
+
+class FastPowerPoller:
+    """
+    Reads the block of input registers holding power readings every few seconds.
+
+    Every reading is sent to dispatcher listeners and integrated into flow energy
+    totals, but the coordinator's entities are only updated when a reading moves
+    outside a deadband, and at most once per publish interval, to keep state writes
+    down. Full refreshes carry on at their own cadence, and a poll is skipped while a
+    refresh has failed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: GivEnergyUpdateCoordinator,
+        interval: timedelta,
+    ) -> None:
+        """Initialize the poller. Nothing is read until it is started."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.interval = interval
+        self.signal = SIGNAL_POWER_UPDATE.format(coordinator.host)
+        self._polling = False
+        self._published_at: float | None = None
+
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start polling, returning a callback that stops it."""
+        return async_track_time_interval(
+            self.hass,
+            self.async_poll,
+            self.interval,
+            name=f"GivEnergy fast power {self.coordinator.host}",
+            cancel_on_shutdown=True,
+        )
+
+    async def async_poll(self, now: datetime | None = None) -> None:
+        """Read the power readings once, unless the previous read is still going."""
+        coordinator = self.coordinator
+        if self._polling or coordinator.data is None:
+            return
+        if not coordinator.last_update_success:
+            return
+
+        self._polling = True
+        try:
+            values = await coordinator.connection.async_read_block(_FAST_POWER_BLOCK)
+        except Exception as err:  # pylint: disable=broad-except
+            # The next full refresh will report the inverter as unavailable, if it is
+            LOGGER.debug("Fast power read from %s failed: %s", coordinator.host, err)
+            return
+        finally:
+            self._polling = False
+
+        powers = {
+            key: register.convert(values[register.value])
+            for key, register in _FAST_POWER_REGISTERS.items()
+        }
+        async_dispatcher_send(self.hass, self.signal, powers)
+
+        polled_at = coordinator.clock.monotonic()
+        current = coordinator.data.inverter
+        publish = (
+            self._published_at is None
+            or polled_at - self._published_at >= _MIN_PUBLISH_INTERVAL
+        ) and any(
+            current.get(key) is None or abs(value - current[key]) >= _DEADBAND
+            for key, value in powers.items()
+        )
+        if publish:
+            self._published_at = polled_at
+        coordinator.async_update_powers(powers, publish)
@@ -0,0 +1,72 @@
+"""Power flows between solar, the battery, the grid and the house."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from typing import Any, NamedTuple
+
+# Decoded inverter values that power flows are worked out from
+FLOW_INPUT_KEYS = ("p_pv1", "p_pv2", "p_load_demand", "p_grid_out", "p_battery")
+
+
+class PowerFlows(NamedTuple):
+    """
+    Power (in watts) flowing from each source to each sink at an instant.
+
+    Sources are solar, battery discharge and grid import. Sinks are the house, battery
+    charge and grid export. The flows are balanced: no source supplies more than it
+    produces, and no sink takes more than it consumes.
+    """
+
+    solar_to_house: int
+    solar_to_battery: int
+    solar_to_grid: int
+    battery_to_house: int
+    battery_to_grid: int
+    grid_to_house: int
+    grid_to_battery: int
+
+    @classmethod
+    def solve(cls, inverter: Mapping[str, Any]) -> PowerFlows | None:
+        """
+        Allocate each source to sinks in order of priority, in a single pass.
+
+        Solar supplies the house first, then the battery, then the grid. The battery
+        supplies the house before the grid, and the grid supplies the house before the
+        battery. Returns None if any power reading is unknown.
+        """
+        p_pv1, p_pv2, p_load_demand, p_grid_out, p_battery = (
+            inverter.get(key) for key in FLOW_INPUT_KEYS
+        )
+        if (
+            p_pv1 is None
+            or p_pv2 is None
+            or p_load_demand is None
+            or p_grid_out is None
+            or p_battery is None
+        ):
+            return None
+
+        solar = max(p_pv1 + p_pv2, 0)
+        house = max(p_load_demand, 0)
+        discharge = max(p_battery, 0)
+        charge = max(-p_battery, 0)
+        export = max(p_grid_out, 0)
+        imported = max(-p_grid_out, 0)
+
+        solar_to_house = min(solar, house)
+        solar_to_battery = min(solar - solar_to_house, charge)
+        solar_to_grid = min(solar - solar_to_house - solar_to_battery, export)
+        battery_to_house = min(discharge, house - solar_to_house)
+        battery_to_grid = min(discharge - battery_to_house, export - solar_to_grid)
+        grid_to_house = min(imported, house - solar_to_house - battery_to_house)
+        grid_to_battery = min(imported - grid_to_house, charge - solar_to_battery)
+        return cls(
+            solar_to_house,
+            solar_to_battery,
+            solar_to_grid,
+            battery_to_house,
+            battery_to_grid,
+            grid_to_house,
+            grid_to_battery,
+        )
@@ -1,45 +1,26 @@
 """GivEnergy client wrapper functions."""
-import asyncio
-
 from typing import Callable
 
 from givenergy_modbus.client import GivEnergyClient
 from homeassistant.core import HomeAssistant
 
-from .const import LOGGER
 from .coordinator import GivEnergyUpdateCoordinator
 
-# A bit of a workaround for flaky modbus connections.
-# We try to call services a few times, and only allow the exception to escape after we've
-# made this many attempts.
-_MAX_ATTEMPTS = 5
-_DELAY_BETWEEN_ATTEMPTS = 2.0
-
 
 async def async_reliable_call(
     hass: HomeAssistant,
     coordinator: GivEnergyUpdateCoordinator,
     func: Callable[[GivEnergyClient], None],
-) -> None:
+    force: bool = False,
+) -> bool:
     """
     Attempt to reliably call a function on a GivEnergy client.
 
     When setting values on the inverter, failures are frustratingly common.
-    Using this method will make a number of retries before eventually giving up.
-    """
-    attempts = _MAX_ATTEMPTS
+    The register writes made by the function are queued with others made around the
+    same time, and retried a number of times before eventually giving up.
 
-    while attempts > 0:
-        LOGGER.debug("Attempting function call (%d attempts left)", attempts)
-        client = GivEnergyClient(coordinator.host)
-
-        try:
-            await hass.async_add_executor_job(func, client)
-            await coordinator.async_request_full_refresh()
-            break
-        except AssertionError as err:
-            LOGGER.error("Function failed %s", err)
-            attempts = attempts - 1
-            await asyncio.sleep(_DELAY_BETWEEN_ATTEMPTS)
-        finally:
-            client.modbus_client.close()
+    Registers already known to hold the requested values are not written, unless
+    `force` is set. Returns False if nothing needed to be written.
+    """
+    return await coordinator.write_queue.async_call(func, force)
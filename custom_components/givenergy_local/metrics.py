@@ -0,0 +1,97 @@
+"""Timing and outcome metrics for inverter refreshes."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+import math
+import time
+
+from givenergy_modbus.model.register import HoldingRegister
+
+from .register_map import RegisterBlock
+
+# Number of recent refreshes that metrics are calculated over
+_WINDOW = 100
+
+# Stages of a refresh that are timed separately, and updating entities after a fast
+# poll of power readings
+PHASES = ("connect", "read", "decode", "validate", "fan_out", "fast_fan_out")
+
+
+class RollingHistogram:
+    """The distribution of the most recent values of some measurement."""
+
+    def __init__(self, window: int = _WINDOW) -> None:
+        """Initialize an empty histogram."""
+        self._values: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        """Return the number of values in the window."""
+        return len(self._values)
+
+    def record(self, value: float) -> None:
+        """Add a value, dropping the oldest if the window is full."""
+        self._values.append(value)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the value that a given percentage of values are at or below."""
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+
+class RefreshMetrics:
+    """
+    Records how long each phase of recent refreshes took, and how they turned out.
+
+    Durations are recorded in milliseconds, both for each phase of a refresh and for
+    reading each register block. Refreshes are successful unless they raise, and
+    discarded frames (data that read fine but looked implausible) are counted too.
+    """
+
+    def __init__(self, window: int = _WINDOW) -> None:
+        """Initialize metrics with no refreshes recorded."""
+        self.phases = {phase: RollingHistogram(window) for phase in PHASES}
+        self.blocks: dict[str, RollingHistogram] = {}
+        self.discarded_frames = 0
+        self._window = window
+        self._outcomes: deque[bool] = deque(maxlen=window)
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """Time a phase of a refresh, if it completes."""
+        started = time.perf_counter()
+        yield
+        self.phases[phase].record((time.perf_counter() - started) * 1000)
+
+    def record_block(
+        self, block: RegisterBlock, seconds: float, battery_id: int | None = None
+    ) -> None:
+        """Record how long it took to read a register block."""
+        label = block_label(block, battery_id)
+        if label not in self.blocks:
+            self.blocks[label] = RollingHistogram(self._window)
+        self.blocks[label].record(seconds * 1000)
+
+    def record_outcome(self, success: bool) -> None:
+        """Record whether a refresh succeeded."""
+        self._outcomes.append(success)
+
+    @property
+    def success_rate(self) -> float | None:
+        """Return the percentage of recent refreshes that succeeded."""
+        if not self._outcomes:
+            return None
+        return 100 * sum(self._outcomes) / len(self._outcomes)
+
+
+def block_label(block: RegisterBlock, battery_id: int | None = None) -> str:
+    """Describe a register block, e.g. "HR 60" for holding registers 60 onwards."""
+    prefix = "HR" if block.register_type is HoldingRegister else "IR"
+    label = f"{prefix} {block.base_register}"
+    if battery_id is not None:
+        label = f"Battery {battery_id + 1} {label}"
+    return label
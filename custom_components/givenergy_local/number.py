@@ -1,6 +1,8 @@
 """Home Assistant number entity descriptions."""
 from __future__ import annotations
 
+from operator import itemgetter
+
 from givenergy_modbus.client import GivEnergyClient
 from homeassistant.components.number import (
     NumberDeviceClass,
@@ -48,9 +50,10 @@ class InverterBasicNumber(InverterEntity, NumberEntity):
         """Initialize a sensor based on an entity description."""
         super().__init__(coordinator, config_entry)
         self._attr_unique_id = (
-            f"{self.data.inverter_serial_number}_{entity_description.key}"
+            f"{self.data['inverter_serial_number']}_{entity_description.key}"
         )
         self.entity_description = entity_description
+        self._get_value = itemgetter(entity_description.key)
 
     @property
     def native_value(self) -> StateType:
@@ -60,7 +63,7 @@ class InverterBasicNumber(InverterEntity, NumberEntity):
         This returns the register value as referenced by the 'key' property of
         the associated entity description.
         """
-        return self.data.dict().get(self.entity_description.key)
+        return self._get_value(self.data)
 
 
 class ACChargeLimitNumber(InverterBasicNumber):
@@ -158,7 +161,7 @@ class InverterBatteryPowerLimitNumber(InverterBasicNumber):
         # We need to calculate the maximum possible value based on inverter and battery
         # capabilities. We know packs are limited to 0.5C charge/discharge, so:
         battery_max_power = int(
-            self.data.battery_nominal_capacity * BATTERY_NOMINAL_VOLTAGE * 0.5
+            self.data["battery_nominal_capacity"] * BATTERY_NOMINAL_VOLTAGE * 0.5
         )
 
         # Work out the maximum possible power
@@ -169,13 +172,13 @@ class InverterBatteryPowerLimitNumber(InverterBasicNumber):
         # To add confusion to the matter, the raw values used by the API need to be determined
         # from the battery capacity
         self.battery_power_step = (
-            self.data.battery_nominal_capacity * BATTERY_NOMINAL_VOLTAGE / 100
+            self.data["battery_nominal_capacity"] * BATTERY_NOMINAL_VOLTAGE / 100
         )
 
     @property
     def native_value(self) -> StateType:
         """Get the current value in Watts."""
-        raw_value = self.data.dict().get(self.entity_description.key)
+        raw_value = self._get_value(self.data)
         power_watts = int(raw_value * self.battery_power_step)
         return min(power_watts, self.inverter_max_battery_power)
 
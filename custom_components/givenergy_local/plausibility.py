@@ -0,0 +1,347 @@
+"""Rule-based plausibility checks on decoded inverter and battery values."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Collection, Mapping, Sequence
+from dataclasses import dataclass
+from enum import Enum
+from fnmatch import fnmatchcase
+from types import MappingProxyType
+
+from typing import Any, NamedTuple
+
+from .register_map import BATTERY_KEY_BLOCKS, INVERTER_KEY_BLOCKS, RegisterBlock
+from .snapshot import PlantSnapshot
+
+# Values held because they changed implausibly compared to the previous value are
+# accepted once they have been held for this many consecutive refreshes, since it is
+# then more likely that the previous value was wrong (or the inverter was reset).
+_MAX_CONSECUTIVE_HOLDS = 5
+
+
+class Action(Enum):
+    """What happens to an implausible value."""
+
+    # Keep the last plausible value
+    HOLD = "hold"
+    # Replace the value with None, so entities reading it become unknown
+    DROP = "drop"
+
+
+@dataclass(frozen=True)
+class Rule(ABC):
+    """
+    A check applied to every value whose key matches one of a set of patterns.
+
+    Patterns are shell-style wildcards, e.g. "e_*_total".
+    """
+
+    name: str
+    keys: tuple[str, ...]
+    action: Action = Action.HOLD
+
+    # Implausible values mean every value read from the same register block is suspect
+    corrupts_block = False
+    # Implausible values are judged relative to the previous value, which may be wrong
+    relative = False
+
+    def matches(self, key: str) -> bool:
+        """Return True if the rule applies to a value."""
+        return any(fnmatchcase(key, pattern) for pattern in self.keys)
+
+    @abstractmethod
+    def violated(self, value: float, previous: Any, elapsed: float | None) -> bool:
+        """
+        Return True if a value is implausible, given the previous value.
+
+        `elapsed` is the time (in seconds) since the previous value was first seen.
+        """
+
+
+@dataclass(frozen=True)
+class Range(Rule):
+    """Values must be within fixed bounds."""
+
+    minimum: float = float("-inf")
+    maximum: float = float("inf")
+
+    def violated(self, value: float, previous: Any, elapsed: float | None) -> bool:
+        """Return True if a value is out of range."""
+        return not self.minimum <= value <= self.maximum
+
+
+@dataclass(frozen=True)
+class ImpossibleZero(Rule):
+    """
+    Values are never zero in practice, so a zero means the block was misread.
+
+    The data adapter sometimes returns what it claims is valid data, but with all of a
+    block's registers zero. That is particularly painful when values are used in the
+    energy dashboard, which double counts everything up to the point in the day when
+    the figures go back to normal.
+    """
+
+    corrupts_block = True
+
+    def violated(self, value: float, previous: Any, elapsed: float | None) -> bool:
+        """Return True if a value is zero."""
+        return value == 0
+
+
+@dataclass(frozen=True)
+class MaxRate(Rule):
+    """Values can't change faster than a given amount per second."""
+
+    per_second: float = float("inf")
+    relative = True
+
+    def violated(self, value: float, previous: Any, elapsed: float | None) -> bool:
+        """Return True if a value changed too fast since the previous one."""
+        if not _is_number(previous) or not elapsed:
+            return False
+        change: float = abs(value - previous)
+        return change > self.per_second * elapsed
+
+
+@dataclass(frozen=True)
+class Monotonic(Rule):
+    """Values never decrease, e.g. lifetime energy totals."""
+
+    relative = True
+
+    def violated(self, value: float, previous: Any, elapsed: float | None) -> bool:
+        """Return True if a value is lower than the previous one."""
+        return _is_number(previous) and value < float(previous)
+
+
+INVERTER_RULES: tuple[Rule, ...] = (
+    # The heatsink and charger temperatures never seem to go below around 10 celsius,
+    # even when idle and temperatures well below zero for an outdoor installation.
+    ImpossibleZero("zero_temperature", ("temp_inverter_heatsink", "temp_charger")),
+    # Total inverter output would only ever be zero prior to commissioning.
+    ImpossibleZero("zero_total_output", ("e_inverter_out_total",)),
+    Range("temperature_range", ("temp_*",), Action.DROP, minimum=-40, maximum=120),
+    Range("battery_percent_range", ("battery_percent",), minimum=0, maximum=100),
+    Range("pv_power_range", ("p_pv1", "p_pv2"), minimum=0, maximum=15000),
+    Range(
+        "power_range",
+        ("p_battery", "p_grid_out", "p_inverter_out", "p_load_demand"),
+        minimum=-30000,
+        maximum=30000,
+    ),
+    Monotonic("total_decreased", ("*_total",)),
+    # Well beyond what any inverter can transfer, in kWh per second
+    MaxRate("energy_rate", ("e_*_total",), per_second=0.02),
+    MaxRate("battery_percent_rate", ("battery_percent",), per_second=1),
+)
+
+BATTERY_RULES: tuple[Rule, ...] = (
+    Range("battery_soc_range", ("battery_soc",), minimum=0, maximum=100),
+    Range(
+        "cell_voltage_range", ("v_battery_cell_*",), Action.DROP, minimum=0, maximum=5
+    ),
+    Range(
+        "battery_temperature_range",
+        ("temp_*",),
+        Action.DROP,
+        minimum=-40,
+        maximum=120,
+    ),
+    Monotonic(
+        "battery_total_decreased",
+        ("e_battery_*_total_2", "battery_num_cycles"),
+    ),
+    MaxRate("battery_soc_rate", ("battery_soc",), per_second=1),
+)
+
+
+class PlausibilityResult(NamedTuple):
+    """The outcome of checking a snapshot."""
+
+    # The snapshot with implausible values held or dropped
+    snapshot: PlantSnapshot
+    # The rule that meant the snapshot couldn't be used at all, if any
+    discarded_by: Rule | None = None
+
+
+class PlausibilityEngine:
+    """
+    Checks every decoded value against declarative rules in a single pass.
+
+    Implausible values are held at their last plausible value, or dropped, so that a
+    single misread block doesn't cost the rest of a refresh. The snapshot is only
+    discarded outright if a value must be held and there is no earlier value to hold,
+    i.e. on the first refresh. Violations are counted by rule name.
+
+    Relative rules judge each value against the time it last changed, rather than
+    the time of the previous check, as values are checked far more often than some
+    of them change (e.g. energy totals, between fast polls of power readings).
+    """
+
+    def __init__(
+        self,
+        inverter_rules: Sequence[Rule] = INVERTER_RULES,
+        battery_rules: Sequence[Rule] = BATTERY_RULES,
+    ) -> None:
+        """Initialize the engine with no previous snapshot."""
+        self.violations: Counter[str] = Counter()
+        self._inverter = _DeviceRules(inverter_rules, INVERTER_KEY_BLOCKS)
+        self._battery = _DeviceRules(battery_rules, BATTERY_KEY_BLOCKS)
+        self._previous: PlantSnapshot | None = None
+        # When each value subject to a relative rule last changed, and how many
+        # consecutive checks it has been held for
+        self._changed_at: dict[tuple[int | None, str], float] = {}
+        self._holds: Counter[tuple[int | None, str]] = Counter()
+
+    def check(
+        self,
+        snapshot: PlantSnapshot,
+        now: float,
+        inverter_keys: Collection[str] | None = None,
+    ) -> PlausibilityResult:
+        """
+        Check a snapshot taken at a point in time (from time.monotonic()).
+
+        The checked snapshot becomes the previous snapshot for the next check, unless
+        it is discarded. If `inverter_keys` is given, only those inverter values are
+        fresh (e.g. from a fast poll), so only they are checked, and when values
+        last changed and how long they have been held are left alone.
+        """
+        previous = self._previous
+        inverter, discarded_by = self._check_device(
+            None,
+            self._inverter,
+            snapshot.inverter,
+            None if previous is None else previous.inverter,
+            now,
+            inverter_keys,
+        )
+        if inverter_keys is not None:
+            # Only the inverter's values are fresh
+            if discarded_by is not None:
+                return PlausibilityResult(snapshot, discarded_by)
+            if inverter is not snapshot.inverter:
+                snapshot = PlantSnapshot(inverter, snapshot.batteries)
+            self._previous = snapshot
+            return PlausibilityResult(snapshot)
+
+        batteries = []
+        for i, battery in enumerate(snapshot.batteries):
+            previous_battery = (
+                previous.batteries[i]
+                if previous is not None and i < len(previous.batteries)
+                else None
+            )
+            checked, battery_discarded_by = self._check_device(
+                i, self._battery, battery, previous_battery, now
+            )
+            batteries.append(checked)
+            discarded_by = discarded_by or battery_discarded_by
+
+        if discarded_by is not None:
+            return PlausibilityResult(snapshot, discarded_by)
+        if inverter is not snapshot.inverter or any(
+            checked is not battery
+            for checked, battery in zip(batteries, snapshot.batteries)
+        ):
+            snapshot = PlantSnapshot(inverter, tuple(batteries))
+        self._previous = snapshot
+        return PlausibilityResult(snapshot)
+
+    def _check_device(
+        self,
+        battery_id: int | None,
+        rules: _DeviceRules,
+        values: Mapping[str, Any],
+        previous: Mapping[str, Any] | None,
+        now: float,
+        keys: Collection[str] | None = None,
+    ) -> tuple[Mapping[str, Any], Rule | None]:
+        """Check the values of the inverter or a battery, or just some of them."""
+        actions: dict[str, tuple[Rule, Action]] = {}
+        corrupt_blocks: dict[RegisterBlock, Rule] = {}
+        for key, key_rules in rules.compile(values):
+            if keys is not None and key not in keys:
+                continue
+            value = values[key]
+            if not _is_number(value):
+                continue
+            prior = None if previous is None else previous.get(key)
+            changed_at = self._changed_at.get((battery_id, key))
+            elapsed = None if changed_at is None else now - changed_at
+            for rule in key_rules:
+                if not rule.violated(value, prior, elapsed):
+                    continue
+                if rule.relative and keys is None:
+                    self._holds[battery_id, key] += 1
+                    if self._holds[battery_id, key] > _MAX_CONSECUTIVE_HOLDS:
+                        self._accept(battery_id, key, now)
+                        break
+                self.violations[rule.name] += 1
+                if rule.corrupts_block:
+                    corrupt_blocks.update(
+                        dict.fromkeys(rules.key_blocks.get(key, ()), rule)
+                    )
+                else:
+                    actions[key] = (rule, rule.action)
+                break
+            else:
+                if keys is None and (changed_at is None or value != prior):
+                    self._accept(battery_id, key, now)
+
+        if corrupt_blocks:
+            for key in values:
+                for block in rules.key_blocks.get(key, ()):
+                    if block in corrupt_blocks:
+                        actions[key] = (corrupt_blocks[block], Action.HOLD)
+                        break
+        if not actions:
+            return values, None
+
+        checked = dict(values)
+        for key, (rule, action) in actions.items():
+            if action is Action.DROP:
+                checked[key] = None
+            elif previous is not None and key in previous:
+                checked[key] = previous[key]
+            else:
+                return values, rule
+        return MappingProxyType(checked), None
+
+    def _accept(self, battery_id: int | None, key: str, now: float) -> None:
+        """Record a value changing, e.g. after it was held."""
+        self._changed_at[battery_id, key] = now
+        self._holds.pop((battery_id, key), None)
+
+
+# The rules applying to each key, for the keys that have any
+_CompiledRules = tuple[tuple[str, tuple[Rule, ...]], ...]
+
+
+class _DeviceRules:
+    """The rules for a kind of device, compiled into the rules for each key."""
+
+    def __init__(
+        self, rules: Sequence[Rule], key_blocks: Mapping[str, frozenset[RegisterBlock]]
+    ) -> None:
+        self.rules = tuple(rules)
+        self.key_blocks = key_blocks
+        self._compiled: dict[frozenset[str], _CompiledRules] = {}
+
+    def compile(self, values: Mapping[str, Any]) -> _CompiledRules:
+        """Return the rules applying to each key with any, in rule order."""
+        keys = frozenset(values)
+        compiled = self._compiled.get(keys)
+        if compiled is None:
+            compiled = tuple(
+                (key, key_rules)
+                for key in values
+                if (key_rules := tuple(r for r in self.rules if r.matches(key)))
+            )
+            self._compiled[keys] = compiled
+        return compiled
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,222 @@
+"""Compact capture of the raw register blocks read from an inverter."""
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from datetime import datetime, timedelta, timezone
+import mmap
+from pathlib import Path
+import struct
+import threading
+import time
+
+from typing import IO, NamedTuple
+
+from givenergy_modbus.model.register import HoldingRegister, InputRegister, Register
+
+from .const import LOGGER
+from .register_map import BLOCK_SIZE, RegisterBlock
+
+# Each file starts with a header identifying the format and block size, followed by
+# fixed-width records, so that any record can be found by its index alone.
+_MAGIC = b"GERL"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+
+# A record is the time a block was read, which device it was read from (0 for the
+# inverter, otherwise one more than the battery index), the Modbus function code for
+# the register type, the base register, and the register values.
+_RECORD = struct.Struct(f"<dBBH{BLOCK_SIZE}H")
+RECORD_SIZE = _RECORD.size
+
+_FUNCTION_CODES: dict[type[Register], int] = {HoldingRegister: 3, InputRegister: 4}
+_REGISTER_TYPES = {code: kind for kind, code in _FUNCTION_CODES.items()}
+
+_FILE_PREFIX = "registers-"
+_FILE_SUFFIX = ".bin"
+
+# A new file is started at the start of each interval, and the oldest files are deleted once there are
+# more than the retained number of them (four weeks' worth by default).
+DEFAULT_ROTATE_INTERVAL = timedelta(days=1)
+DEFAULT_RETAINED_FILES = 28
+
+
+class RegisterRecord(NamedTuple):
+    """A block of registers, as read from a device at a point in time."""
+
+    timestamp: float
+    register_type: type[Register]
+    base_register: int
+    battery_id: int | None
+    values: tuple[int, ...]
+
+    @property
+    def block(self) -> RegisterBlock:
+        """Return the register block that was read."""
+        return RegisterBlock(self.register_type, self.base_register)
+
+    @property
+    def registers(self) -> dict[int, int]:
+        """Return the register values keyed by register index."""
+        return dict(enumerate(self.values, self.base_register))
+
+
+class RegisterRecorder:
+    """
+    Appends every register block read to a series of binary files in a directory.
+
+    Blocks are buffered in memory as they are read, and written out by `flush`, which
+    does blocking file I/O so must be run in an executor. About 130 bytes are written
+    for each block read, which comes to a few megabytes a day for a typical system.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        rotate_interval: timedelta = DEFAULT_ROTATE_INTERVAL,
+        retained_files: int = DEFAULT_RETAINED_FILES,
+    ) -> None:
+        """Initialize the recorder. No files are touched until the first flush."""
+        self.directory = directory
+        self._rotate_interval = rotate_interval.total_seconds()
+        self._retained_files = retained_files
+        self._pending: list[bytes] = []
+        self._pending_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._file: IO[bytes] | None = None
+        self._rotate_at = 0.0
+
+    def record(
+        self,
+        block: RegisterBlock,
+        battery_id: int | None,
+        values: Mapping[int, int],
+        timestamp: float | None = None,
+    ) -> None:
+        """Buffer a block that has just been read."""
+        record = _RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            0 if battery_id is None else battery_id + 1,
+            _FUNCTION_CODES[block.register_type],
+            block.base_register,
+            *(
+                values.get(block.base_register + i, 0) & 0xFFFF
+                for i in range(BLOCK_SIZE)
+            ),
+        )
+        with self._pending_lock:
+            self._pending.append(record)
+
+    def flush(self) -> None:
+        """Write out buffered blocks, starting a new file if it is time to."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        with self._file_lock:
+            # Records are filed by when they were read, not when they were flushed
+            timestamp = _RECORD.unpack_from(pending[0])[0]
+            if self._file is None or timestamp >= self._rotate_at:
+                self._rotate(timestamp)
+            assert self._file is not None
+            self._file.write(b"".join(pending))
+            self._file.flush()
+
+    def close(self) -> None:
+        """Write out buffered blocks and close the current file."""
+        self.flush()
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _rotate(self, timestamp: float) -> None:
+        """Start a new file, and delete files that are no longer retained."""
+        if self._file is not None:
+            self._file.close()
+
+        # Files cover whole intervals (e.g. UTC days), so that a restart carries on
+        # appending to the current file rather than starting another
+        started = timestamp - timestamp % self._rotate_interval
+        name = f"{datetime.fromtimestamp(started, timezone.utc):%Y%m%dT%H%M%S}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{_FILE_PREFIX}{name}{_FILE_SUFFIX}"
+        self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        if self._file.tell() == 0:
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION, BLOCK_SIZE))
+        self._rotate_at = started + self._rotate_interval
+
+        for expired in log_files(self.directory)[: -self._retained_files]:
+            LOGGER.debug("Deleting register log %s", expired)
+            expired.unlink()
+
+
+class RegisterLog:
+    """
+    Random access to the records in a register log file, which is memory mapped.
+
+    A partially written record at the end of the file, e.g. after a crash, is ignored.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open and map a register log file."""
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f"{path} is too short to be a register log")
+        magic, version, block_size = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION or block_size != BLOCK_SIZE:
+            self._map.close()
+            raise ValueError(f"{path} is not a supported register log")
+
+    def __enter__(self) -> RegisterLog:
+        """Use the log as a context manager, closing it on exit."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the log."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of complete records in the file."""
+        return (len(self._map) - _HEADER.size) // RECORD_SIZE
+
+    def __getitem__(self, index: int) -> RegisterRecord:
+        """Decode a single record."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        timestamp, device, function_code, base_register, *values = _RECORD.unpack_from(
+            self._map, _HEADER.size + index * RECORD_SIZE
+        )
+        return RegisterRecord(
+            timestamp,
+            _REGISTER_TYPES[function_code],
+            base_register,
+            device - 1 if device else None,
+            tuple(values),
+        )
+
+    def __iter__(self) -> Iterator[RegisterRecord]:
+        """Decode every record in turn."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+
+def log_files(directory: Path) -> list[Path]:
+    """Return the register log files in a directory, oldest first."""
+    return sorted(directory.glob(f"{_FILE_PREFIX}*{_FILE_SUFFIX}"))
+
+
+def read_logs(directory: Path) -> Iterator[RegisterRecord]:
+    """Read every record in a directory of register logs, oldest first."""
+    for path in log_files(directory):
+        with RegisterLog(path) as log:
+            yield from log
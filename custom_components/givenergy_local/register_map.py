@@ -0,0 +1,186 @@
+"""Mapping of decoded values to the register blocks they are read from."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+
+from typing import NamedTuple
+
+from givenergy_modbus.model.battery import Battery
+from givenergy_modbus.model.inverter import Inverter
+from givenergy_modbus.model.register import HoldingRegister, InputRegister, Register
+
+# Registers are always read in blocks of this size, aligned to a multiple of it.
+BLOCK_SIZE = 60
+
+# Batteries are addressed sequentially, starting from the same address as the inverter.
+INVERTER_SLAVE_ADDRESS = 0x32
+
+
+class RegisterBlock(NamedTuple):
+    """A block of registers read from a device in a single request."""
+
+    register_type: type[Register]
+    base_register: int
+
+
+class ReadPlan(NamedTuple):
+    """The register blocks to read from the inverter and from each battery."""
+
+    inverter: tuple[RegisterBlock, ...]
+    batteries: tuple[tuple[RegisterBlock, ...], ...]
+
+
+# Every block that holds decoded values, in the order givenergy_modbus reads them.
+INVERTER_BLOCKS = (
+    RegisterBlock(InputRegister, 0),
+    RegisterBlock(InputRegister, 180),
+    RegisterBlock(HoldingRegister, 0),
+    RegisterBlock(HoldingRegister, 60),
+    RegisterBlock(HoldingRegister, 120),
+)
+BATTERY_BLOCKS = (RegisterBlock(InputRegister, 60),)
+
+# Holding registers describing the inverter hardware (device type, module, MPPT and
+# phase counts, and the first battery's serial number), which only change if it is
+# replaced. They start the first holding register block.
+STATIC_BLOCK = RegisterBlock(HoldingRegister, 0)
+STATIC_REGISTERS = range(0, 13)
+
+# Holding registers with the inverter serial number and firmware versions, which are
+# cached along with the static registers to describe the inverter device.
+SERIAL_AND_FIRMWARE_REGISTERS = (13, 14, 15, 16, 17, 19, 21)
+
+# Values assembled from several registers by givenergy_modbus, rather than being named
+# after a single register (or a pair of _H/_L registers).
+_COMPOSITE_KEYS = {
+    "inverter_serial_number": (
+        "inverter_serial_number_1_2",
+        "inverter_serial_number_3_4",
+        "inverter_serial_number_5_6",
+        "inverter_serial_number_7_8",
+        "inverter_serial_number_9_10",
+    ),
+    "first_battery_serial_number": (
+        "first_battery_serial_number_1_2",
+        "first_battery_serial_number_3_4",
+        "first_battery_serial_number_5_6",
+        "first_battery_serial_number_7_8",
+        "first_battery_serial_number_9_10",
+    ),
+    "battery_serial_number": (
+        "battery_serial_number_1_2",
+        "battery_serial_number_3_4",
+        "battery_serial_number_5_6",
+        "battery_serial_number_7_8",
+        "battery_serial_number_9_10",
+    ),
+    "num_mppt": ("num_mppt_and_num_phases",),
+    "num_phases": ("num_mppt_and_num_phases",),
+    "system_time": (
+        "system_time_year",
+        "system_time_month",
+        "system_time_day",
+        "system_time_hour",
+        "system_time_minute",
+        "system_time_second",
+    ),
+    "charge_slot_1": ("charge_slot_1_start", "charge_slot_1_end"),
+    "charge_slot_2": ("charge_slot_2_start", "charge_slot_2_end"),
+    "discharge_slot_1": ("discharge_slot_1_start", "discharge_slot_1_end"),
+    "discharge_slot_2": ("discharge_slot_2_start", "discharge_slot_2_end"),
+    "inverter_model": ("inverter_serial_number",),
+    "firmware_version": ("dsp_firmware_version", "arm_firmware_version"),
+    "inverter_firmware_version": ("dsp_firmware_version", "arm_firmware_version"),
+}
+
+
+def registers_for_key(key: str) -> frozenset[Register]:
+    """
+    Work out which registers a decoded value depends on.
+
+    This mirrors the lookups done by RegisterCache and RegisterGetter in
+    givenergy_modbus, where holding registers take precedence over input registers
+    with the same name.
+    """
+    if key in _COMPOSITE_KEYS:
+        return frozenset().union(
+            *(registers_for_key(part) for part in _COMPOSITE_KEYS[key])
+        )
+
+    name = key.upper()
+    for register_type in (HoldingRegister, InputRegister):
+        if name in register_type.__members__:
+            return frozenset((register_type[name],))
+    for register_type in (HoldingRegister, InputRegister):
+        if (
+            f"{name}_H" in register_type.__members__
+            and f"{name}_L" in register_type.__members__
+        ):
+            return frozenset((register_type[f"{name}_H"], register_type[f"{name}_L"]))
+    raise KeyError(key)
+
+
+def _block_of(register: Register) -> RegisterBlock:
+    return RegisterBlock(type(register), register.value // BLOCK_SIZE * BLOCK_SIZE)
+
+
+def _build_key_blocks(keys: Iterable[str]) -> dict[str, frozenset[RegisterBlock]]:
+    return {
+        key: frozenset(_block_of(register) for register in registers_for_key(key))
+        for key in keys
+    }
+
+
+INVERTER_KEY_BLOCKS: Mapping[str, frozenset[RegisterBlock]] = _build_key_blocks(
+    (*Inverter.__fields__, "inverter_model", "firmware_version")
+)
+BATTERY_KEY_BLOCKS: Mapping[str, frozenset[RegisterBlock]] = _build_key_blocks(
+    Battery.__fields__
+)
+
+
+def blocks_for_keys(
+    key_blocks: Mapping[str, frozenset[RegisterBlock]],
+    all_blocks: tuple[RegisterBlock, ...],
+    keys: Iterable[str],
+) -> tuple[RegisterBlock, ...]:
+    """
+    Return the blocks needed to decode a set of values, in their usual read order.
+
+    Unknown keys are assumed to need every block, so a mistake can only cost wire time.
+    """
+    needed: set[RegisterBlock] = set()
+    for key in keys:
+        if key not in key_blocks:
+            return all_blocks
+        needed.update(key_blocks[key])
+    return tuple(block for block in all_blocks if block in needed)
+
+
+def blocks_for_registers(
+    register_type: type[Register], registers: Iterable[int]
+) -> list[RegisterBlock]:
+    """
+    Return the blocks holding some registers, given by index, in address order.
+
+    Requests for anything other than a whole block may be rejected by the inverter, so
+    even a single register is read as part of its block.
+    """
+    bases = {index - index % BLOCK_SIZE for index in registers}
+    return [RegisterBlock(register_type, base) for base in sorted(bases)]
+
+
+def full_read_plan(num_batteries: int) -> ReadPlan:
+    """Return a plan that reads every block from the inverter and all batteries."""
+    return ReadPlan(INVERTER_BLOCKS, (BATTERY_BLOCKS,) * num_batteries)
+
+
+def without_holding_registers(plan: ReadPlan) -> ReadPlan:
+    """Drop holding register blocks, which only change when written to, from a plan."""
+
+    def input_only(blocks: tuple[RegisterBlock, ...]) -> tuple[RegisterBlock, ...]:
+        return tuple(b for b in blocks if b.register_type is not HoldingRegister)
+
+    return ReadPlan(
+        input_only(plan.inverter), tuple(input_only(b) for b in plan.batteries)
+    )
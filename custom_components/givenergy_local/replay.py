@@ -0,0 +1,164 @@
+"""Replay of recorded register data through the coordinator."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable
+from datetime import datetime
+
+from givenergy_modbus.model.register import HoldingRegister, InputRegister, Register
+from homeassistant.util import dt
+
+from .clock import Clock
+from .coordinator import GivEnergyUpdateCoordinator
+from .recorder import RegisterRecord
+from .register_map import BLOCK_SIZE, INVERTER_SLAVE_ADDRESS
+from .transport import ModbusTransport, RequestTimeout
+
+_BlockKey = tuple[type[Register], int, int]
+
+
+def _block_key(record: RegisterRecord) -> _BlockKey:
+    """Identify a recorded block by what would be requested to read it."""
+    slave_address = INVERTER_SLAVE_ADDRESS + (record.battery_id or 0)
+    return record.register_type, record.base_register, slave_address
+
+
+class ReplayClock(Clock):
+    """Tells the time at which the blocks being replayed were recorded."""
+
+    def __init__(self) -> None:
+        """Initialize the clock at the start of the epoch, until records are replayed."""
+        self.timestamp = 0.0
+
+    def monotonic(self) -> float:
+        """Return the recorded time, in seconds since the epoch."""
+        return self.timestamp
+
+    def utcnow(self) -> datetime:
+        """Return the recorded date and time, in UTC."""
+        now: datetime = dt.utc_from_timestamp(self.timestamp)
+        return now
+
+
+class ReplayTransport(ModbusTransport):
+    """
+    Answers register reads with recorded register blocks, rather than an inverter.
+
+    Records are consumed a refresh at a time by `advance`, after which reads return
+    the most recently recorded values of each block, and the transport's clock tells
+    the time they were recorded. Writes are applied to those values, and kept in
+    `writes`, but otherwise go nowhere.
+    """
+
+    def __init__(self, records: Iterable[RegisterRecord]) -> None:
+        """Initialize the transport from records in the order they were read."""
+        super().__init__("replay")
+        self.clock: ReplayClock = ReplayClock()
+        self.writes: list[tuple[HoldingRegister, int]] = []
+        self._records = iter(records)
+        self._next = next(self._records, None)
+        self._blocks: dict[_BlockKey, dict[int, int]] = {}
+        self._connected = False
+
+    @property
+    def connected(self) -> bool:
+        """Return True if "connected", which costs nothing."""
+        return self._connected
+
+    async def connect(self) -> None:
+        """Pretend to connect."""
+        self._connected = True
+
+    def close(self) -> None:
+        """Pretend to disconnect."""
+        self._connected = False
+
+    def advance(self) -> list[RegisterRecord]:
+        """
+        Move on to the blocks read in the next recorded refresh, and return them.
+
+        A refresh is taken to end just before any block is read again. An empty list
+        is returned once every record has been replayed.
+        """
+        frame: list[RegisterRecord] = []
+        seen: set[_BlockKey] = set()
+        while self._next is not None and _block_key(self._next) not in seen:
+            key = _block_key(self._next)
+            seen.add(key)
+            frame.append(self._next)
+            self._blocks[key] = self._next.registers
+            self._next = next(self._records, None)
+        if frame:
+            self.clock.timestamp = frame[0].timestamp
+        return frame
+
+    async def read_registers(
+        self,
+        kind: type[HoldingRegister | InputRegister],
+        base_register: int,
+        register_count: int,
+        slave_address: int = INVERTER_SLAVE_ADDRESS,
+        timeout: float | None = None,
+    ) -> dict[int, int]:
+        """
+        Read registers from the blocks replayed so far, answering straight away.
+
+        Blocks that were never recorded are taken to have gone unanswered.
+        """
+        values = {}
+        for index in range(base_register, base_register + register_count):
+            block = self._blocks.get((kind, index - index % BLOCK_SIZE, slave_address))
+            if block is None:
+                raise RequestTimeout(
+                    f"No {kind.__name__} {index} recorded for slave {slave_address}"
+                )
+            values[index] = block[index]
+        return values
+
+    async def write_register(self, register: HoldingRegister, value: int) -> None:
+        """Apply a write to the replayed holding registers."""
+        if not register.write_safe:
+            raise ValueError(f"Register {register.name} is not safe to write to")
+        base_register = register.value - register.value % BLOCK_SIZE
+        block = self._blocks.get(
+            (HoldingRegister, base_register, INVERTER_SLAVE_ADDRESS)
+        )
+        if block is not None:
+            block[register.value] = value
+        self.writes.append((register, value))
+
+
+async def async_replay(
+    coordinator: GivEnergyUpdateCoordinator,
+    transport: ReplayTransport,
+    realtime: bool = False,
+    on_refresh: Callable[[float], None] | None = None,
+) -> int:
+    """
+    Refresh a coordinator reading through a replay transport once per recorded refresh.
+
+    Refreshes happen as fast as possible unless `realtime` is set, in which case they
+    are spaced out as they were recorded. Either way, the coordinator times them as
+    they were recorded, by the transport's clock. `on_refresh` is called with the recorded
+    time of each refresh once it has been made. Returns the number of refreshes.
+    """
+    loop = asyncio.get_running_loop()
+    coordinator.connection.sleep_between_queries = 0
+    refreshes = 0
+    offset: float | None = None
+    while frame := transport.advance():
+        timestamp = frame[0].timestamp
+        if realtime:
+            if offset is None:
+                offset = loop.time() - timestamp
+            await asyncio.sleep(max(timestamp + offset - loop.time(), 0))
+
+        # Holding registers are replayed when they were recorded, whenever the
+        # coordinator would otherwise have got round to a full refresh
+        if any(record.register_type is HoldingRegister for record in frame):
+            coordinator.require_full_refresh = True
+        await coordinator.async_refresh()
+        refreshes += 1
+        if on_refresh is not None:
+            on_refresh(timestamp)
+    return refreshes
@@ -0,0 +1,159 @@
+"""Retry policies and circuit breaking for requests to the inverter."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable
+from dataclasses import dataclass
+import random
+import time
+
+from typing import Callable, TypeVar
+
+import async_timeout
+
+from .const import LOGGER
+
+_T = TypeVar("_T")
+
+
+class CircuitOpenError(ConnectionError):
+    """The inverter is known to be unreachable, so the request wasn't attempted."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How to retry a failed request: how often, how long to wait, and when to give up.
+
+    Delays grow exponentially from `base_delay` up to `max_delay`, each shortened by a
+    random fraction of up to `jitter` so that retries from different callers spread
+    out. No attempt continues past `deadline` seconds from the first.
+    """
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 8.0
+    jitter: float = 0.25
+    deadline: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        """Return how long to wait after a given failed attempt (counting from 0)."""
+        delay = min(self.base_delay * 2.0**attempt, self.max_delay)
+        return delay * (1 - random.uniform(0, self.jitter))
+
+    @staticmethod
+    def is_retryable(err: BaseException) -> bool:
+        """
+        Return True if an error may well not recur on a second attempt.
+
+        Connection failures, timeouts and mismatched write echoes are all frustratingly
+        common with some data adapters. Invalid requests will never succeed, and
+        there's no point hammering an inverter already known to be unreachable.
+        """
+        if isinstance(err, CircuitOpenError):
+            return False
+        return isinstance(err, (ConnectionError, TimeoutError, OSError, AssertionError))
+
+
+async def async_retry(policy: RetryPolicy, func: Callable[[], Awaitable[_T]]) -> _T:
+    """Call a function until it succeeds, raising its last error if it never does."""
+    deadline = time.monotonic() + policy.deadline
+    attempt = 0
+    while True:
+        try:
+            async with async_timeout.timeout(deadline - time.monotonic()):
+                return await func()
+        except Exception as err:  # pylint: disable=broad-except
+            attempt += 1
+            delay = policy.delay(attempt - 1)
+            if (
+                not policy.is_retryable(err)
+                or attempt >= policy.max_attempts
+                or time.monotonic() + delay >= deadline
+            ):
+                raise
+            LOGGER.debug(
+                "Attempt %d failed, retrying in %.1fs: %r", attempt, delay, err
+            )
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while an inverter is unreachable.
+
+    After `failure_threshold` consecutive failures the circuit opens, and requests
+    raise CircuitOpenError without touching the network. The inverter is then probed
+    in the background, with exponential backoff, and the circuit closes again as soon
+    as a probe succeeds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[None]],
+        failure_threshold: int = 3,
+        probe_policy: RetryPolicy = RetryPolicy(
+            max_attempts=0, base_delay=5.0, max_delay=60.0
+        ),
+    ) -> None:
+        """Initialize a closed circuit."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_policy = probe_policy
+        self._probe = probe
+        self._consecutive_failures = 0
+        self._probe_task: asyncio.Task[None] | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if requests are currently being refused."""
+        return self._probe_task is not None
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if requests are currently being refused."""
+        if self.is_open:
+            raise CircuitOpenError(
+                f"{self.name} is unreachable, waiting for it to come back"
+            )
+
+    def record_success(self) -> None:
+        """Note that a request succeeded."""
+        self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Note that a request failed, opening the circuit if that's one too many."""
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold and not self.is_open:
+            LOGGER.warning(
+                "%s failed %d times in a row, pausing requests until it responds",
+                self.name,
+                self._consecutive_failures,
+            )
+            self._probe_task = asyncio.get_running_loop().create_task(
+                self._async_probe_until_reachable()
+            )
+
+    def cancel(self) -> None:
+        """Stop any background probing, leaving the circuit closed."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        self._consecutive_failures = 0
+
+    async def _async_probe_until_reachable(self) -> None:
+        """Probe in the background until the inverter responds, then close the circuit."""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.probe_policy.delay(attempt))
+            attempt += 1
+            try:
+                await self._probe()
+            except Exception as err:  # pylint: disable=broad-except
+                LOGGER.debug("Probe %d of %s failed: %r", attempt, self.name, err)
+                continue
+            break
+
+        LOGGER.info("%s is reachable again, resuming requests", self.name)
+        self._probe_task = None
+        self._consecutive_failures = 0
@@ -0,0 +1,95 @@
+"""Adaptive scheduling of inverter polls."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Mapping
+from datetime import time, timedelta
+from statistics import pstdev
+
+from typing import Any
+
+# Instantaneous power readings (in W) whose recent variation drives the poll interval
+POWER_KEYS = ("p_pv1", "p_pv2", "p_battery", "p_load_demand")
+
+# Slots and the flags enabling them, either of which speeds up polling while active
+SLOT_KEYS = {
+    "charge_slot_1": "enable_charge",
+    "charge_slot_2": "enable_charge",
+    "discharge_slot_1": "enable_discharge",
+    "discharge_slot_2": "enable_discharge",
+}
+
+# Number of recent polls used to assess how much power readings are varying
+_SAMPLE_COUNT = 5
+
+# Standard deviations (in W) below which power is considered steady, and above which
+# it is considered volatile enough to poll as often as allowed.
+_STEADY_STDEV = 50.0
+_VOLATILE_STDEV = 500.0
+
+
+class PollScheduler:
+    """
+    Picks the interval until the next poll, between configurable bounds.
+
+    Polls are as frequent as allowed while power readings are swinging or a write is
+    awaiting confirmation, and as infrequent as allowed when everything is steady
+    (e.g. overnight, with no PV and an idle battery). Active charge and discharge
+    slots keep the interval at or below the midpoint of the bounds.
+    """
+
+    def __init__(self, min_interval: timedelta, max_interval: timedelta) -> None:
+        """Initialize the scheduler with no history."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._samples: deque[tuple[float, ...]] = deque(maxlen=_SAMPLE_COUNT)
+
+    def record(self, data: Mapping[str, Any]) -> None:
+        """Record power readings from a successful poll."""
+        self._samples.append(tuple(float(data[key]) for key in POWER_KEYS))
+
+    def next_interval(
+        self, data: Mapping[str, Any], now: time, write_pending: bool = False
+    ) -> tuple[timedelta, str]:
+        """Return the interval until the next poll, with a description of the reason."""
+        if write_pending:
+            return self.min_interval, "write pending"
+        if len(self._samples) < 2:
+            return self.min_interval, "collecting samples"
+
+        stdev = max(pstdev(readings) for readings in zip(*self._samples))
+        fraction = (stdev - _STEADY_STDEV) / (_VOLATILE_STDEV - _STEADY_STDEV)
+        fraction = min(max(fraction, 0.0), 1.0)
+        interval = (
+            self.max_interval - (self.max_interval - self.min_interval) * fraction
+        )
+        if fraction >= 1.0:
+            reason = f"power volatile ({stdev:.0f} W)"
+        elif fraction > 0.0:
+            reason = f"power varying ({stdev:.0f} W)"
+        else:
+            reason = f"power steady ({stdev:.0f} W)"
+
+        midpoint = (self.min_interval + self.max_interval) / 2
+        if interval > midpoint:
+            active_slot = _active_slot(data, now)
+            if active_slot is not None:
+                return midpoint, f"{active_slot.replace('_', ' ')} active"
+
+        return interval, reason
+
+
+def _active_slot(data: Mapping[str, Any], now: time) -> str | None:
+    """Return the name of an enabled slot covering the current time, if any."""
+    for slot_key, enable_key in SLOT_KEYS.items():
+        start, end = data[slot_key]
+        if not data[enable_key] or start == end:
+            continue
+        if start < end:
+            active = start <= now < end
+        else:
+            # The slot runs past midnight, e.g. for overnight charging
+            active = now >= start or now < end
+        if active:
+            return slot_key
+    return None
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
+from operator import itemgetter
 
 from typing import Any
 
@@ -20,14 +21,21 @@ from homeassistant.const import (
     PERCENTAGE,
     POWER_WATT,
     TEMP_CELSIUS,
+    TIME_MILLISECONDS,
+    TIME_SECONDS,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import StateType
 
 from .const import DOMAIN, LOGGER, Icon
-from .coordinator import GivEnergyUpdateCoordinator
+from .coordinator import SIGNAL_BATTERIES_CHANGED, GivEnergyUpdateCoordinator
 from .entity import BatteryEntity, InverterEntity
+from .flows import FLOW_INPUT_KEYS
+from .metrics import PHASES
 
 _BASIC_INVERTER_SENSORS = [
     SensorEntityDescription(
@@ -305,6 +313,9 @@ _BATTERY_CELLS_VOLTAGE_SENSOR = SensorEntityDescription(
     native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
 )
 
+# Registers holding individual cell voltages, in cell order
+_CELL_VOLTAGE_KEYS = tuple(f"v_battery_cell_{i:02d}" for i in range(1, 17))
+
 _SOLAR_TO_HOUSE = SensorEntityDescription(
     key="solar_to_house",
     name="Solar to House",
@@ -368,6 +379,78 @@ _GRID_TO_HOUSE = SensorEntityDescription(
     native_unit_of_measurement=POWER_WATT,
 )
 
+_POWER_FLOW_SENSORS = (
+    _SOLAR_TO_HOUSE,
+    _SOLAR_TO_BATTERY,
+    _SOLAR_TO_GRID,
+    _BATTERY_TO_HOUSE,
+    _BATTERY_TO_GRID,
+    _GRID_TO_HOUSE,
+    _GRID_TO_BATTERY,
+)
+
+# Energy delivered by each power flow today, integrated from every refresh
+_FLOW_ENERGY_SENSORS = tuple(
+    SensorEntityDescription(
+        key=f"{description.key}_energy_today",
+        name=f"{description.name} Energy Today",
+        icon=description.icon,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+    )
+    for description in _POWER_FLOW_SENSORS
+)
+
+_UPDATE_INTERVAL_SENSOR = SensorEntityDescription(
+    key="update_interval",
+    name="Update Interval",
+    icon=Icon.UPDATE_INTERVAL,
+    device_class=SensorDeviceClass.DURATION,
+    native_unit_of_measurement=TIME_SECONDS,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+# Diagnostics about recent refreshes, disabled by default as they change constantly
+_REFRESH_TIME_NAMES = {
+    "connect": "Refresh Connect Time",
+    "read": "Refresh Read Time",
+    "decode": "Refresh Decode Time",
+    "validate": "Refresh Validate Time",
+    "fan_out": "Refresh Entity Update Time",
+    "fast_fan_out": "Fast Poll Entity Update Time",
+}
+_REFRESH_TIME_SENSORS = {
+    phase: SensorEntityDescription(
+        key=f"refresh_{phase}_time",
+        name=_REFRESH_TIME_NAMES[phase],
+        icon=Icon.REFRESH_TIME,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=TIME_MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    )
+    for phase in PHASES
+}
+_REFRESH_SUCCESS_RATE_SENSOR = SensorEntityDescription(
+    key="refresh_success_rate",
+    name="Refresh Success Rate",
+    icon=Icon.REFRESH_SUCCESS,
+    state_class=SensorStateClass.MEASUREMENT,
+    native_unit_of_measurement=PERCENTAGE,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+)
+_DISCARDED_FRAMES_SENSOR = SensorEntityDescription(
+    key="discarded_frames",
+    name="Discarded Frames",
+    icon=Icon.DISCARDED_FRAMES,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -387,6 +470,18 @@ async def async_setup_entry(
         ]
     )
 
+    entities.extend(
+        PowerFlowSensor(coordinator, config_entry, entity_description)
+        for entity_description in _POWER_FLOW_SENSORS
+    )
+    if coordinator.flow_energy is not None:
+        entities.extend(
+            FlowEnergySensor(coordinator, config_entry, entity_description, flow)
+            for entity_description, flow in zip(
+                _FLOW_ENERGY_SENSORS, _POWER_FLOW_SENSORS
+            )
+        )
+
     # Add other inverter sensors that require more customization
     # (e.g. sensors that derive values from several registers).
     entities.extend(
@@ -412,64 +507,107 @@ async def async_setup_entry(
             BatteryModeSensor(
                 coordinator, config_entry, entity_description=_BATTERY_MODE_SENSOR
             ),
-            SolarToHouse(
-                coordinator, config_entry, entity_description=_SOLAR_TO_HOUSE
-            ),
-            SolarToBattery(
-                coordinator, config_entry, entity_description=_SOLAR_TO_BATTERY
-            ),
-            SolarToGrid(
-                coordinator, config_entry, entity_description=_SOLAR_TO_GRID
+            UpdateIntervalSensor(
+                coordinator, config_entry, entity_description=_UPDATE_INTERVAL_SENSOR
             ),
-            BatteryToHouse(
-                coordinator, config_entry, entity_description=_BATTERY_TO_HOUSE
+            RefreshSuccessRateSensor(
+                coordinator,
+                config_entry,
+                entity_description=_REFRESH_SUCCESS_RATE_SENSOR,
             ),
-            BatteryToGrid(
-                coordinator, config_entry, entity_description=_BATTERY_TO_GRID
-            ),
-            GridToHouse(
-                coordinator, config_entry, entity_description=_GRID_TO_HOUSE
-            ),
-            GridToBattery(
-                coordinator, config_entry, entity_description=_GRID_TO_BATTERY
+            DiscardedFramesSensor(
+                coordinator, config_entry, entity_description=_DISCARDED_FRAMES_SENSOR
             ),
         ]
     )
+    entities.extend(
+        [
+            RefreshTimeSensor(coordinator, config_entry, entity_description, phase)
+            for phase, entity_description in _REFRESH_TIME_SENSORS.items()
+        ]
+    )
 
-    # Add battery sensors
-    for batt_num, batt in enumerate(coordinator.data.batteries):
-        # Only add data for batteries if we can successfully read the serial number
-        # Failure to read a S/N can result in null bytes
-        if batt.battery_serial_number.replace("\x00", ""):
-            entities.extend(
-                [
-                    BatteryBasicSensor(
-                        coordinator, config_entry, entity_description, batt_num
-                    )
-                    for entity_description in _BASIC_BATTERY_SENSORS
-                ]
-            )
+    async_add_entities(entities)
 
-            entities.extend(
-                [
-                    BatteryRemainingCapacitySensor(
-                        coordinator,
-                        config_entry,
-                        entity_description=_BATTERY_REMAINING_CAPACITY_SENSOR,
-                        battery_id=batt_num,
-                    ),
-                    BatteryCellsVoltageSensor(
-                        coordinator,
-                        config_entry,
-                        entity_description=_BATTERY_CELLS_VOLTAGE_SENSOR,
-                        battery_id=batt_num,
-                    ),
-                ]
-            )
-        else:
-            LOGGER.warning("Ignoring battery %d due to missing serial number", batt_num)
+    # Batteries can be attached, removed or replaced while running. Each battery
+    # with sensors is tracked by slot, along with its serial number.
+    batteries: dict[int, str] = {}
 
-    async_add_entities(entities)
+    async def _async_update_batteries() -> None:
+        assert coordinator.data is not None
+        serial_numbers = [
+            battery["battery_serial_number"] for battery in coordinator.data.batteries
+        ]
+        device_registry = dr.async_get(hass)
+        for battery_id, serial_number in list(batteries.items()):
+            if battery_id < len(serial_numbers) and (
+                serial_numbers[battery_id] == serial_number
+                # A misread serial number doesn't mean the battery was replaced
+                or not serial_numbers[battery_id].replace("\x00", "")
+            ):
+                continue
+            # Removing the device removes its entities too
+            LOGGER.info("Removing battery %s", serial_number)
+            del batteries[battery_id]
+            device = device_registry.async_get_device({(DOMAIN, serial_number)})
+            if device is not None:
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=config_entry.entry_id
+                )
+
+        new_entities: list[SensorEntity] = []
+        for battery_id, serial_number in enumerate(serial_numbers):
+            if battery_id in batteries:
+                continue
+            # Only add data for batteries if we can successfully read the serial number
+            # Failure to read a S/N can result in null bytes
+            if not serial_number.replace("\x00", ""):
+                LOGGER.warning(
+                    "Ignoring battery %d due to missing serial number", battery_id
+                )
+                continue
+            batteries[battery_id] = serial_number
+            new_entities.extend(_battery_sensors(coordinator, config_entry, battery_id))
+        if new_entities:
+            async_add_entities(new_entities)
+
+    await _async_update_batteries()
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_BATTERIES_CHANGED.format(coordinator.host),
+            _async_update_batteries,
+        )
+    )
+
+
+def _battery_sensors(
+    coordinator: GivEnergyUpdateCoordinator,
+    config_entry: ConfigEntry,
+    battery_id: int,
+) -> list[SensorEntity]:
+    """Create the sensors for a battery."""
+    entities: list[SensorEntity] = [
+        BatteryBasicSensor(coordinator, config_entry, entity_description, battery_id)
+        for entity_description in _BASIC_BATTERY_SENSORS
+    ]
+    entities.extend(
+        [
+            BatteryRemainingCapacitySensor(
+                coordinator,
+                config_entry,
+                entity_description=_BATTERY_REMAINING_CAPACITY_SENSOR,
+                battery_id=battery_id,
+            ),
+            BatteryCellsVoltageSensor(
+                coordinator,
+                config_entry,
+                entity_description=_BATTERY_CELLS_VOLTAGE_SENSOR,
+                battery_id=battery_id,
+            ),
+        ]
+    )
+    return entities
 
 
 class InverterBasicSensor(InverterEntity, SensorEntity):
@@ -484,52 +622,67 @@ class InverterBasicSensor(InverterEntity, SensorEntity):
         """Initialize a sensor based on an entity description."""
         super().__init__(coordinator, config_entry)
         self._attr_unique_id = (
-            f"{self.data.inverter_serial_number}_{entity_description.key}"
+            f"{self.data['inverter_serial_number']}_{entity_description.key}"
         )
         self.entity_description = entity_description
+        self._get_value = itemgetter(entity_description.key)
 
     @property
     def native_value(self) -> StateType:
         """Return the register value as referenced by the 'key' property of the associated entity description."""
-        return self.data.dict().get(self.entity_description.key)
+        return self._get_value(self.data)
 
 
 class PVEnergyTodaySensor(InverterBasicSensor):
     """Total PV Energy sensor."""
 
+    _attr_data_keys = ("e_pv1_day", "e_pv2_day")
+
     @property
     def native_value(self) -> StateType:
         """Return the sum of energy generated across both PV strings."""
-        return self.data.e_pv1_day + self.data.e_pv2_day
+        return self.data["e_pv1_day"] + self.data["e_pv2_day"]
 
 
 class PVPowerSensor(InverterBasicSensor):
     """Total PV Power sensor."""
 
+    _attr_data_keys = ("p_pv1", "p_pv2")
+
     @property
     def native_value(self) -> StateType:
         """Return the sum of power generated across both PV strings."""
-        return self.data.p_pv1 + self.data.p_pv2
+        return self.data["p_pv1"] + self.data["p_pv2"]
 
 
 class ConsumptionTodaySensor(InverterBasicSensor):
     """Consumption Today sensor."""
 
+    _attr_data_keys = (
+        "e_inverter_out_day",
+        "e_inverter_in_day",
+        "e_grid_in_day",
+        "e_grid_out_day",
+        "e_pv1_day",
+        "e_pv2_day",
+        "inverter_model",
+    )
+
     @property
     def native_value(self) -> StateType:
         """Calculate consumption based on net inverter output plus net grid import."""
 
         consumption_today = (
-            self.data.e_inverter_out_day
-            - self.data.e_inverter_in_day
-            + self.data.e_grid_in_day
-            - self.data.e_grid_out_day
+            self.data["e_inverter_out_day"]
+            - self.data["e_inverter_in_day"]
+            + self.data["e_grid_in_day"]
+            - self.data["e_grid_out_day"]
         )
 
         # For AC inverters, PV output doesn't count as part of the inverter output,
         # so we need to add it on.
-        if self.data.inverter_model == Model.AC:
-            consumption_today += self.data.e_pv1_day + self.data.e_pv2_day
+        if self.data["inverter_model"] == Model.AC:
+            consumption_today += self.data["e_pv1_day"] + self.data["e_pv2_day"]
 
         return consumption_today
 
@@ -537,20 +690,29 @@ class ConsumptionTodaySensor(InverterBasicSensor):
 class ConsumptionTotalSensor(InverterBasicSensor):
     """Consumption Total sensor."""
 
+    _attr_data_keys = (
+        "e_inverter_out_total",
+        "e_inverter_in_total",
+        "e_grid_in_total",
+        "e_grid_out_total",
+        "e_pv_total",
+        "inverter_model",
+    )
+
     @property
     def native_value(self) -> StateType:
         """Calculate consumption based on net inverter output plus net grid import."""
         consumption_total = (
-            self.data.e_inverter_out_total
-            - self.data.e_inverter_in_total
-            + self.data.e_grid_in_total
-            - self.data.e_grid_out_total
+            self.data["e_inverter_out_total"]
+            - self.data["e_inverter_in_total"]
+            + self.data["e_grid_in_total"]
+            - self.data["e_grid_out_total"]
         )
 
         # For AC inverters, PV output doesn't count as part of the inverter output,
         # so we need to add it on.
-        if self.data.inverter_model == Model.AC:
-            consumption_total += self.data.e_pv_total
+        if self.data["inverter_model"] == Model.AC:
+            consumption_total += self.data["e_pv_total"]
 
         return consumption_total
 
@@ -558,28 +720,36 @@ class ConsumptionTotalSensor(InverterBasicSensor):
 class GridImportPower(InverterBasicSensor):
     """Grid Import Power (absolute value derived from Grid Power if importing)"""
 
+    _attr_data_keys = ("p_grid_out",)
+
     @property
     def native_value(self) -> StateType:
         grid_import_power = 0
         """Or grid_import_power has a value if we're importing"""
-        if self.data.p_grid_out < 0:
-            grid_import_power = abs(self.data.p_grid_out)
+        if self.data["p_grid_out"] < 0:
+            grid_import_power = abs(self.data["p_grid_out"])
         return grid_import_power
-    
+
+
 class GridExportPower(InverterBasicSensor):
     """Grid Export Power (absolute value derived from Grid Power if exporting)"""
 
+    _attr_data_keys = ("p_grid_out",)
+
     @property
     def native_value(self) -> StateType:
         grid_export_power = 0
         """Or grid_export_power has a value if we're exporting"""
-        if self.data.p_grid_out > 0:
-            grid_export_power = abs(self.data.p_grid_out)
+        if self.data["p_grid_out"] > 0:
+            grid_export_power = abs(self.data["p_grid_out"])
         return grid_export_power
 
+
 class BatteryModeSensor(InverterBasicSensor):
     """Battery mode sensor."""
 
+    _attr_data_keys = ("battery_power_mode", "enable_discharge")
+
     @property
     def native_value(self) -> StateType:
         """Determine the mode based on various settings."""
@@ -587,8 +757,8 @@ class BatteryModeSensor(InverterBasicSensor):
         # battery_power_mode:
         # 0: export/max
         # 1: demand/self-consumption
-        battery_power_mode = self.data.battery_power_mode
-        enable_discharge = self.data.enable_discharge
+        battery_power_mode = self.data["battery_power_mode"]
+        enable_discharge = self.data["enable_discharge"]
 
         if battery_power_mode == 1 and enable_discharge is False:
             return "Eco"
@@ -619,24 +789,29 @@ class BatteryBasicSensor(BatteryEntity, SensorEntity):
         """Initialize a sensor based on an entity description."""
         super().__init__(coordinator, config_entry, battery_id)
         self._attr_unique_id = (
-            f"{self.data.battery_serial_number}_{entity_description.key}"
+            f"{self.data['battery_serial_number']}_{entity_description.key}"
         )
         self.entity_description = entity_description
+        self._get_value = itemgetter(entity_description.key)
 
     @property
     def native_value(self) -> StateType:
         """Get the register value whose name matches the entity key."""
-        return self.data.dict().get(self.entity_description.key)
+        return self._get_value(self.data)
 
 
 class BatteryRemainingCapacitySensor(BatteryBasicSensor):
     """Battery remaining capacity sensor."""
 
+    _attr_data_keys = ("battery_remaining_capacity", "v_battery_cells_sum")
+
     @property
     def native_value(self) -> StateType:
         """Map the low-level Ah value to energy in kWh."""
         battery_remaining_capacity = (
-            self.data.battery_remaining_capacity * self.data.v_battery_cells_sum / 1000
+            self.data["battery_remaining_capacity"]
+            * self.data["v_battery_cells_sum"]
+            / 1000
         )
         # Raw value is in Ah (Amp Hour)
         # Convert to KWh using formula Ah * V / 1000
@@ -646,136 +821,151 @@ class BatteryRemainingCapacitySensor(BatteryBasicSensor):
 class BatteryCellsVoltageSensor(BatteryBasicSensor):
     """Battery cell voltage sensor."""
 
+    _attr_data_keys = (
+        "v_battery_cells_sum",
+        "battery_num_cells",
+        *_CELL_VOLTAGE_KEYS,
+    )
+
     @property
     def extra_state_attributes(self) -> Mapping[str, Any] | None:
         """Expose individual cell voltages."""
-        num_cells = self.data.battery_num_cells
-        return self.data.dict(  # type: ignore[no-any-return]
-            include={f"v_battery_cell_{i:02d}" for i in range(1, num_cells + 1)}
-        )
-    
-    # POWER FLOW STATS
-    
-    # SOLAR TO HOUSE / BATTERY / GRID
-class SolarToHouse(InverterBasicSensor):
-    """Solar to house derivation"""
+        num_cells = self.data["battery_num_cells"]
+        return {key: self.data[key] for key in _CELL_VOLTAGE_KEYS[:num_cells]}
+
+
+class PowerFlowSensor(InverterBasicSensor):
+    """Power flowing from one source to one sink, e.g. solar to the battery."""
+
+    _attr_data_keys = FLOW_INPUT_KEYS
 
     @property
     def native_value(self) -> StateType:
-        PV_power = self.data.p_pv1 + self.data.p_pv2
-        if PV_power <= 0:
-            return 0
-        """min(PV_power, load_power)"""
-        ##!! with p_load_demand there's a section in givtcp about being <15500 - not really sure what that's for
-        S2H = min((self.data.p_pv1 + self.data.p_pv2),self.data.p_load_demand)
-        return S2H
-    
-class SolarToBattery(InverterBasicSensor):
-    """Solar to battery derivation"""
+        """Return the flow, as solved once for all flow sensors in the snapshot."""
+        flows = self.coordinator.data.flows
+        if flows is None:
+            return None
+        return getattr(flows, self.entity_description.key)
+
+
+class FlowEnergySensor(InverterBasicSensor):
+    """
+    Energy delivered by a power flow today.
+
+    The state is written when the power readings change, but the total is integrated
+    from every refresh regardless.
+    """
+
+    _attr_data_keys = FLOW_INPUT_KEYS
+
+    def __init__(
+        self,
+        coordinator: GivEnergyUpdateCoordinator,
+        config_entry: ConfigEntry,
+        entity_description: SensorEntityDescription,
+        flow: SensorEntityDescription,
+    ) -> None:
+        """Initialize a sensor totalling the power flow with a given description."""
+        super().__init__(coordinator, config_entry, entity_description)
+        self._flow = flow.key
 
     @property
     def native_value(self) -> StateType:
-        PV_power = self.data.p_pv1 + self.data.p_pv2
-        if PV_power <= 0:
-            return 0
-        """max((PV_power-S2H)-export_power,0)"""
-        S2H = min((self.data.p_pv1 + self.data.p_pv2),self.data.p_load_demand)
-        grid_export_power = 0
-        if self.data.p_grid_out > 0:
-            grid_export_power = abs(self.data.p_grid_out)
-        S2B = max((PV_power-S2H)-grid_export_power,0)
-        return S2B
+        """Return the energy in kWh, to the nearest Wh."""
+        assert self.coordinator.flow_energy is not None
+        return round(self.coordinator.flow_energy.totals[self._flow], 3)
+
+
+class UpdateIntervalSensor(InverterBasicSensor):
+    """The interval until the next update, as chosen by the poll scheduler."""
 
-class SolarToGrid(InverterBasicSensor):
-    """Solar to Grid derivation"""
+    _attr_data_keys = ()
 
     @property
     def native_value(self) -> StateType:
-        PV_power = self.data.p_pv1 + self.data.p_pv2
-        if PV_power <= 0:
-            return 0
-        """max(PV_power - S2H - S2B,0)"""
-        S2H = min((self.data.p_pv1 + self.data.p_pv2),self.data.p_load_demand)
-        grid_export_power = 0
-        if self.data.p_grid_out > 0:
-            grid_export_power = abs(self.data.p_grid_out)
-        S2B = max((PV_power - S2H) - grid_export_power,0)
-        S2G = max(PV_power - S2H - S2B,0)
-        return S2G
-    
-    #Battery to House
-class BatteryToHouse(InverterBasicSensor):
-    """Battery to house derivation"""
+        """Return the interval in seconds."""
+        if self.coordinator.update_interval is None:
+            return None
+        return self.coordinator.update_interval.total_seconds()
 
     @property
-    def native_value(self) -> StateType:
-        """max(discharge_power-export_power,0)"""
-        discharge_power = 0
-        battery_power = self.data.p_battery
-        if battery_power > 0:
-            discharge_power = abs(battery_power)
-        grid_export_power = 0
-        if self.data.p_grid_out > 0:
-            grid_export_power = abs(self.data.p_grid_out)
-        B2H = max(discharge_power - grid_export_power, 0)
-        return B2H
-    
-    #Battery to Grid
-class BatteryToGrid(InverterBasicSensor):
-    """Battery to Grid derivation"""
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Explain why the interval was chosen."""
+        return {"reason": self.coordinator.update_reason}
+
+
+class RefreshMetricSensor(InverterBasicSensor):
+    """A diagnostic sensor describing recent refreshes, rather than the inverter."""
+
+    _attr_data_keys = ()
+
+    @property
+    def available(self) -> bool:
+        """Return True, since metrics are most useful when refreshes are failing."""
+        return True
+
+
+class RefreshTimeSensor(RefreshMetricSensor):
+    """The median time taken by a phase of recent refreshes."""
+
+    def __init__(
+        self,
+        coordinator: GivEnergyUpdateCoordinator,
+        config_entry: ConfigEntry,
+        entity_description: SensorEntityDescription,
+        phase: str,
+    ) -> None:
+        """Initialize a sensor for a single phase of refreshes."""
+        super().__init__(coordinator, config_entry, entity_description)
+        self._histogram = coordinator.metrics.phases[phase]
+        self._phase = phase
 
     @property
     def native_value(self) -> StateType:
-        """max(discharge_power-B2H,0)"""
-        discharge_power = 0
-        battery_power = self.data.p_battery
-        if battery_power > 0:
-            discharge_power = abs(battery_power)
-        grid_export_power = 0
-        if self.data.p_grid_out > 0:
-            grid_export_power = abs(self.data.p_grid_out)
-        B2H = max(discharge_power - grid_export_power, 0)
-        B2G = max(discharge_power - B2H, 0)
-        return B2G
-    
-    #Grid to Battery
-class GridToBattery(InverterBasicSensor):
-    """Grid to Battery derivation"""
+        """Return the median time in milliseconds."""
+        return _round(self._histogram.percentile(50))
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Describe the rest of the distribution, and that of each block read."""
+        attributes: dict[str, Any] = {
+            "p90": _round(self._histogram.percentile(90)),
+            "p99": _round(self._histogram.percentile(99)),
+            "samples": len(self._histogram),
+        }
+        if self._phase == "read":
+            attributes["blocks"] = {
+                label: {
+                    "p50": _round(histogram.percentile(50)),
+                    "p90": _round(histogram.percentile(90)),
+                }
+                for label, histogram in self.coordinator.metrics.blocks.items()
+            }
+        return attributes
+
+
+class RefreshSuccessRateSensor(RefreshMetricSensor):
+    """The percentage of recent refreshes that succeeded."""
 
     @property
     def native_value(self) -> StateType:
-        """charge_power-max(PV_power-Load_power,0) unless grid import power > 0"""
-        G2B = 0
-        grid_import_power = 0
-        if self.data.p_grid_out < 0:
-            grid_import_power = abs(self.data.p_grid_out)
-        if grid_import_power > 0:
-            return G2B
-        PV_power = self.data.p_pv1 + self.data.p_pv2
-        load_power = self.data.p_load_demand
-        charge_power = 0
-        battery_power = self.data.p_battery
-        if battery_power > 0:
-            charge_power = abs(battery_power)
-        G2B = charge_power - max(PV_power-load_power,0)
-        return G2B
- 
-    #Grid to House
-class GridToHouse(InverterBasicSensor):
-    """Grid to house derivation"""
+        """Return the success rate."""
+        return _round(self.coordinator.metrics.success_rate)
+
+
+class DiscardedFramesSensor(RefreshMetricSensor):
+    """The number of implausible sets of data discarded since starting up."""
 
     @property
     def native_value(self) -> StateType:
-        """charge_power-max(PV_power-Load_power,0) unless grid import power > 0"""
-        G2H = 0
-        grid_import_power = 0
-        if self.data.p_grid_out < 0:
-            grid_import_power = abs(self.data.p_grid_out)
-        if grid_import_power > 0:
-            return G2H
-        charge_power = 0
-        battery_power = self.data.p_battery
-        if battery_power > 0:
-            charge_power = abs(battery_power)
-        G2H = max(grid_import_power-charge_power,0)
-        return G2H
+        """Return the number of discarded frames."""
+        return self.coordinator.metrics.discarded_frames
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return how many implausible values each plausibility rule has caught."""
+        return dict(self.coordinator.plausibility.violations)
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
@@ -13,22 +13,18 @@ from .const import DOMAIN, LOGGER
 from .coordinator import GivEnergyUpdateCoordinator
 from .givenergy_ext import async_reliable_call
 
-# A bit of a workaround for flaky modbus connections.
-# We try to call services a few times, and only allow the exception to escape after we've
-# made this many attempts.
-_MAX_ATTEMPTS = 5
-_DELAY_BETWEEN_ATTEMPTS = 2.0
-
 _ATTR_POWER = "power"
 _ATTR_START_TIME = "start_time"
 _ATTR_END_TIME = "end_time"
 _ATTR_CHARGE_TARGET = "charge_target"
+_ATTR_FORCE = "force"
 
 # Shared schema used for setting charge/discharge power limits.
 _SET_POWER_SCHEMA = vol.Schema(
     {
         vol.Required(ATTR_DEVICE_ID): str,
         vol.Required(_ATTR_POWER): vol.All(vol.Coerce(int), vol.Range(min=0, max=2600)),
+        vol.Optional(_ATTR_FORCE, default=False): bool,
     }
 )
 
@@ -38,6 +34,7 @@ _TIME_SPAN_SCHEMA = vol.Schema(
         vol.Required(ATTR_DEVICE_ID): str,
         vol.Required(_ATTR_START_TIME): str,
         vol.Required(_ATTR_END_TIME): str,
+        vol.Optional(_ATTR_FORCE, default=False): bool,
     }
 )
 
@@ -48,7 +45,12 @@ _SERVICE_SET_DISCHARGE_LIMIT = "set_discharge_limit"
 _SERVICE_SET_DISCHARGE_LIMIT_SCHEMA = _SET_POWER_SCHEMA
 
 _SERVICE_ACTIVATE_ECO = "activate_mode_eco"
-_SERVICE_ACTIVATE_ECO_SCHEMA = vol.Schema({vol.Required(ATTR_DEVICE_ID): str})
+_SERVICE_ACTIVATE_ECO_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): str,
+        vol.Optional(_ATTR_FORCE, default=False): bool,
+    }
+)
 
 _SERVICE_ACTIVATE_TIMED_DISCHARGE = "activate_mode_timed_discharge"
 _SERVICE_ACTIVATE_TIMED_DISCHARGE_SCHEMA = _TIME_SPAN_SCHEMA
@@ -65,11 +67,17 @@ _SERVICE_ENABLE_TIMED_CHARGE_SCHEMA = vol.Schema(
         vol.Optional(_ATTR_CHARGE_TARGET): vol.All(
             vol.Coerce(int), vol.Range(min=4, max=100)
         ),
+        vol.Optional(_ATTR_FORCE, default=False): bool,
     }
 )
 
 _SERVICE_DISABLE_TIMED_CHARGE = "disable_timed_charge"
-_SERVICE_DISABLE_TIMED_CHARGE_SCHEMA = vol.Schema({vol.Required(ATTR_DEVICE_ID): str})
+_SERVICE_DISABLE_TIMED_CHARGE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): str,
+        vol.Optional(_ATTR_FORCE, default=False): bool,
+    }
+)
 
 _SUPPORTED_SERVICES = [
     _SERVICE_SET_CHARGE_LIMIT,
@@ -136,7 +144,10 @@ async def _async_get_config_entries(hass: HomeAssistant, device_id: str) -> set[
 
 
 async def _async_service_call(
-    hass: HomeAssistant, device_id: str, func: Callable[[GivEnergyClient], None]
+    hass: HomeAssistant,
+    device_id: str,
+    func: Callable[[GivEnergyClient], None],
+    force: bool = False,
 ) -> None:
     # Just take the first matching config entry
     # We really shouldn't have multiple entries for the same device ID
@@ -146,7 +157,7 @@ async def _async_service_call(
 
     config_entry = entries.pop()
     coordinator: GivEnergyUpdateCoordinator = hass.data[DOMAIN][config_entry]
-    await async_reliable_call(hass, coordinator, func)
+    await async_reliable_call(hass, coordinator, func, force)
 
 
 async def _async_set_charge_power_limit(
@@ -168,7 +179,7 @@ async def _async_set_charge_power_limit(
 
         client.set_battery_charge_limit(target_value)
 
-    await _async_service_call(hass, data[ATTR_DEVICE_ID], call)
+    await _async_service_call(hass, data[ATTR_DEVICE_ID], call, data[_ATTR_FORCE])
 
 
 async def _async_set_discharge_power_limit(
@@ -192,7 +203,7 @@ async def _async_set_discharge_power_limit(
 
         client.set_battery_discharge_limit(target_value)
 
-    await _async_service_call(hass, data[ATTR_DEVICE_ID], call)
+    await _async_service_call(hass, data[ATTR_DEVICE_ID], call, data[_ATTR_FORCE])
 
 
 async def _async_activate_mode_eco(hass: HomeAssistant, data: dict[str, Any]) -> None:
@@ -202,7 +213,7 @@ async def _async_activate_mode_eco(hass: HomeAssistant, data: dict[str, Any]) ->
         LOGGER.debug("Activating eco mode")
         client.set_mode_dynamic()
 
-    await _async_service_call(hass, data[ATTR_DEVICE_ID], call)
+    await _async_service_call(hass, data[ATTR_DEVICE_ID], call, data[_ATTR_FORCE])
 
 
 async def _async_activate_mode_timed_discharge(
@@ -221,7 +232,7 @@ async def _async_activate_mode_timed_discharge(
         client.enable_discharge()
         client.set_discharge_slot_1([start_time, end_time])
 
-    await _async_service_call(hass, data[ATTR_DEVICE_ID], call)
+    await _async_service_call(hass, data[ATTR_DEVICE_ID], call, data[_ATTR_FORCE])
 
 
 async def _async_activate_mode_timed_export(
@@ -240,7 +251,7 @@ async def _async_activate_mode_timed_export(
         client.enable_discharge()
         client.set_discharge_slot_1([start_time, end_time])
 
-    await _async_service_call(hass, data[ATTR_DEVICE_ID], call)
+    await _async_service_call(hass, data[ATTR_DEVICE_ID], call, data[_ATTR_FORCE])
 
 
 async def _async_enable_timed_charge(hass: HomeAssistant, data: dict[str, Any]) -> None:
@@ -264,7 +275,7 @@ async def _async_enable_timed_charge(hass: HomeAssistant, data: dict[str, Any])
         if _ATTR_CHARGE_TARGET in data:
             client.enable_charge_target(data[_ATTR_CHARGE_TARGET])
 
-    await _async_service_call(hass, data[ATTR_DEVICE_ID], call)
+    await _async_service_call(hass, data[ATTR_DEVICE_ID], call, data[_ATTR_FORCE])
 
 
 async def _async_disable_timed_charge(
@@ -276,4 +287,4 @@ async def _async_disable_timed_charge(
         LOGGER.debug("Deactivating timed charge mode")
         client.disable_charge()
 
-    await _async_service_call(hass, data[ATTR_DEVICE_ID], call)
+    await _async_service_call(hass, data[ATTR_DEVICE_ID], call, data[_ATTR_FORCE])
@@ -0,0 +1,79 @@
+"""Decoded register snapshots shared by all entities."""
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+
+from typing import Any
+
+from givenergy_modbus.model.plant import Plant
+
+from .flows import PowerFlows
+
+# Marks power flows that haven't been solved yet
+_UNSOLVED: Any = object()
+
+
+class PlantSnapshot:
+    """
+    A flat, read-only view of every decoded value from a single refresh.
+
+    Decoding the pydantic models in givenergy_modbus is expensive (every access to
+    `Plant.inverter` rebuilds the model from the register cache), so it is done exactly
+    once per coordinator update. Entities then read plain dictionary values keyed by
+    register name. Power flows between devices are likewise solved once, when first
+    read by any of the flow sensors.
+    """
+
+    __slots__ = ("inverter", "batteries", "_flows")
+
+    inverter: Mapping[str, Any]
+    batteries: Sequence[Mapping[str, Any]]
+
+    def __init__(
+        self, inverter: Mapping[str, Any], batteries: Sequence[Mapping[str, Any]]
+    ) -> None:
+        """Initialize the snapshot from already decoded values."""
+        self.inverter = inverter
+        self.batteries = batteries
+        self._flows: PowerFlows | None = _UNSOLVED
+
+    @property
+    def flows(self) -> PowerFlows | None:
+        """Return the power flows between devices, or None if they are unknown."""
+        if self._flows is _UNSOLVED:
+            self._flows = PowerFlows.solve(self.inverter)
+        return self._flows
+
+    @classmethod
+    def from_plant(cls, plant: Plant) -> PlantSnapshot:
+        """Decode all inverter and battery values held in a plant's register caches."""
+        return cls(
+            MappingProxyType(plant.inverter.dict()),
+            tuple(MappingProxyType(battery.dict()) for battery in plant.batteries),
+        )
+
+    def changed_keys(
+        self, previous: PlantSnapshot
+    ) -> tuple[frozenset[str], tuple[frozenset[str], ...]] | None:
+        """
+        Find the inverter and battery values that differ from an earlier snapshot.
+
+        Returns None if the snapshots can't be compared, i.e. everything has changed.
+        """
+        if len(self.batteries) != len(previous.batteries):
+            return None
+        return _changed_keys(self.inverter, previous.inverter), tuple(
+            _changed_keys(current, earlier)
+            for current, earlier in zip(self.batteries, previous.batteries)
+        )
+
+
+def _changed_keys(
+    current: Mapping[str, Any], previous: Mapping[str, Any]
+) -> frozenset[str]:
+    return frozenset(
+        key
+        for key, value in current.items()
+        if key not in previous or previous[key] != value
+    )
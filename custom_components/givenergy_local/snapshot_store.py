@@ -0,0 +1,80 @@
+"""Persistence of the registers behind the last good snapshot, to start up from."""
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from datetime import datetime
+
+from typing import Any
+
+from givenergy_modbus.model.plant import Plant
+from givenergy_modbus.model.register import HoldingRegister, InputRegister, Register
+from givenergy_modbus.model.register_cache import RegisterCache
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt
+
+_STORAGE_VERSION = 1
+
+# Registers are keyed as givenergy_modbus formats them, e.g. "HR:035"
+_REGISTER_TYPES: dict[str, type[Register]] = {
+    "HR": HoldingRegister,
+    "IR": InputRegister,
+}
+
+
+class SnapshotStore:
+    """
+    Saves the raw registers of a plant, rather than decoded values.
+
+    Registers are far more compact than decoded values, and are decoded by exactly the
+    same code as a live refresh when restored.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the store. Nothing is loaded until `async_load`."""
+        self._store: Store[dict[str, Any]] = Store(hass, _STORAGE_VERSION, key)
+
+    async def async_load(self, plant: Plant) -> datetime | None:
+        """
+        Load saved registers into a plant's register caches.
+
+        The plant is given a register cache for every battery saved, whatever the
+        number of batteries it was created with. Returns when the registers were
+        saved, or None if nothing was saved.
+        """
+        data = await self._store.async_load()
+        if data is None:
+            return None
+        plant.inverter_rc.update(_registers_from_json(data["inverter"]))
+        plant.batteries_rcs[:] = [
+            RegisterCache(dict(_registers_from_json(registers)))
+            for registers in data["batteries"]
+        ]
+        saved_at: datetime | None = dt.parse_datetime(data["saved_at"])
+        return saved_at
+
+    async def async_save(self, plant: Plant) -> None:
+        """Save a plant's registers straight away."""
+        await self._store.async_save(_data_to_save(plant))
+
+    async def async_remove(self) -> None:
+        """Delete the saved registers."""
+        await self._store.async_remove()
+
+
+def _data_to_save(plant: Plant) -> dict[str, Any]:
+    return {
+        "saved_at": dt.utcnow().isoformat(),
+        "inverter": _registers_to_json(plant.inverter_rc),
+        "batteries": [_registers_to_json(rc) for rc in plant.batteries_rcs],
+    }
+
+
+def _registers_to_json(register_cache: RegisterCache) -> dict[str, int]:
+    return {str(register): value for register, value in register_cache.items()}
+
+
+def _registers_from_json(data: Mapping[str, int]) -> Iterator[tuple[Register, int]]:
+    for key, value in data.items():
+        kind, index = key.split(":", 1)
+        yield _REGISTER_TYPES[kind](int(index)), value
@@ -0,0 +1,90 @@
+"""Cache of the holding registers describing an inverter's hardware."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from itertools import chain
+
+from typing import Any
+
+from givenergy_modbus.model.inverter import Inverter
+from givenergy_modbus.model.register import HoldingRegister
+from givenergy_modbus.model.register_cache import RegisterCache
+from givenergy_modbus.model.register_getter import RegisterGetter
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import DOMAIN, LOGGER
+from .register_map import SERIAL_AND_FIRMWARE_REGISTERS, STATIC_REGISTERS
+
+_STORAGE_VERSION = 1
+
+# Every register that is cached, so that the inverter device can be described (by
+# serial number, model and firmware version) without reading anything
+CACHED_REGISTERS = tuple(sorted(chain(STATIC_REGISTERS, SERIAL_AND_FIRMWARE_REGISTERS)))
+
+
+class StaticRegisterCache:
+    """
+    Static holding registers of the inverter at a host, saved across restarts.
+
+    The registers are only used to describe the inverter device before the inverter
+    has been read. Full refreshes always read them, keeping the cache up to date.
+    """
+
+    def __init__(self, hass: HomeAssistant, host: str) -> None:
+        """Initialize an empty cache. Call `async_load` to load saved registers."""
+        self.registers: dict[int, int] | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, _STORAGE_VERSION, f"{DOMAIN}.static_registers.{slugify(host)}"
+        )
+
+    async def async_load(self) -> None:
+        """Load the saved registers, if any."""
+        data = await self._store.async_load()
+        if data is not None and data["registers"] is not None:
+            self.registers = {
+                int(index): value for index, value in data["registers"].items()
+            }
+
+    def device_values(self) -> dict[str, Any] | None:
+        """Decode the values describing the inverter device, if any are cached."""
+        if self.registers is None:
+            return None
+        register_cache = RegisterCache()
+        register_cache.set_registers(HoldingRegister, self.registers)
+        getter = RegisterGetter(register_cache)
+        values = {
+            key: getter.get(key)
+            for key in (
+                "inverter_serial_number",
+                "dsp_firmware_version",
+                "arm_firmware_version",
+            )
+        }
+        # Derived just as givenergy_modbus derives them when decoding the inverter
+        values = Inverter.compute_model(values)
+        computed: dict[str, Any] = Inverter.compute_firmware_version(values)
+        return computed
+
+    def async_update(self, registers: Mapping[HoldingRegister, int]) -> None:
+        """Cache freshly read registers, saving them if they have changed."""
+        cached = {
+            index: registers[HoldingRegister(index)] for index in CACHED_REGISTERS
+        }
+        if cached != self.registers:
+            LOGGER.debug("Caching static registers %s", cached)
+            self.registers = cached
+            self._store.async_delay_save(self._data_to_save)
+
+    async def async_save(self) -> None:
+        """Save the cached registers straight away."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the saved registers."""
+        self.registers = None
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"registers": self.registers}
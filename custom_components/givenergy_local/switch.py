@@ -48,13 +48,13 @@ class InverterChargeSwitch(InverterEntity, SwitchEntity):
         """Initialize the switch."""
         super().__init__(coordinator, config_entry)
         self._attr_unique_id = (
-            f"{self.data.inverter_serial_number}_{self.entity_description.key}"
+            f"{self.data['inverter_serial_number']}_{self.entity_description.key}"
         )
 
     @property
     def is_on(self) -> bool | None:
         """Return true if the switch is on."""
-        return self.data.enable_charge  # type: ignore
+        return self.data["enable_charge"]  # type: ignore
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Enable AC charging, subject to charge slot configuration."""
@@ -98,13 +98,13 @@ class InverterDischargeSwitch(InverterEntity, SwitchEntity):
         """Initialize the switch."""
         super().__init__(coordinator, config_entry)
         self._attr_unique_id = (
-            f"{self.data.inverter_serial_number}_{self.entity_description.key}"
+            f"{self.data['inverter_serial_number']}_{self.entity_description.key}"
         )
 
     @property
     def is_on(self) -> bool | None:
         """Return true if the switch is on."""
-        return self.data.enable_discharge  # type: ignore
+        return self.data["enable_discharge"]  # type: ignore
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Enable DC charging, subject to mode and discharge slot configuration."""
@@ -148,13 +148,13 @@ class InverterEcoModeSwitch(InverterEntity, SwitchEntity):
         """Initialize the switch."""
         super().__init__(coordinator, config_entry)
         self._attr_unique_id = (
-            f"{self.data.inverter_serial_number}_{self.entity_description.key}"
+            f"{self.data['inverter_serial_number']}_{self.entity_description.key}"
         )
 
     @property
     def is_on(self) -> bool | None:
         """Return true if the switch is on."""
-        return self.data.battery_power_mode  # type: ignore
+        return self.data["battery_power_mode"]  # type: ignore
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Enable Eco/Dynamic mode."""
@@ -0,0 +1,246 @@
+"""Native asyncio Modbus TCP transport for GivEnergy inverters."""
+from __future__ import annotations
+
+import asyncio
+import socket
+import struct
+
+from typing import Callable
+
+import async_timeout
+from givenergy_modbus.decoder import GivEnergyResponseDecoder
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+from givenergy_modbus.pdu import (
+    ModbusPDU,
+    ReadHoldingRegistersRequest,
+    ReadHoldingRegistersResponse,
+    ReadInputRegistersRequest,
+    ReadInputRegistersResponse,
+    ReadRegistersResponse,
+    WriteHoldingRegisterRequest,
+    WriteHoldingRegisterResponse,
+)
+
+from .clock import SYSTEM_CLOCK, Clock
+from .const import LOGGER
+from .register_map import INVERTER_SLAVE_ADDRESS
+
+DEFAULT_PORT = 8899
+
+# How long to wait for the TCP connection to be established, and for the response to
+# any single request. These match the defaults used by givenergy_modbus.
+_CONNECT_TIMEOUT = 2.0
+_REQUEST_TIMEOUT = 2.0
+
+# Every frame starts with this header. See GivEnergyModbusFramer for the gory details.
+_FRAME_HEAD = struct.Struct(">HHHBB")  # tid, pid, length, uid, fid
+_TRANSACTION_ID = 0x5959
+_PROTOCOL_ID = 0x0001
+_UNIT_ID = 0x01
+_FUNCTION_ID = 0x02
+
+# TCP keepalive settings, so that a dead peer is noticed by the OS rather than
+# on the next request.
+_KEEPALIVE_IDLE_SECONDS = 30
+_KEEPALIVE_INTERVAL_SECONDS = 10
+_KEEPALIVE_PROBES = 3
+
+_READ_PDUS: dict[
+    type[HoldingRegister | InputRegister],
+    tuple[type[ModbusPDU], type[ReadRegistersResponse]],
+] = {
+    HoldingRegister: (ReadHoldingRegistersRequest, ReadHoldingRegistersResponse),
+    InputRegister: (ReadInputRegistersRequest, ReadInputRegistersResponse),
+}
+
+
+class TransportError(ConnectionError):
+    """The connection to the inverter failed, or it returned a malformed frame."""
+
+
+class RequestTimeout(TransportError):
+    """No response to a request arrived in time."""
+
+
+class ModbusTransport:
+    """
+    A Modbus TCP connection to a GivEnergy inverter, driven entirely by asyncio.
+
+    Requests are sent one at a time. Callers are responsible for serializing access.
+    A request that is cancelled, or times out partway through reading a frame, leaves
+    the connection in an unknown state, so the connection is closed and must be
+    reopened before the next request. Otherwise a late response is simply ignored.
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT) -> None:
+        """Initialize the transport. No connection is made until `connect` is called."""
+        self.host = host
+        self.port = port
+        # Times the values read, as they are read live
+        self.clock: Clock = SYSTEM_CLOCK
+        self._decoder = GivEnergyResponseDecoder()
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        # Set while part of a frame has been read, and the rest is still to come
+        self._in_frame = False
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the connection appears to be usable."""
+        return (
+            self._reader is not None
+            and self._writer is not None
+            and not self._reader.at_eof()
+            and not self._writer.is_closing()
+        )
+
+    async def connect(self) -> None:
+        """Open the TCP connection to the inverter."""
+        self.close()
+        try:
+            async with async_timeout.timeout(_CONNECT_TIMEOUT):
+                self._reader, self._writer = await asyncio.open_connection(
+                    self.host, self.port
+                )
+        except (OSError, asyncio.TimeoutError) as err:
+            raise TransportError(
+                f"Unable to connect to {self.host}:{self.port}: {err!r}"
+            ) from err
+
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            _enable_keepalive(sock)
+        LOGGER.debug("Connected to %s:%s", self.host, self.port)
+
+    def close(self) -> None:
+        """Close the connection, if open."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+        self._in_frame = False
+
+    async def read_registers(
+        self,
+        kind: type[HoldingRegister | InputRegister],
+        base_register: int,
+        register_count: int,
+        slave_address: int = INVERTER_SLAVE_ADDRESS,
+        timeout: float = _REQUEST_TIMEOUT,
+    ) -> dict[int, int]:
+        """
+        Read a block of registers, returning values keyed by register index.
+
+        Raises RequestTimeout if no response arrives within `timeout` seconds.
+        """
+        request_type, response_type = _READ_PDUS[kind]
+        request = request_type(
+            base_register=base_register,
+            register_count=register_count,
+            slave_address=slave_address,
+        )
+
+        def matches(pdu: ModbusPDU) -> bool:
+            return (
+                isinstance(pdu, response_type)
+                and pdu.base_register == base_register
+                and pdu.register_count == register_count
+            )
+
+        response = await self._execute(request, matches, timeout)
+        return response.to_dict()  # type: ignore[no-any-return]
+
+    async def write_register(self, register: HoldingRegister, value: int) -> None:
+        """Write a value to a single holding register, checking it was accepted."""
+        if not register.write_safe:
+            raise ValueError(f"Register {register.name} is not safe to write to")
+        if value != value & 0xFFFF:
+            raise ValueError(f"Value {value} must fit in 2 bytes")
+
+        LOGGER.info("Writing %d to holding register %s", value, register.name)
+        request = WriteHoldingRegisterRequest(register=register.value, value=value)
+
+        def matches(pdu: ModbusPDU) -> bool:
+            return (
+                isinstance(pdu, WriteHoldingRegisterResponse)
+                and pdu.register == register.value
+            )
+
+        response = await self._execute(request, matches, _REQUEST_TIMEOUT)
+        if response.value != value:
+            raise AssertionError(
+                f"Register read-back value 0x{response.value:04x} != "
+                f"written value 0x{value:04x}"
+            )
+
+    async def _execute(
+        self, request: ModbusPDU, matches: Callable[[ModbusPDU], bool], timeout: float
+    ) -> ModbusPDU:
+        """Send a request and wait for the matching response."""
+        if not self.connected:
+            await self.connect()
+        assert self._writer is not None
+
+        pdu = request.encode()
+        frame = (
+            _FRAME_HEAD.pack(
+                _TRANSACTION_ID, _PROTOCOL_ID, len(pdu) + 2, _UNIT_ID, _FUNCTION_ID
+            )
+            + pdu
+        )
+
+        try:
+            async with async_timeout.timeout(timeout):
+                self._writer.write(frame)
+                await self._writer.drain()
+
+                # Anything that doesn't match the request is either unsolicited
+                # (e.g. a heartbeat), or a late response to an earlier request.
+                while True:
+                    response = await self._read_frame()
+                    if response is not None and matches(response):
+                        return response
+                    LOGGER.debug("Ignoring unexpected frame %s", response)
+        except TransportError:
+            self.close()
+            raise
+        except asyncio.TimeoutError as err:
+            if self._in_frame:
+                self.close()
+            raise RequestTimeout(f"Timed out waiting for {self.host}") from err
+        except (OSError, asyncio.IncompleteReadError) as err:
+            self.close()
+            raise TransportError(f"Connection to {self.host} failed: {err!r}") from err
+        except BaseException:
+            # Most likely cancelled, with a response still in flight
+            self.close()
+            raise
+
+    async def _read_frame(self) -> ModbusPDU | None:
+        """Read and decode a single frame."""
+        assert self._reader is not None
+        header = await self._reader.readexactly(_FRAME_HEAD.size)
+        tid, pid, length, _, fid = _FRAME_HEAD.unpack(header)
+        if tid != _TRANSACTION_ID or pid != _PROTOCOL_ID or length < 2:
+            raise TransportError(f"Invalid frame header received: {header.hex()}")
+
+        self._in_frame = True
+        body = await self._reader.readexactly(length - 2)
+        self._in_frame = False
+        try:
+            return self._decoder.decode(bytes([fid]) + body)
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug("Unable to decode frame %s: %s", body.hex(), err)
+            return None
+
+
+def _enable_keepalive(sock: socket.socket) -> None:
+    """Enable TCP keepalive probes on a socket, where the platform supports them."""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in (
+        ("TCP_KEEPIDLE", _KEEPALIVE_IDLE_SECONDS),
+        ("TCP_KEEPINTVL", _KEEPALIVE_INTERVAL_SECONDS),
+        ("TCP_KEEPCNT", _KEEPALIVE_PROBES),
+    ):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
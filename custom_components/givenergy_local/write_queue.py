@@ -0,0 +1,209 @@
+"""Coalescing queue for register writes."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+
+from typing import TYPE_CHECKING, Callable
+
+from givenergy_modbus.client import GivEnergyClient
+from givenergy_modbus.model.register import HoldingRegister
+from homeassistant.core import HomeAssistant
+
+from .connection import record_writes
+from .const import LOGGER
+from .retry import RetryPolicy, async_retry
+
+if TYPE_CHECKING:
+    from .coordinator import GivEnergyUpdateCoordinator
+
+# Writes submitted within this many seconds of each other are sent together
+_COALESCE_WINDOW = 0.5
+
+# A bit of a workaround for flaky modbus connections.
+# We try to write a batch a few times, and only fail the callers whose registers
+# still haven't been written once the policy gives up.
+_RETRY_POLICY = RetryPolicy(
+    max_attempts=5, base_delay=1.0, max_delay=8.0, deadline=30.0
+)
+
+
+@dataclass
+class _PendingWrite:
+    """Register writes requested by a single caller, and the caller's result."""
+
+    writes: list[tuple[HoldingRegister, int]]
+    force: bool = False
+    result: asyncio.Future[bool] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class WriteQueue:
+    """
+    Batches register writes made to an inverter in quick succession.
+
+    Writes arriving within a short window are merged and sent in a single Modbus
+    session, with only the latest value written to each register. The written
+    registers are then read back to confirm the whole batch, and the values read are
+    pushed to entities straight away. Each caller still sees its own success or failure.
+
+    Registers recently read with the requested value are not written at all, since
+    automations often repeat the same settings and each write wears the inverter's
+    EEPROM. Callers can force such writes.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: GivEnergyUpdateCoordinator
+    ) -> None:
+        """Initialize an empty queue."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._batch: list[_PendingWrite] | None = None
+        self._in_flight = 0
+
+    @property
+    def pending(self) -> bool:
+        """Return True if any writes are waiting to be sent or confirmed."""
+        return self._in_flight > 0
+
+    async def async_call(
+        self, func: Callable[[GivEnergyClient], None], force: bool = False
+    ) -> bool:
+        """
+        Queue the register writes made by a function, waiting until they are done.
+
+        Returns False if none of the registers needed to be written.
+        """
+        pending = _PendingWrite(record_writes(func), force)
+        if not pending.writes:
+            return False
+
+        if self._batch is None:
+            self._batch = []
+            self.hass.async_create_background_task(
+                self._async_flush(self._batch),
+                f"givenergy_local write {self.coordinator.host}",
+            )
+        self._batch.append(pending)
+        return await asyncio.shield(pending.result)
+
+    async def _async_flush(self, batch: list[_PendingWrite]) -> None:
+        """Send a batch of writes once the window for merging writes has passed."""
+        self._in_flight += 1
+        try:
+            try:
+                await asyncio.sleep(_COALESCE_WINDOW)
+            finally:
+                self._batch = None
+
+            writes = self._skip_unchanged(batch)
+            failures = await self._async_write(writes) if writes else {}
+            written = {
+                register: value
+                for register, value in writes.items()
+                if register not in failures
+            }
+            if written:
+                failures.update(await self._async_verify(written))
+        except BaseException as err:
+            for pending in batch:
+                if isinstance(err, asyncio.CancelledError):
+                    pending.result.cancel()
+                else:
+                    pending.result.set_exception(err)
+            raise
+        finally:
+            self._in_flight -= 1
+
+        for pending in batch:
+            errors = [failures[reg] for reg, _ in pending.writes if reg in failures]
+            if errors:
+                pending.result.set_exception(errors[0])
+            else:
+                pending.result.set_result(
+                    any(register in writes for register, _ in pending.writes)
+                )
+
+    def _skip_unchanged(self, batch: list[_PendingWrite]) -> dict[HoldingRegister, int]:
+        """Merge the writes in a batch, leaving out any that wouldn't change anything."""
+        forced = {
+            register
+            for pending in batch
+            if pending.force
+            for register, _ in pending.writes
+        }
+        writes = {}
+        for register, value in _merge(batch).items():
+            if (
+                register not in forced
+                and self.coordinator.cached_holding_register(register) == value
+            ):
+                LOGGER.debug("Skipping write to %s, already %d", register.name, value)
+            else:
+                writes[register] = value
+        return writes
+
+    async def _async_write(
+        self, writes: dict[HoldingRegister, int]
+    ) -> dict[HoldingRegister, Exception]:
+        """Write registers, returning the errors for those that couldn't be written."""
+        remaining = dict(writes)
+        LOGGER.debug("Writing %d registers", len(remaining))
+
+        def on_written(register: HoldingRegister, value: int) -> None:
+            del remaining[register]
+
+        try:
+            await async_retry(
+                _RETRY_POLICY,
+                lambda: self.coordinator.connection.async_write_registers(
+                    list(remaining.items()), on_written
+                ),
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.error("Write failed %s", err)
+            return {register: err for register in remaining}
+        return {}
+
+    async def _async_verify(
+        self, written: dict[HoldingRegister, int]
+    ) -> dict[HoldingRegister, Exception]:
+        """
+        Read back written registers, returning errors for those that didn't stick.
+
+        The values read are shown straight away. Should they be unreadable, or be
+        rejected as implausible, a full refresh is requested instead, trusting the
+        values echoed by the inverter.
+        """
+        try:
+            values = await self.coordinator.connection.async_read_holding_registers(
+                written
+            )
+        except ConnectionError as err:
+            LOGGER.warning("Unable to read back written registers: %s", err)
+            await self.coordinator.async_request_full_refresh()
+            return {}
+
+        if not self.coordinator.async_update_holding_registers(values):
+            LOGGER.warning("Written registers read back implausibly, refreshing")
+            await self.coordinator.async_request_full_refresh()
+            return {}
+        return {
+            register: AssertionError(
+                f"Register {register.name} read back as {values.get(register)}, "
+                f"not the written value {value}"
+            )
+            for register, value in written.items()
+            if values.get(register) != value
+        }
+
+
+def _merge(batch: list[_PendingWrite]) -> dict[HoldingRegister, int]:
+    """Merge the writes in a batch, dropping any superseded by later writes."""
+    merged: dict[HoldingRegister, int] = {}
+    for pending in batch:
+        for register, value in pending.writes:
+            merged.pop(register, None)
+            merged[register] = value
+    return merged
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""CLI tool for benchmarking data handling used by the integration."""
+
+import argparse
+import logging
+from operator import itemgetter
+import timeit
+from types import MappingProxyType
+
+from givenergy_modbus.model.plant import Plant
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+
+logging.basicConfig(format="%(name)s %(levelname)s %(message)s", level=logging.INFO)
+
+# Register values that need to be something other than zero in order to decode
+_HOLDING_REGISTER_VALUES = {
+    13: 0x5344,  # "SD" - inverter serial number prefix used to determine the model
+    14: 0x3132,
+    15: 0x3334,
+    16: 0x3536,
+    17: 0x3738,
+    35: 22,  # system time year (offset from 2000)
+    36: 1,  # system time month
+    37: 1,  # system time day
+    55: 160,  # battery nominal capacity
+}
+_INPUT_REGISTER_VALUES = {
+    18: 1500,  # p_pv1
+    20: 900,  # p_pv2
+    41: 315,  # temp_inverter_heatsink
+    42: 650,  # p_load_demand
+    46: 12345,  # e_inverter_out_total
+    52: 400,  # p_battery
+    55: 280,  # temp_charger
+}
+_BATTERY_REGISTER_VALUES = {
+    97: 16,  # battery_num_cells
+    100: 67,  # battery_soc
+    110: 0x4247,  # "BG" - battery serial number
+}
+
+
+def build_plant(num_batteries: int) -> Plant:
+    """Build a plant with every register populated with a plausible value."""
+    plant = Plant(number_batteries=num_batteries)
+    plant.inverter_rc.set_registers(
+        HoldingRegister,
+        {i: _HOLDING_REGISTER_VALUES.get(i, 0) for i in range(180)},
+    )
+    plant.inverter_rc.set_registers(
+        InputRegister,
+        {i: _INPUT_REGISTER_VALUES.get(i, 0) for i in range(240)},
+    )
+    for battery_rc in plant.batteries_rcs:
+        battery_rc.set_registers(
+            InputRegister,
+            {i: _BATTERY_REGISTER_VALUES.get(i, 0) for i in range(60, 120)},
+        )
+    return plant
+
+
+class SnapshotBenchmark:
+    """Compares per-entity model decoding with a single shared snapshot per update."""
+
+    def __init__(self, num_batteries: int, num_entities: int) -> None:
+        """Prepare a populated plant and the set of keys read by simulated entities."""
+        self.plant = build_plant(num_batteries)
+        keys = list(self.plant.inverter.dict().keys())
+        self.keys = [keys[i % len(keys)] for i in range(num_entities)]
+        self.accessors = [itemgetter(key) for key in self.keys]
+
+    def per_entity_decode(self) -> None:
+        """Emulate each entity decoding the full inverter model to read a single value."""
+        for key in self.keys:
+            self.plant.inverter.dict().get(key)
+
+    def shared_snapshot(self) -> None:
+        """Emulate one decode per update, with entities reading from the snapshot."""
+        inverter = MappingProxyType(self.plant.inverter.dict())
+        batteries = tuple(
+            MappingProxyType(battery.dict()) for battery in self.plant.batteries
+        )
+        for accessor in self.accessors:
+            accessor(inverter)
+        assert len(batteries) == len(self.plant.batteries_rcs)
+
+    def run(self, iterations: int) -> None:
+        """Time both strategies and log the cost per coordinator update."""
+        for name in ("per_entity_decode", "shared_snapshot"):
+            elapsed = timeit.timeit(getattr(self, name), number=iterations)
+            logging.info(
+                "%-18s %4d entities: %8.3f ms per update",
+                name,
+                len(self.keys),
+                elapsed / iterations * 1000,
+            )
+
+
+def main() -> None:
+    """Main entry point of the CLI tool."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-b", "--batteries", type=int, default=2, help="Number of simulated batteries"
+    )
+    parser.add_argument(
+        "-e",
+        "--entities",
+        type=int,
+        nargs="+",
+        default=[25, 50, 100],
+        help="Number of entities reading values on each update",
+    )
+    parser.add_argument(
+        "-n", "--iterations", type=int, default=20, help="Updates to time"
+    )
+    args = parser.parse_args()
+
+    for num_entities in args.entities:
+        SnapshotBenchmark(args.batteries, num_entities).run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
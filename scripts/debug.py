@@ -3,11 +3,14 @@
 """CLI tool for inverter debugging."""
 
 import argparse
+import asyncio
 import json
 import logging
+import threading
 
 from givenergy_modbus.client import GivEnergyClient
 from givenergy_modbus.model.plant import Plant
+from simulator import InverterSimulator
 
 logging.basicConfig(format="%(name)s %(levelname)s %(message)s", level=logging.INFO)
 
@@ -15,11 +18,11 @@ logging.basicConfig(format="%(name)s %(levelname)s %(message)s", level=logging.I
 class InverterDebugger:
     """Provides debugging tools that read and display inverter data at various levels."""
 
-    def __init__(self, host: str, num_batteries: int) -> None:
+    def __init__(self, host: str, num_batteries: int, port: int = 8899) -> None:
         """Initialize the inverter client and perform a full refresh"""
         self.num_batteries = num_batteries
         self.plant = Plant(number_batteries=num_batteries)
-        self.client = GivEnergyClient(host=host)
+        self.client = GivEnergyClient(host=host, port=port)
 
     def full_refresh(self) -> None:
         """Performs a full refresh of inverter and battery data."""
@@ -49,16 +52,38 @@ class InverterDebugger:
             print(self.plant.batteries[battery_id].json(indent=2))
 
 
+def start_simulator(num_batteries: int) -> InverterSimulator:
+    """Serve a simulated inverter from a background thread."""
+    simulator = InverterSimulator(num_batteries)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(simulator.start(), loop).result()
+    return simulator
+
+
 def main() -> None:
     """Main entry point of the CLI tool."""
     parser = argparse.ArgumentParser()
-    parser.add_argument("inverter_host", help="Hostname or IP address of the inverter")
+    parser.add_argument(
+        "inverter_host", nargs="?", help="Hostname or IP address of the inverter"
+    )
     parser.add_argument(
         "-b", "--batteries", type=int, default=0, help="Number of attached batteries"
     )
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="Debug a simulated inverter, rather than a real one",
+    )
     args = parser.parse_args()
 
-    debugger = InverterDebugger(args.inverter_host, args.batteries)
+    if args.simulate:
+        simulator = start_simulator(args.batteries)
+        debugger = InverterDebugger("127.0.0.1", args.batteries, simulator.port)
+    elif args.inverter_host:
+        debugger = InverterDebugger(args.inverter_host, args.batteries)
+    else:
+        parser.error("an inverter host is required, unless simulating")
     debugger.full_refresh()
     debugger.display_raw_registers()
     debugger.display_decoded_data()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+
+"""Simulated GivEnergy inverter, speaking Modbus over TCP."""
+
+import argparse
+import asyncio
+import logging
+import random
+import struct
+
+from typing import Optional
+
+from givenergy_modbus.decoder import GivEnergyRequestDecoder
+from givenergy_modbus.pdu import (
+    ModbusPDU,
+    ReadHoldingRegistersRequest,
+    ReadHoldingRegistersResponse,
+    ReadInputRegistersRequest,
+    ReadInputRegistersResponse,
+    WriteHoldingRegisterRequest,
+    WriteHoldingRegisterResponse,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Every frame starts with this header: tid, pid, length, uid, fid
+_FRAME_HEAD = struct.Struct(">HHHBB")
+
+# The inverter, and the first battery, answer at this address. Further batteries
+# answer at the following addresses.
+_INVERTER_SLAVE_ADDRESS = 0x32
+
+# Battery data lives in this range of input registers
+_BATTERY_REGISTERS = range(60, 120)
+
+INVERTER_SERIAL_NUMBER = "SD2223G123"
+DATA_ADAPTER_SERIAL_NUMBER = "WF2223G456"
+
+
+def _serial_registers(base: int, serial_number: str) -> dict[int, int]:
+    """Encode a 10 character serial number into 5 registers, 2 characters apiece."""
+    return {
+        base + i: int.from_bytes(serial_number[i * 2 : i * 2 + 2].encode(), "big")
+        for i in range(5)
+    }
+
+
+def _battery_serial_number(inverter_serial_number: str, battery_id: int) -> str:
+    return f"BG{inverter_serial_number[5:]}{battery_id:03d}"
+
+
+def _double(base: int, value: int) -> dict[int, int]:
+    """Split a 32-bit value into a pair of high and low registers."""
+    return {base: value >> 16, base + 1: value & 0xFFFF}
+
+
+# Register values of a typical hybrid inverter with a battery, mid-afternoon.
+# Scaling follows givenergy_modbus, e.g. voltages and temperatures are in 0.1 units.
+HOLDING_REGISTERS = {
+    0: 0x2001,  # device type code
+    3: 0x0201,  # 2 MPPTs, 1 phase
+    **_serial_registers(8, _battery_serial_number(INVERTER_SERIAL_NUMBER, 0)),
+    **_serial_registers(13, INVERTER_SERIAL_NUMBER),
+    18: 3005,  # first battery BMS firmware version
+    19: 449,  # DSP firmware version
+    21: 449,  # ARM firmware version
+    27: 1,  # battery power mode (eco)
+    30: 0x11,  # Modbus address
+    34: 0x0149,  # Modbus version
+    35: 22,  # system time year (offset from 2000)
+    36: 6,  # system time month
+    37: 1,  # system time day
+    38: 14,  # system time hour
+    39: 30,  # system time minute
+    47: 1,  # meter type
+    50: 100,  # active power rate
+    54: 1,  # battery type (lithium)
+    55: 160,  # battery nominal capacity
+    56: 1600,  # discharge slot 1 start
+    57: 1900,  # discharge slot 1 end
+    94: 30,  # charge slot 1 start
+    95: 430,  # charge slot 1 end
+    96: 1,  # enable charge
+    110: 4,  # battery SOC reserve
+    111: 50,  # battery charge limit
+    112: 50,  # battery discharge limit
+    114: 4,  # battery discharge min power reserve
+    116: 100,  # charge target SOC
+}
+INPUT_REGISTERS = {
+    0: 1,  # inverter status
+    1: 3500,  # v_pv1
+    2: 3200,  # v_pv2
+    5: 2410,  # v_ac1
+    **_double(6, 5000),  # e_battery_throughput_total
+    8: 43,  # i_pv1
+    9: 28,  # i_pv2
+    **_double(11, 45678),  # e_pv_total
+    13: 5000,  # f_ac1
+    17: 52,  # e_pv1_day
+    18: 1500,  # p_pv1
+    19: 31,  # e_pv2_day
+    20: 900,  # p_pv2
+    **_double(21, 12000),  # e_grid_out_total
+    24: 2000,  # p_inverter_out
+    25: 12,  # e_grid_out_day
+    26: 40,  # e_grid_in_day
+    **_double(27, 8000),  # e_inverter_in_total
+    30: 350,  # p_grid_out
+    **_double(32, 30000),  # e_grid_in_total
+    35: 20,  # e_inverter_in_day
+    36: 45,  # e_battery_charge_day
+    37: 30,  # e_battery_discharge_day
+    41: 315,  # temp_inverter_heatsink
+    42: 650,  # p_load_demand
+    44: 80,  # e_inverter_out_day
+    **_double(45, 12345),  # e_inverter_out_total
+    **_double(47, 8760),  # work_time_total
+    49: 1,  # system mode
+    50: 5200,  # v_battery
+    51: 77,  # i_battery
+    52: 400,  # p_battery
+    53: 2400,  # v_eps_backup
+    54: 5000,  # f_eps_backup
+    55: 280,  # temp_charger
+    56: 200,  # temp_battery
+    59: 67,  # battery_percent
+    180: 2500,  # e_battery_discharge_total
+    181: 2600,  # e_battery_charge_total
+    182: 30,  # e_battery_discharge_day_2
+    183: 45,  # e_battery_charge_day_2
+}
+
+
+def battery_registers(
+    battery_id: int, inverter_serial_number: str = INVERTER_SERIAL_NUMBER
+) -> dict[int, int]:
+    """Return the input register values of a typical battery."""
+    return {
+        **{i: 3250 for i in range(60, 76)},  # cell voltages
+        **{i: 200 for i in range(76, 80)},  # cell temperatures
+        80: 52000,  # v_battery_cells_sum
+        81: 220,  # temp_bms_mos
+        **_double(82, 52000),  # v_battery_out
+        **_double(84, 15900),  # battery_full_capacity
+        **_double(86, 16000),  # battery_design_capacity
+        **_double(88, 10653),  # battery_remaining_capacity
+        96: 120,  # battery_num_cycles
+        97: 16,  # battery_num_cells
+        98: 3005,  # bms_firmware_version
+        100: 67,  # battery_soc
+        **_double(101, 16000),  # battery_design_capacity_2
+        103: 210,  # temp_battery_max
+        104: 195,  # temp_battery_min
+        105: 2500,  # e_battery_discharge_total_2
+        106: 2600,  # e_battery_charge_total_2
+        **_serial_registers(
+            110, _battery_serial_number(inverter_serial_number, battery_id)
+        ),
+    }
+
+
+class InverterSimulator:
+    """
+    A simulated inverter with a number of batteries, served on a local TCP port.
+
+    Register blocks are served with realistic values, and writes are applied to the
+    holding registers. The simulator can also misbehave like real data adapters do:
+    responding slowly and erratically, dropping requests altogether, or returning
+    input registers that are all zero.
+    """
+
+    def __init__(
+        self,
+        num_batteries: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        drop_rate: float = 0.0,
+        zero_rate: float = 0.0,
+        seed: Optional[int] = None,
+        serial_number: str = INVERTER_SERIAL_NUMBER,
+    ) -> None:
+        """Initialize the simulated registers. Nothing is served until started."""
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.zero_rate = zero_rate
+        self.serial_number = serial_number
+        self.holding_registers = {
+            **HOLDING_REGISTERS,
+            **_serial_registers(8, _battery_serial_number(serial_number, 0)),
+            **_serial_registers(13, serial_number),
+        }
+        self.input_registers = dict(INPUT_REGISTERS)
+        self.battery_registers = [
+            battery_registers(i, serial_number) for i in range(num_batteries)
+        ]
+        self.requests = 0
+        self.writes: list[tuple[int, int]] = []
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def port(self) -> int:
+        """Return the port the simulator is listening on."""
+        assert self._server is not None, "Simulator not started"
+        return int(self._server.sockets[0].getsockname()[1])
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening for connections. By default, any free port is used."""
+        self._server = await asyncio.start_server(self._async_serve, host, port)
+        _LOGGER.info("Simulating inverter on %s:%d", host, self.port)
+
+    async def stop(self) -> None:
+        """Stop listening, and close the listening socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "InverterSimulator":
+        """Start the simulator for the duration of a context."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the simulator on leaving a context."""
+        await self.stop()
+
+    def registers(self, request: ModbusPDU) -> dict[int, int]:
+        """Return the registers a read request is answered from."""
+        if isinstance(request, ReadHoldingRegistersRequest):
+            return self.holding_registers
+        battery_id = request.slave_address - _INVERTER_SLAVE_ADDRESS
+        if request.base_register in _BATTERY_REGISTERS:
+            if 0 <= battery_id < len(self.battery_registers):
+                return self.battery_registers[battery_id]
+            return {}
+        return self.input_registers
+
+    def respond(self, request: ModbusPDU) -> Optional[ModbusPDU]:
+        """Work out the response to a request, if it would be answered at all."""
+        self.requests += 1
+        if self._random.random() < self.drop_rate:
+            _LOGGER.debug("Dropping %s", request)
+            return None
+
+        serial_numbers = {
+            "inverter_serial_number": self.serial_number,
+            "data_adapter_serial_number": DATA_ADAPTER_SERIAL_NUMBER,
+            "slave_address": request.slave_address,
+        }
+        if isinstance(request, WriteHoldingRegisterRequest):
+            self.holding_registers[request.register] = request.value
+            self.writes.append((request.register, request.value))
+            return WriteHoldingRegisterResponse(
+                register=request.register, value=request.value, **serial_numbers
+            )
+
+        registers = self.registers(request)
+        if isinstance(request, ReadInputRegistersRequest):
+            response_type = ReadInputRegistersResponse
+            if self._random.random() < self.zero_rate:
+                _LOGGER.debug("Zeroing response to %s", request)
+                registers = {}
+        else:
+            response_type = ReadHoldingRegistersResponse
+        base = request.base_register
+        return response_type(
+            base_register=base,
+            register_count=request.register_count,
+            register_values=[
+                registers.get(i, 0) for i in range(base, base + request.register_count)
+            ],
+            **serial_numbers,
+        )
+
+    async def _async_serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        decoder = GivEnergyRequestDecoder()
+        try:
+            while True:
+                header = await reader.readexactly(_FRAME_HEAD.size)
+                tid, pid, length, uid, fid = _FRAME_HEAD.unpack(header)
+                body = await reader.readexactly(length - 2)
+                response = self.respond(decoder.decode(bytes([fid]) + body))
+                delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if response is not None:
+                    pdu = response.encode()
+                    writer.write(
+                        _FRAME_HEAD.pack(tid, pid, len(pdu) + 2, uid, fid) + pdu
+                    )
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    simulator = InverterSimulator(
+        args.batteries, args.latency, args.jitter, args.drop_rate, args.zero_rate
+    )
+    await simulator.start(args.host, args.port)
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    """Main entry point of the CLI tool."""
+    logging.basicConfig(format="%(name)s %(levelname)s %(message)s", level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument(
+        "-p", "--port", type=int, default=8899, help="Port to listen on"
+    )
+    parser.add_argument(
+        "-b", "--batteries", type=int, default=0, help="Number of attached batteries"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds taken to respond"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Random variation in latency"
+    )
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="Fraction of requests ignored"
+    )
+    parser.add_argument(
+        "--zero-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of input register responses that are all zero",
+    )
+    try:
+        asyncio.run(_async_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
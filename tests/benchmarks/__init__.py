@@ -0,0 +1 @@
+"""Benchmarks for givenergy_local integration."""
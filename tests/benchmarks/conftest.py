@@ -0,0 +1,90 @@
+"""Recording, reporting and baselining of benchmark results."""
+from collections.abc import Callable
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Set this environment variable to replace the baseline with the latest results.
+_SAVE_BASELINE_ENV = "BENCHMARK_SAVE_BASELINE"
+
+# Timings vary a lot between machines, so are only flagged when well over baseline.
+# Counts (of allocations, state writes, requests, ...) are much more repeatable, and
+# fail the benchmark when they regress.
+_TIMING_TOLERANCE = 1.5
+_COUNT_TOLERANCE = 1.25
+
+_results: dict[str, dict[str, float]] = {}
+
+
+def _load_baseline() -> dict[str, dict[str, float]]:
+    if not BASELINE_PATH.exists():
+        return {}
+    baseline: dict[str, dict[str, float]] = json.loads(BASELINE_PATH.read_text())
+    return baseline
+
+
+def _is_timing(metric: str) -> bool:
+    return metric.endswith("_ms")
+
+
+def _regressed(metric: str, value: float, baseline: float) -> bool:
+    tolerance = _TIMING_TOLERANCE if _is_timing(metric) else _COUNT_TOLERANCE
+    return value > baseline * tolerance
+
+
+@pytest.fixture(name="record_benchmark")
+def record_benchmark_fixture(
+    request: pytest.FixtureRequest,
+) -> Callable[[dict[str, float]], None]:
+    """Record a benchmark's results, failing if any count regressed from baseline."""
+    name = request.node.name
+
+    def record(metrics: dict[str, float]) -> None:
+        _results[name] = metrics
+        baseline = _load_baseline().get(name, {})
+        regressions = [
+            f"{metric}: {value:g} (baseline {baseline[metric]:g})"
+            for metric, value in metrics.items()
+            if metric in baseline
+            and not _is_timing(metric)
+            and _regressed(metric, value, baseline[metric])
+        ]
+        if regressions and not os.environ.get(_SAVE_BASELINE_ENV):
+            pytest.fail("Regressed from baseline: " + ", ".join(regressions))
+
+    return record
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    """Show the results of any benchmarks run, compared to the baseline."""
+    if not _results:
+        return
+    baseline = _load_baseline()
+    terminalreporter.section("benchmarks")
+    for name, metrics in _results.items():
+        terminalreporter.write_line(name)
+        for metric, value in metrics.items():
+            line = f"  {metric:<20} {value:>10.3f}"
+            if metric in baseline.get(name, {}):
+                previous = baseline[name][metric]
+                line += f"  baseline {previous:>10.3f}"
+                if _regressed(metric, value, previous):
+                    line += "  REGRESSED"
+            terminalreporter.write_line(line)
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Save the results as the new baseline, if asked to."""
+    if _results and os.environ.get(_SAVE_BASELINE_ENV):
+        baseline = _load_baseline()
+        baseline.update(
+            {
+                name: {metric: round(value, 3) for metric, value in metrics.items()}
+                for name, metrics in _results.items()
+            }
+        )
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,45 @@
+"""Benchmark solving power flows between devices."""
+from statistics import median
+import time
+
+import pytest
+
+from custom_components.givenergy_local.snapshot import PlantSnapshot
+
+pytestmark = pytest.mark.benchmark
+
+# Snapshots solved in each timed round
+_SNAPSHOTS = 1000
+_ROUNDS = 20
+
+
+def _snapshots() -> list[PlantSnapshot]:
+    """Build snapshots with power readings varying through every kind of flow."""
+    return [
+        PlantSnapshot(
+            {
+                "p_pv1": i % 40 * 100,
+                "p_pv2": i % 13 * 50,
+                "p_load_demand": 300 + i % 29 * 100,
+                "p_grid_out": i % 61 * 100 - 3000,
+                "p_battery": i % 53 * 100 - 2600,
+            },
+            (),
+        )
+        for i in range(_SNAPSHOTS)
+    ]
+
+
+def test_solve_flows(record_benchmark):
+    """Benchmark solving flows for a snapshot, and reading every flow from it."""
+    timings = []
+    for _ in range(_ROUNDS):
+        snapshots = _snapshots()
+        started = time.perf_counter()
+        for snapshot in snapshots:
+            flows = snapshot.flows
+            for flow in flows:
+                assert flow >= 0
+        timings.append(time.perf_counter() - started)
+
+    record_benchmark({"solve_1000_ms": median(timings) * 1000})
@@ -0,0 +1,228 @@
+"""Benchmark coordinator refreshes and entity updates against simulated inverters."""
+import asyncio
+from contextlib import AsyncExitStack
+from functools import partial
+from statistics import median
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+import pytest_socket
+from simulator import InverterSimulator
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.const import (
+    CONF_HOST,
+    CONF_NUM_BATTERIES,
+    DOMAIN,
+)
+from custom_components.givenergy_local.coordinator import (
+    GivEnergyUpdateCoordinator,
+    _copy_registers,
+)
+from custom_components.givenergy_local.plausibility import PlausibilityEngine
+from custom_components.givenergy_local.snapshot import PlantSnapshot
+from custom_components.givenergy_local.transport import ModbusTransport
+
+pytestmark = pytest.mark.benchmark
+
+# Ticks timed in each benchmark, after one to warm up
+_TICKS = 20
+
+# Simulated inverters listen on separate loopback addresses, as real ones would have
+# separate addresses, so that they aren't all limited to one session at a time.
+_MAX_INVERTERS = 4
+_HOSTS = [f"127.0.0.{i + 2}" for i in range(_MAX_INVERTERS)]
+
+
+@pytest.fixture(autouse=True)
+def allow_simulated_hosts(socket_enabled):
+    """Allow connections to every simulated inverter."""
+    pytest_socket.socket_allow_hosts(_HOSTS)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Don't pause between requests, which would swamp everything else timed."""
+    monkeypatch.setattr("custom_components.givenergy_local.connection.DEFAULT_SLEEP", 0)
+
+
+class _StateWriteCounter:
+    """Counts entity state writes."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._write = Entity._async_write_ha_state
+
+    def __enter__(self) -> "_StateWriteCounter":
+        counter = self
+
+        def _async_write_ha_state(entity: Entity) -> None:
+            counter.count += 1
+            counter._write(entity)
+
+        self._patch = patch.object(
+            Entity, "_async_write_ha_state", _async_write_ha_state
+        )
+        self._patch.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._patch.stop()
+
+
+def _vary(simulator: InverterSimulator, tick: int) -> None:
+    """Change power readings, and every other tick the battery SOC, as in real life."""
+    simulator.input_registers[18] = 1500 + tick * 10  # p_pv1
+    simulator.input_registers[42] = 650 + tick * 5  # p_load_demand
+    simulator.input_registers[52] = 400 - tick * 5  # p_battery
+    for registers in simulator.battery_registers:
+        registers[100] = 67 + tick // 2  # battery_soc
+
+
+async def _async_setup_inverters(
+    hass: HomeAssistant, stack: AsyncExitStack, num_inverters: int, num_batteries: int
+) -> list[tuple[InverterSimulator, GivEnergyUpdateCoordinator]]:
+    """Set up a config entry for each of a number of simulated inverters."""
+    inverters = []
+    for i in range(num_inverters):
+        host = _HOSTS[i]
+        simulator = InverterSimulator(
+            num_batteries, seed=i, serial_number=f"SD2223G{i:03d}"
+        )
+        await simulator.start(host)
+        stack.push_async_callback(simulator.stop)
+
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_HOST: host, CONF_NUM_BATTERIES: num_batteries},
+            version=2,
+        )
+        entry.add_to_hass(hass)
+        with patch(
+            "custom_components.givenergy_local.InverterConnection",
+            partial(InverterConnection, port=simulator.port),
+        ):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        stack.push_async_callback(hass.config_entries.async_unload, entry.entry_id)
+        inverters.append((simulator, hass.data[DOMAIN][entry.entry_id]))
+
+    await hass.async_block_till_done()
+    return inverters
+
+
+async def _async_time_phases(
+    simulator: InverterSimulator, coordinator: GivEnergyUpdateCoordinator
+) -> dict[str, float]:
+    """Time each phase of a partial refresh separately, in seconds."""
+    # Snapshots are checked against the current data by a separate engine, so that
+    # the refresh that follows isn't compared with the snapshot read here
+    plausibility = PlausibilityEngine()
+    plausibility.check(coordinator.data, 0.0)
+
+    transport = ModbusTransport(coordinator.host, simulator.port)
+    started = time.perf_counter()
+    await transport.connect()
+    connected = time.perf_counter()
+    transport.close()
+
+    # Read into the back buffer, as a refresh does, so the current data is untouched
+    back = coordinator._back_plant
+    _copy_registers(coordinator.plant, back)
+    await coordinator.connection.async_read_plan(
+        back, coordinator.read_plan(full_refresh=False)
+    )
+    read = time.perf_counter()
+    snapshot = PlantSnapshot.from_plant(back)
+    decoded = time.perf_counter()
+    snapshot = plausibility.check(snapshot, 30.0).snapshot
+    validated = time.perf_counter()
+    coordinator.plant, coordinator._back_plant = back, coordinator.plant
+    coordinator.async_set_updated_data(snapshot)
+    fanned_out = time.perf_counter()
+
+    return {
+        "connect_ms": connected - started,
+        "read_ms": read - connected,
+        "decode_ms": decoded - read,
+        "validate_ms": validated - decoded,
+        "fan_out_ms": fanned_out - validated,
+    }
+
+
+@pytest.mark.parametrize(
+    ("num_inverters", "num_batteries"),
+    [
+        pytest.param(inverters, batteries, id=f"{inverters}x{batteries}")
+        for inverters, batteries in ((1, 1), (1, 2), (1, 3), (1, 4), (2, 2), (4, 2))
+    ],
+)
+async def test_refresh(
+    hass: HomeAssistant, record_benchmark, num_inverters: int, num_batteries: int
+):
+    """
+    Benchmark refreshing every inverter, and updating all of their entities.
+
+    Each phase of a refresh is timed separately for a single inverter. Whole ticks,
+    in which every inverter is refreshed at once, are timed and counted overall.
+    """
+    async with AsyncExitStack() as stack:
+        inverters = await _async_setup_inverters(
+            hass, stack, num_inverters, num_batteries
+        )
+        coordinators = [coordinator for _, coordinator in inverters]
+
+        async def async_tick(tick: int) -> None:
+            for simulator, _ in inverters:
+                _vary(simulator, tick)
+            await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators)
+            )
+
+        await async_tick(0)
+
+        phases: dict[str, list[float]] = {}
+        tick_times = []
+        state_writes = []
+        requests = []
+        for tick in range(1, _TICKS + 1):
+            for simulator, coordinator in inverters:
+                _vary(simulator, tick)
+                for phase, elapsed in (
+                    await _async_time_phases(simulator, coordinator)
+                ).items():
+                    phases.setdefault(phase, []).append(elapsed)
+
+            sent = sum(simulator.requests for simulator, _ in inverters)
+            with _StateWriteCounter() as writes:
+                started = time.perf_counter()
+                await async_tick(-tick)
+                tick_times.append(time.perf_counter() - started)
+            state_writes.append(writes.count)
+            requests.append(sum(sim.requests for sim, _ in inverters) - sent)
+
+        # Allocations are measured separately, as tracing them slows everything down
+        allocations = []
+        tracemalloc.start()
+        try:
+            for tick in range(_TICKS):
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                await async_tick(tick)
+                allocations.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+
+    record_benchmark(
+        {
+            **{phase: median(times) * 1000 for phase, times in phases.items()},
+            "tick_ms": median(tick_times) * 1000,
+            "alloc_peak_kib": median(allocations) / 1024,
+            "state_writes": median(state_writes),
+            "requests": median(requests),
+        }
+    )
@@ -0,0 +1,96 @@
+"""Benchmark replaying recorded register data through the whole integration."""
+from functools import partial
+import time
+from unittest.mock import patch
+
+from givenergy_modbus.model.register import HoldingRegister
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from simulator import HOLDING_REGISTERS, INPUT_REGISTERS, battery_registers
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.const import (
+    CONF_HOST,
+    CONF_NUM_BATTERIES,
+    DOMAIN,
+)
+from custom_components.givenergy_local.recorder import RegisterRecorder, read_logs
+from custom_components.givenergy_local.register_map import (
+    BATTERY_BLOCKS,
+    INVERTER_BLOCKS,
+)
+from custom_components.givenergy_local.replay import ReplayTransport, async_replay
+
+from .test_refresh import _StateWriteCounter
+
+pytestmark = pytest.mark.benchmark
+
+# A day of refreshes every 30 seconds, with a full refresh every 5 minutes
+_REFRESHES = 24 * 60 * 2
+_FULL_REFRESH_EVERY = 10
+_INTERVAL = 30.0
+_NUM_BATTERIES = 2
+
+
+def _record_day(recorder: RegisterRecorder) -> None:
+    """Record a day of refreshes, with power readings following the sun."""
+    batteries = [battery_registers(i) for i in range(_NUM_BATTERIES)]
+    for i in range(_REFRESHES):
+        timestamp = i * _INTERVAL
+        p_pv = max(3000 - abs(i - _REFRESHES // 2) * 3, 0)
+        inputs = {**INPUT_REGISTERS, 18: p_pv, 20: p_pv // 2, 42: 400 + i % 7 * 50}
+        for block in INVERTER_BLOCKS:
+            if block.register_type is HoldingRegister:
+                if i % _FULL_REFRESH_EVERY:
+                    continue
+                recorder.record(block, None, HOLDING_REGISTERS, timestamp)
+            else:
+                recorder.record(block, None, inputs, timestamp)
+        for battery_id, registers in enumerate(batteries):
+            registers[100] = 20 + i * 60 // _REFRESHES  # battery_soc
+            for block in BATTERY_BLOCKS:
+                recorder.record(block, battery_id, registers, timestamp)
+    recorder.close()
+
+
+async def test_replay_day(hass: HomeAssistant, tmp_path, record_benchmark):
+    """
+    Benchmark replaying a day of recorded data.
+
+    The data is pushed through decoding, validation and every entity, as fast as
+    possible.
+    """
+    _record_day(RegisterRecorder(tmp_path))
+    transport = ReplayTransport(read_logs(tmp_path))
+    transport.advance()
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "replay", CONF_NUM_BATTERIES: _NUM_BATTERIES},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.givenergy_local.InverterConnection",
+        partial(InverterConnection, transport=transport),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    with _StateWriteCounter() as writes:
+        started = time.perf_counter()
+        refreshes = await async_replay(coordinator, transport)
+        elapsed = time.perf_counter() - started
+    assert refreshes == _REFRESHES - 1
+    assert coordinator.last_update_success
+    # Nothing was held for changing too fast, as readings are timed as recorded
+    assert not coordinator.plausibility.violations
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+    record_benchmark(
+        {
+            "refresh_ms": elapsed / refreshes * 1000,
+            "state_writes": writes.count / refreshes,
+        }
+    )
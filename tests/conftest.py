@@ -3,6 +3,9 @@ from datetime import time
 from unittest.mock import MagicMock, patch
 
 import pytest
+from simulator import InverterSimulator
+
+from custom_components.givenergy_local.connection import InverterConnection
 
 pytest_plugins = "pytest_homeassistant_custom_component"
 
@@ -31,7 +34,9 @@ def skip_notifications_fixture():
 @pytest.fixture(name="bypass_get_data")
 def bypass_get_data_fixture():
     """Skip calls to get data from API."""
-    with patch("givenergy_modbus.client.GivEnergyClient.refresh_plant"):
+    with patch(
+        "custom_components.givenergy_local.connection.InverterConnection.async_read_plan"
+    ):
         yield
 
 
@@ -40,12 +45,29 @@ def bypass_get_data_fixture():
 def error_get_data_fixture():
     """Simulate error when retrieving data from API."""
     with patch(
-        "givenergy_modbus.client.GivEnergyClient.refresh_plant",
+        "custom_components.givenergy_local.connection.InverterConnection.async_read_plan",
         side_effect=Exception,
     ):
         yield
 
 
+# Talk to a simulated inverter over a real TCP connection.
+@pytest.fixture(name="simulator")
+async def simulator_fixture(socket_enabled):
+    """Serve a simulated inverter with two batteries on a local port."""
+    async with InverterSimulator(num_batteries=2, seed=0) as simulator:
+        yield simulator
+
+
+@pytest.fixture(name="simulated_connection")
+async def simulated_connection_fixture(simulator):
+    """Connect to the simulated inverter, without pausing between requests."""
+    connection = InverterConnection("127.0.0.1", port=simulator.port)
+    connection.sleep_between_queries = 0
+    yield connection
+    await connection.async_close()
+
+
 @pytest.fixture(name="mock_plant")
 def mock_plant_fixture():
     """Mock enough inverter and battery data to allow platform setup to succeed."""
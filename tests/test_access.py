@@ -0,0 +1,81 @@
+"""Test scheduling of access to inverters."""
+import asyncio
+from datetime import timedelta
+
+from custom_components.givenergy_local.access import InverterAccessScheduler
+
+
+async def _hold(scheduler, host, started, release):
+    async with scheduler.session(host):
+        started.append(host)
+        await release.wait()
+
+
+async def test_sessions_are_capped():
+    """Test sessions are limited overall and for each host."""
+    scheduler = InverterAccessScheduler(max_sessions=2, max_sessions_per_host=1)
+    started: list[str] = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_hold(scheduler, host, started, release))
+        for host in ("a", "a", "b", "c")
+    ]
+    await asyncio.sleep(0)
+    assert started == ["a", "b"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert sorted(started) == ["a", "a", "b", "c"]
+
+
+async def test_least_served_inverter_goes_first():
+    """Test a waiting inverter with less recent I/O is served before a busier one."""
+    scheduler = InverterAccessScheduler(max_sessions=1)
+    scheduler._usage["busy"] = (30.0, 0.0)
+    scheduler._usage["quiet"] = (1.0, 0.0)
+
+    started: list[str] = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_hold(scheduler, host, started, release))
+        for host in ("first", "busy", "quiet")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["first", "quiet", "busy"]
+
+
+async def test_cancelled_waiters_are_dropped():
+    """Test a caller giving up while waiting doesn't hold up others."""
+    scheduler = InverterAccessScheduler(max_sessions=1)
+    started: list[str] = []
+    release = asyncio.Event()
+    first = asyncio.create_task(_hold(scheduler, "a", started, release))
+    cancelled = asyncio.create_task(_hold(scheduler, "b", started, release))
+    last = asyncio.create_task(_hold(scheduler, "c", started, release))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+    await asyncio.gather(first, last)
+    assert started == ["a", "c"]
+
+
+def test_polls_are_staggered():
+    """Test each registered inverter is polled at its own offset in the interval."""
+    scheduler = InverterAccessScheduler()
+    unregister = scheduler.async_register_poller("a")
+    scheduler.async_register_poller("b")
+    scheduler.async_register_poller("c")
+    interval = timedelta(seconds=30)
+
+    for host, offset in (("a", 0.0), ("b", 10.0), ("c", 20.0)):
+        now = 1000.0
+        for _ in range(3):
+            now += scheduler.stagger(host, interval, now).total_seconds()
+            assert round(now % 30.0, 6) == offset
+
+    unregister()
+    assert scheduler.stagger("a", interval, 1000.0) == interval
+    now = 1000.0 + scheduler.stagger("b", interval, 1000.0).total_seconds()
+    assert round(now % 30.0, 6) == 0.0
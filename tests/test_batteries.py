@@ -0,0 +1,122 @@
+"""Test batteries being attached and removed while running."""
+from functools import partial
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from simulator import battery_registers
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.const import (
+    CONF_HOST,
+    CONF_NUM_BATTERIES,
+    DOMAIN,
+)
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+
+
+async def test_batteries_are_counted(
+    hass: HomeAssistant, simulator, simulated_connection
+):
+    """Test empty battery slots are dropped, and new batteries found by probing."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 4)
+    snapshot = await coordinator._async_update_data()
+    assert len(snapshot.batteries) == 2
+
+    # Batteries are only probed for every so often
+    simulator.battery_registers.append(battery_registers(2))
+    snapshot = await coordinator._async_update_data()
+    assert len(snapshot.batteries) == 2
+
+    coordinator._next_battery_probe = 0.0
+    snapshot = await coordinator._async_update_data()
+    assert snapshot.batteries[2]["battery_serial_number"] == "BG3G123002"
+
+    # A battery reading as empty is only removed if it is still empty next time
+    del simulator.battery_registers[1:]
+    coordinator._next_battery_probe = 0.0
+    snapshot = await coordinator._async_update_data()
+    assert len(snapshot.batteries) == 3
+    coordinator._next_battery_probe = 0.0
+    snapshot = await coordinator._async_update_data()
+    assert len(snapshot.batteries) == 1
+
+
+async def test_unanswered_slot_keeps_connection(
+    hass: HomeAssistant, monkeypatch, simulator, simulated_connection
+):
+    """Test an empty slot that doesn't answer isn't taken as a connection failure."""
+    monkeypatch.setattr(
+        "custom_components.givenergy_local.connection._ABSENT_SLAVE_TIMEOUT", 0.1
+    )
+    respond = simulator.respond
+    # Empty slots on real inverters often go unanswered
+    simulator.respond = lambda request: (
+        None if request.slave_address == 0x32 + 2 else respond(request)
+    )
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    snapshot = await coordinator._async_update_data()
+
+    assert len(snapshot.batteries) == 2
+    assert simulated_connection._transport.connected
+    assert simulated_connection.breaker._consecutive_failures == 0
+
+
+async def test_battery_entities_follow_batteries(
+    hass: HomeAssistant, simulator, monkeypatch
+):
+    """Test battery devices and entities are added and removed without a reload."""
+    monkeypatch.setattr("custom_components.givenergy_local.connection.DEFAULT_SLEEP", 0)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "127.0.0.1", CONF_NUM_BATTERIES: 1},
+        version=2,
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.givenergy_local.InverterConnection",
+        partial(InverterConnection, port=simulator.port),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator: GivEnergyUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    entity_registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+
+    def _soc_state(serial_number: str) -> str | None:
+        entity_id = entity_registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{serial_number}_battery_soc"
+        )
+        state = hass.states.get(entity_id) if entity_id else None
+        return state.state if state else None
+
+    # Both batteries were found, although only one was configured
+    assert _soc_state("BG3G123001") == "67"
+
+    simulator.battery_registers.append(battery_registers(2))
+    coordinator._next_battery_probe = 0.0
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert _soc_state("BG3G123002") == "67"
+
+    # A single empty probe leaves the battery's device and entities alone
+    simulator.battery_registers.pop()
+    coordinator._next_battery_probe = 0.0
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    device = device_registry.async_get_device({(DOMAIN, "BG3G123002")})
+    assert device is not None
+    assert entry.entry_id in device.config_entries
+    assert _soc_state("BG3G123002") == "67"
+    assert coordinator.data.batteries[2]["battery_serial_number"] == "BG3G123002"
+
+    coordinator._next_battery_probe = 0.0
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert _soc_state("BG3G123002") is None
+    assert device_registry.async_get_device({(DOMAIN, "BG3G123002")}) is None
+    assert _soc_state("BG3G123001") == "67"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -3,8 +3,16 @@ from unittest.mock import patch
 
 from homeassistant import config_entries, data_entry_flow
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.givenergy_local.const import DOMAIN
+from custom_components.givenergy_local.const import (
+    CONF_FAST_POWER_INTERVAL,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_PERSISTENT_CONNECTION,
+    CONF_RECORD_REGISTERS,
+    DOMAIN,
+)
 
 from .const import MOCK_CONFIG
 
@@ -84,3 +92,41 @@ async def test_failed_config_flow(hass, error_on_validation):
 
     assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
     assert result["errors"] == {"base": "cannot_connect"}
+
+
+async def test_options_flow(hass):
+    """Test the persistent connection can be turned off through the options flow."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_PERSISTENT_CONNECTION: False}
+    )
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert config_entry.options == {
+        CONF_PERSISTENT_CONNECTION: False,
+        CONF_MIN_UPDATE_INTERVAL: 10,
+        CONF_MAX_UPDATE_INTERVAL: 60,
+        CONF_RECORD_REGISTERS: False,
+        CONF_FAST_POWER_INTERVAL: 0,
+    }
+
+
+async def test_options_flow_invalid_update_interval(hass):
+    """Test the minimum update interval can't exceed the maximum."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={CONF_MIN_UPDATE_INTERVAL: 120, CONF_MAX_UPDATE_INTERVAL: 30},
+    )
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_FORM
+    assert result["errors"] == {"base": "invalid_update_interval"}
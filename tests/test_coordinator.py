@@ -0,0 +1,59 @@
+"""Test the GivEnergy update coordinator."""
+from unittest.mock import Mock
+
+from givenergy_modbus.model.plant import Plant
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+from homeassistant.core import HomeAssistant
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.coordinator import (
+    GivEnergyUpdateCoordinator,
+    ListenerContext,
+    _copy_registers,
+)
+from custom_components.givenergy_local.snapshot import PlantSnapshot
+
+
+async def test_only_changed_listeners_are_updated(hass: HomeAssistant):
+    """Test listeners are only called when the values they read change."""
+    coordinator = GivEnergyUpdateCoordinator(hass, InverterConnection("host"), 1)
+    pv_listener, soc_listener, other_listener = Mock(), Mock(), Mock()
+    removers = [
+        coordinator.async_add_listener(pv_listener, ListenerContext(("p_pv1",))),
+        coordinator.async_add_listener(
+            soc_listener, ListenerContext(("battery_soc",), 0)
+        ),
+        coordinator.async_add_listener(other_listener),
+    ]
+
+    coordinator.async_set_updated_data(
+        PlantSnapshot({"p_pv1": 100, "p_pv2": 0}, ({"battery_soc": 50},))
+    )
+    assert pv_listener.call_count == soc_listener.call_count == 1
+
+    coordinator.async_set_updated_data(
+        PlantSnapshot({"p_pv1": 100, "p_pv2": 20}, ({"battery_soc": 51},))
+    )
+    assert pv_listener.call_count == 1
+    assert soc_listener.call_count == 2
+    assert other_listener.call_count == 2
+
+    coordinator.async_set_update_error(Exception())
+    assert pv_listener.call_count == 2
+
+    for remove in removers:
+        remove()
+
+
+def test_copied_registers_leave_nothing_stale():
+    """Test registers removed from one plant are removed from its copy too."""
+    source = Plant(number_batteries=1)
+    source.inverter_rc[HoldingRegister(20)] = 1
+    source.batteries_rcs[0][InputRegister(60)] = 2
+    target = Plant(number_batteries=2)
+    target.inverter_rc[HoldingRegister(21)] = 3
+    target.batteries_rcs[0][InputRegister(61)] = 4
+
+    _copy_registers(source, target)
+    assert target.inverter_rc == {HoldingRegister(20): 1}
+    assert target.batteries_rcs == [{InputRegister(60): 2}]
@@ -0,0 +1,60 @@
+"""Test discovering inverters on the local network."""
+from functools import partial
+from ipaddress import IPv4Network
+from unittest.mock import patch
+
+from homeassistant import config_entries, data_entry_flow
+from homeassistant.core import HomeAssistant
+
+from custom_components.givenergy_local.const import (
+    CONF_HOST,
+    CONF_NETWORK,
+    CONF_NUM_BATTERIES,
+    DOMAIN,
+)
+from custom_components.givenergy_local.discovery import async_discover
+from custom_components.givenergy_local.register_map import BLOCK_SIZE
+
+
+async def test_discover(simulator):
+    """Test the simulated inverter is found, with its batteries counted."""
+    inverters = await async_discover(IPv4Network("127.0.0.1/32"), port=simulator.port)
+
+    assert [(i.host, i.serial_number, i.num_batteries) for i in inverters] == [
+        ("127.0.0.1", "SD2223G123", 2)
+    ]
+    # The whole of the first holding register block is read
+    assert sorted(r.value for r in inverters[0].registers) == list(range(BLOCK_SIZE))
+
+
+async def test_discovery_config_flow(hass: HomeAssistant, simulator):
+    """Test setting up an inverter found by searching the network."""
+    with patch(
+        "custom_components.givenergy_local.config_flow.async_discover",
+        partial(async_discover, port=simulator.port),
+    ), patch("custom_components.givenergy_local.async_setup_entry", return_value=True):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={}
+        )
+        assert result["step_id"] == "discover"
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={CONF_NETWORK: "127.0.0.0/8"}
+        )
+        assert result["errors"] == {"base": "invalid_network"}
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={CONF_NETWORK: "127.0.0.1/32"}
+        )
+        assert result["step_id"] == "pick"
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={CONF_HOST: "127.0.0.1"}
+        )
+
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert result["title"] == "Solar Inverter (S/N SD2223G123)"
+    assert result["data"] == {CONF_HOST: "127.0.0.1", CONF_NUM_BATTERIES: 2}
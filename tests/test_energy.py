@@ -0,0 +1,76 @@
+"""Test integrating power flows into daily energy totals."""
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.givenergy_local.energy import FlowEnergy
+from custom_components.givenergy_local.flows import PowerFlows
+
+_KEY = "givenergy_local.flow_energy.test"
+
+
+def _flows(solar_to_house: int) -> PowerFlows:
+    return PowerFlows(solar_to_house, 0, 0, 0, 0, 0, 0)
+
+
+def _at(hour: int, minute: int, second: int = 0, day: int = 1) -> datetime:
+    return datetime(2024, 6, day, hour, minute, second, tzinfo=dt.DEFAULT_TIME_ZONE)
+
+
+async def test_flows_are_integrated(hass: HomeAssistant):
+    """Test every reading is integrated, except across long gaps."""
+    energy = FlowEnergy(hass, _KEY)
+    energy.add(_flows(1000), _at(12, 0))
+    energy.add(_flows(2000), _at(12, 0, 36))
+    # 1.5 kW on average for 36 seconds
+    assert energy.totals["solar_to_house"] == 0.015
+
+    energy.add(_flows(2000), _at(13, 0))
+    energy.add(None, _at(13, 0, 36))
+    energy.add(_flows(2000), _at(13, 1, 12))
+    assert energy.totals["solar_to_house"] == 0.015
+
+
+async def test_totals_reset_at_midnight(hass: HomeAssistant):
+    """Test only energy since local midnight counts towards the day's totals."""
+    energy = FlowEnergy(hass, _KEY)
+    energy.add(_flows(1000), _at(23, 58, 48))
+    energy.add(_flows(1000), _at(23, 59, 24))
+    assert energy.totals["solar_to_house"] == 0.01
+
+    energy.add(_flows(1000), _at(0, 0, 36, day=2))
+    assert round(energy.totals["solar_to_house"], 6) == 0.01
+
+
+async def test_totals_survive_restarts(hass: HomeAssistant):
+    """Test totals carry on from where they were saved."""
+    energy = FlowEnergy(hass, _KEY)
+    energy.add(_flows(1000), _at(12, 0))
+    energy.add(_flows(1000), _at(12, 0, 36))
+    await energy.async_save()
+
+    restored = FlowEnergy(hass, _KEY)
+    await restored.async_load()
+    restored.add(_flows(1000), _at(12, 1, 12))
+    assert round(restored.totals["solar_to_house"], 6) == 0.02
+
+
+async def test_totals_are_saved_periodically(hass: HomeAssistant, hass_storage):
+    """Test changed totals are saved on an interval, however often readings come."""
+    energy = FlowEnergy(hass, _KEY)
+    stop = energy.async_start()
+    now = dt.utcnow()
+    for second in range(0, 90, 5):
+        energy.add(_flows(1000), now + timedelta(seconds=second))
+        async_fire_time_changed(hass, now + timedelta(seconds=second))
+        await hass.async_block_till_done()
+    assert hass_storage[_KEY]["data"]["totals"]["solar_to_house"] > 0
+
+    # Unchanged totals aren't saved again
+    del hass_storage[_KEY]
+    async_fire_time_changed(hass, now + timedelta(minutes=5))
+    await hass.async_block_till_done()
+    assert _KEY not in hass_storage
+    stop()
@@ -0,0 +1,72 @@
+"""Test fast polling of power readings against a simulated inverter."""
+from datetime import timedelta
+import time
+
+from givenergy_modbus.model.register import InputRegister
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from custom_components.givenergy_local.clock import Clock
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+from custom_components.givenergy_local.fast_power import FastPowerPoller
+
+
+class _SteppedClock(Clock):
+    """A clock that can be stepped forward."""
+
+    offset = 0.0
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self.offset
+
+
+async def test_fast_poll(hass: HomeAssistant, simulator, simulated_connection):
+    """Test every reading is sent, but data only changes outside the deadband."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    coordinator.clock = clock = _SteppedClock()
+    coordinator.data = await coordinator._async_update_data()
+    poller = FastPowerPoller(hass, coordinator, timedelta(seconds=2))
+    received = []
+    async_dispatcher_connect(hass, poller.signal, received.append)
+    updates = []
+    remove_listener = coordinator.async_add_listener(
+        lambda: updates.append(coordinator.data)
+    )
+    requests = simulator.requests
+    p_pv1 = coordinator.data.inverter["p_pv1"]
+
+    simulator.input_registers[InputRegister.P_PV1.value] = p_pv1 + 10
+    await poller.async_poll()
+    await hass.async_block_till_done()
+    assert received[-1]["p_pv1"] == p_pv1 + 10
+    assert coordinator.data.inverter["p_pv1"] == p_pv1
+    assert not updates
+
+    simulator.input_registers[InputRegister.P_PV1.value] = p_pv1 + 100
+    # Charging shows up as a negative battery power
+    simulator.input_registers[InputRegister.P_BATTERY.value] = 0xFFF0
+    await poller.async_poll()
+    await hass.async_block_till_done()
+    assert received[-1]["p_pv1"] == p_pv1 + 100
+    assert received[-1]["p_battery"] == -16
+    assert coordinator.data.inverter["p_pv1"] == p_pv1 + 100
+    assert len(updates) == 1
+    assert len(coordinator.metrics.phases["fast_fan_out"]) == 1
+    # Only the one block is read
+    assert simulator.requests == requests + 2
+
+    # Readings are sent at full rate, but entities wait for the publish interval
+    simulator.input_registers[InputRegister.P_PV1.value] = p_pv1 + 200
+    await poller.async_poll()
+    await hass.async_block_till_done()
+    assert received[-1]["p_pv1"] == p_pv1 + 200
+    assert coordinator.data.inverter["p_pv1"] == p_pv1 + 100
+    assert len(updates) == 1
+
+    clock.offset = 10
+    simulator.input_registers[InputRegister.P_PV1.value] = p_pv1 + 300
+    await poller.async_poll()
+    await hass.async_block_till_done()
+    assert coordinator.data.inverter["p_pv1"] == p_pv1 + 300
+    assert len(updates) == 2
+    remove_listener()
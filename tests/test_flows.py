@@ -0,0 +1,46 @@
+"""Test solving power flows between devices."""
+from itertools import product
+
+from custom_components.givenergy_local.flows import PowerFlows
+from custom_components.givenergy_local.snapshot import PlantSnapshot
+
+
+def _inverter(p_pv, p_load_demand, p_grid_out, p_battery):
+    return {
+        "p_pv1": p_pv,
+        "p_pv2": 0,
+        "p_load_demand": p_load_demand,
+        "p_grid_out": p_grid_out,
+        "p_battery": p_battery,
+    }
+
+
+def test_flows_are_balanced():
+    """Test no source supplies, and no sink takes, more than its reading."""
+    readings = (0, 500, 3000)
+    for p_pv, p_load, p_grid, p_battery in product(
+        readings, readings, (-3000, 0, 500, 3000), (-3000, 0, 500, 3000)
+    ):
+        flows = PowerFlows.solve(_inverter(p_pv, p_load, p_grid, p_battery))
+        assert min(flows) >= 0
+        assert (
+            flows.solar_to_house + flows.solar_to_battery + flows.solar_to_grid <= p_pv
+        )
+        assert flows.battery_to_house + flows.battery_to_grid <= max(p_battery, 0)
+        assert flows.grid_to_house + flows.grid_to_battery <= max(-p_grid, 0)
+        assert (
+            flows.solar_to_house + flows.battery_to_house + flows.grid_to_house
+            <= p_load
+        )
+        assert flows.solar_to_battery + flows.grid_to_battery <= max(-p_battery, 0)
+        assert flows.solar_to_grid + flows.battery_to_grid <= max(p_grid, 0)
+
+
+def test_flows_are_solved_once_per_snapshot():
+    """Test the flows are unknown without every reading, and only solved once."""
+    inverter = _inverter(2000, 500, 1000, -500)
+    snapshot = PlantSnapshot(inverter, ())
+    assert snapshot.flows is snapshot.flows
+    assert snapshot.flows.solar_to_grid == 1000
+
+    assert PlantSnapshot({**inverter, "p_battery": None}, ()).flows is None
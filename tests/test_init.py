@@ -1,8 +1,11 @@
 """Test givenergy_local setup process."""
+from givenergy_modbus.model.register import HoldingRegister
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import device_registry as dr
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
+from simulator import InverterSimulator
 
 from custom_components.givenergy_local import async_migrate_entry, async_setup_entry
 from custom_components.givenergy_local.const import (
@@ -10,6 +13,10 @@ from custom_components.givenergy_local.const import (
     CONF_NUM_BATTERIES,
     DOMAIN,
 )
+from custom_components.givenergy_local.static_registers import (
+    CACHED_REGISTERS,
+    StaticRegisterCache,
+)
 
 from .const import MOCK_CONFIG
 
@@ -25,6 +32,28 @@ async def test_setup_entry_exception(hass: HomeAssistant, error_on_get_data):
         assert await async_setup_entry(hass, config_entry)
 
 
+async def test_cached_device_is_registered(hass: HomeAssistant, error_on_get_data):
+    """Test the inverter device is described from cached registers at startup."""
+    holding_registers = InverterSimulator(num_batteries=0, seed=0).holding_registers
+    static_registers = StaticRegisterCache(hass, MOCK_CONFIG[CONF_HOST])
+    static_registers.async_update(
+        {
+            HoldingRegister(index): holding_registers.get(index, 0)
+            for index in CACHED_REGISTERS
+        }
+    )
+    await static_registers.async_save()
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+
+    with pytest.raises(ConfigEntryNotReady):
+        await async_setup_entry(hass, config_entry)
+
+    device = dr.async_get(hass).async_get_device({(DOMAIN, "SD2223G123")})
+    assert device is not None
+    assert device.model == "Hybrid"
+
+
 async def test_migrate_from_v1(hass: HomeAssistant):
     """Test config entry migration from version 1."""
     v1_config = {CONF_HOST: "test_inverter_host"}
@@ -0,0 +1,53 @@
+"""Test refresh metrics."""
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+import pytest
+
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+from custom_components.givenergy_local.metrics import RollingHistogram
+
+
+def test_percentiles_cover_recent_values():
+    """Test percentiles are worked out over the most recent values only."""
+    histogram = RollingHistogram(window=10)
+    assert histogram.percentile(50) is None
+
+    for value in range(100):
+        histogram.record(value)
+    assert len(histogram) == 10
+    assert histogram.percentile(0) == 90
+    assert histogram.percentile(50) == 94
+    assert histogram.percentile(90) == 98
+    assert histogram.percentile(100) == 99
+
+
+async def test_refreshes_are_measured(
+    hass: HomeAssistant, simulator, simulated_connection
+):
+    """Test each phase, block read and outcome of a refresh is recorded."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    metrics = coordinator.metrics
+
+    simulator.zero_rate = 1.0
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    assert metrics.discarded_frames == 1
+
+    simulator.zero_rate = 0.0
+    await coordinator._async_update_data()
+    assert metrics.success_rate == 50
+    # The connection was kept open after the data was discarded
+    assert len(metrics.phases["connect"]) == 1
+    for phase in ("read", "decode", "validate"):
+        assert len(metrics.phases[phase]) == 2
+    assert set(metrics.blocks) == {
+        "IR 0",
+        "IR 180",
+        "HR 0",
+        "HR 60",
+        "HR 120",
+        "Battery 1 IR 60",
+        "Battery 2 IR 60",
+        # The empty slot probed for another battery
+        "Battery 3 IR 60",
+    }
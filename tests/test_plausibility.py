@@ -0,0 +1,109 @@
+"""Test the plausibility checks on decoded values."""
+from custom_components.givenergy_local.plausibility import (
+    _MAX_CONSECUTIVE_HOLDS,
+    PlausibilityEngine,
+)
+from custom_components.givenergy_local.snapshot import PlantSnapshot
+
+_INVERTER = {
+    "temp_inverter_heatsink": 31.5,
+    "temp_charger": 28.0,
+    "e_inverter_out_total": 1234.5,
+    "e_pv_total": 4567.8,
+    "p_pv1": 1500,
+    "p_load_demand": 650,
+    "battery_percent": 67,
+}
+_BATTERY = {"battery_soc": 67, "v_battery_cell_01": 3.3, "battery_num_cycles": 12}
+
+
+def _snapshot(battery=None, **inverter) -> PlantSnapshot:
+    return PlantSnapshot({**_INVERTER, **inverter}, ({**_BATTERY, **(battery or {})},))
+
+
+def test_first_snapshot_is_discarded_if_it_cant_be_held():
+    """Test a misread block with nothing to fall back on discards the snapshot."""
+    engine = PlausibilityEngine()
+    result = engine.check(_snapshot(temp_charger=0), 0.0)
+    assert result.discarded_by.name == "zero_temperature"
+    assert engine.check(_snapshot(), 10.0).discarded_by is None
+
+
+def test_misread_blocks_are_held():
+    """Test every value read from a misread block keeps its previous value."""
+    engine = PlausibilityEngine()
+    engine.check(_snapshot(), 0.0)
+
+    result = engine.check(_snapshot(temp_charger=0, p_pv1=0, p_load_demand=700), 10.0)
+    assert result.discarded_by is None
+    # The charger temperature, PV power and load are all read from input register 0
+    assert result.snapshot.inverter["temp_charger"] == 28.0
+    assert result.snapshot.inverter["p_pv1"] == 1500
+    assert result.snapshot.inverter["p_load_demand"] == 650
+    assert engine.violations == {"zero_temperature": 1}
+
+
+def test_out_of_range_values_are_held_or_dropped():
+    """Test individual values outside their range are held or dropped by rule."""
+    engine = PlausibilityEngine()
+    engine.check(_snapshot(), 0.0)
+
+    result = engine.check(
+        _snapshot(
+            battery={"battery_soc": 250, "v_battery_cell_01": 65.5},
+            temp_inverter_heatsink=6553.5,
+            p_pv1=1600,
+        ),
+        10.0,
+    )
+    assert result.snapshot.inverter["temp_inverter_heatsink"] is None
+    assert result.snapshot.inverter["p_pv1"] == 1600
+    assert result.snapshot.batteries[0]["battery_soc"] == 67
+    assert result.snapshot.batteries[0]["v_battery_cell_01"] is None
+    assert engine.violations == {
+        "temperature_range": 1,
+        "battery_soc_range": 1,
+        "cell_voltage_range": 1,
+    }
+
+
+def test_totals_and_rates_are_held_until_persistent():
+    """Test decreasing totals and implausible jumps are held, unless they persist."""
+    engine = PlausibilityEngine()
+    engine.check(_snapshot(), 0.0)
+
+    result = engine.check(_snapshot(e_pv_total=4000.0, battery_percent=99), 10.0)
+    assert result.snapshot.inverter["e_pv_total"] == 4567.8
+    assert result.snapshot.inverter["battery_percent"] == 67
+    assert engine.violations == {"total_decreased": 1, "battery_percent_rate": 1}
+
+    for i in range(_MAX_CONSECUTIVE_HOLDS):
+        result = engine.check(_snapshot(e_pv_total=4000.0), 20.0 + i)
+    assert result.snapshot.inverter["e_pv_total"] == 4000.0
+    assert engine.violations["total_decreased"] == _MAX_CONSECUTIVE_HOLDS
+
+
+def test_fast_polls_leave_rates_to_full_refreshes():
+    """Test rates are judged since values last changed, not since a fast poll."""
+    engine = PlausibilityEngine()
+    snapshot = engine.check(_snapshot(), 0.0).snapshot
+    for second in range(2, 30, 2):
+        snapshot = PlantSnapshot(
+            {**snapshot.inverter, "p_pv1": 1500 + second}, snapshot.batteries
+        )
+        snapshot = engine.check(snapshot, float(second), ("p_pv1",)).snapshot
+        assert snapshot.inverter["p_pv1"] == 1500 + second
+
+    # A normal step in energy over a full refresh interval isn't held
+    result = engine.check(_snapshot(e_pv_total=4567.9), 30.0)
+    assert result.snapshot.inverter["e_pv_total"] == 4567.9
+
+    # Nor is a jump, once it's been held for the most full refreshes
+    for second in range(32, 32 + _MAX_CONSECUTIVE_HOLDS):
+        result = engine.check(_snapshot(e_pv_total=4600.0), float(second))
+        assert result.snapshot.inverter["e_pv_total"] == 4567.9
+        fast = engine.check(result.snapshot, second + 0.5, ("p_pv1",))
+        assert fast.snapshot.inverter["e_pv_total"] == 4567.9
+    result = engine.check(_snapshot(e_pv_total=4600.0), 40.0)
+    assert result.snapshot.inverter["e_pv_total"] == 4600.0
+    assert not engine.violations.keys() - {"energy_rate"}
@@ -0,0 +1,103 @@
+"""Test recording raw register blocks."""
+from datetime import timedelta
+
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+from homeassistant.core import HomeAssistant
+
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+from custom_components.givenergy_local.recorder import (
+    RECORD_SIZE,
+    RegisterLog,
+    RegisterRecorder,
+    log_files,
+    read_logs,
+)
+from custom_components.givenergy_local.register_map import RegisterBlock
+
+_BLOCK = RegisterBlock(InputRegister, 180)
+
+
+def test_records_round_trip(tmp_path):
+    """Test blocks are read back as written, from any position in the log."""
+    recorder = RegisterRecorder(tmp_path)
+    for i in range(3):
+        recorder.record(_BLOCK, None, {180: i, 239: 0xFFFF}, timestamp=1000.0 + i)
+    recorder.record(RegisterBlock(InputRegister, 60), 1, {61: 42}, timestamp=1003.0)
+    recorder.close()
+
+    [path] = log_files(tmp_path)
+    with RegisterLog(path) as log:
+        assert len(log) == 4
+        assert log[1].timestamp == 1001.0
+        assert log[1].block == _BLOCK
+        assert log[1].battery_id is None
+        assert log[1].registers[180] == 1
+        assert log[1].registers[239] == 0xFFFF
+        assert log[-1].battery_id == 1
+        assert log[-1].registers[61] == 42
+
+
+def test_files_are_rotated_and_expired(tmp_path):
+    """Test a new file is started each interval, and only the newest are kept."""
+    recorder = RegisterRecorder(tmp_path, timedelta(hours=1), retained_files=2)
+    for hour in range(4):
+        recorder.record(_BLOCK, None, {}, timestamp=hour * 3600.0)
+        recorder.flush()
+    recorder.close()
+
+    assert [path.name for path in log_files(tmp_path)] == [
+        "registers-19700101T020000.bin",
+        "registers-19700101T030000.bin",
+    ]
+    assert [record.timestamp for record in read_logs(tmp_path)] == [7200.0, 10800.0]
+
+
+def test_partial_records_are_ignored(tmp_path):
+    """Test a record cut short, e.g. by a crash, doesn't stop the rest being read."""
+    recorder = RegisterRecorder(tmp_path)
+    recorder.record(_BLOCK, None, {}, timestamp=0.0)
+    recorder.record(_BLOCK, None, {}, timestamp=1.0)
+    recorder.close()
+
+    [path] = log_files(tmp_path)
+    with open(path, "r+b") as file:
+        file.truncate(path.stat().st_size - RECORD_SIZE // 2)
+    with RegisterLog(path) as log:
+        assert len(log) == 1
+
+
+async def test_refreshes_are_recorded(
+    hass: HomeAssistant, tmp_path, simulator, simulated_connection
+):
+    """Test every block read by the coordinator is recorded."""
+    recorder = RegisterRecorder(tmp_path)
+    coordinator = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 2, recorder=recorder
+    )
+    await coordinator._async_update_data()
+    await coordinator.async_shutdown()
+
+    records = list(read_logs(tmp_path))
+    assert [(record.block, record.battery_id) for record in records] == [
+        (RegisterBlock(InputRegister, 0), None),
+        (RegisterBlock(InputRegister, 180), None),
+        (RegisterBlock(HoldingRegister, 0), None),
+        (RegisterBlock(HoldingRegister, 60), None),
+        (RegisterBlock(HoldingRegister, 120), None),
+        (RegisterBlock(InputRegister, 60), 0),
+        (RegisterBlock(InputRegister, 60), 1),
+    ]
+    assert records[0].registers[18] == simulator.input_registers[18]
+
+
+def test_restarts_append_to_the_current_file(tmp_path):
+    """Test recording resumes in the same file after a restart within an interval."""
+    for timestamp in (60.0, 120.0):
+        recorder = RegisterRecorder(tmp_path)
+        recorder.record(_BLOCK, None, {}, timestamp=timestamp)
+        recorder.close()
+
+    [path] = log_files(tmp_path)
+    assert path.name == "registers-19700101T000000.bin"
+    with RegisterLog(path) as log:
+        assert [record.timestamp for record in log] == [60.0, 120.0]
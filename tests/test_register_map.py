@@ -0,0 +1,74 @@
+"""Test selection of register blocks based on the values in use."""
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+from homeassistant.core import HomeAssistant
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+from custom_components.givenergy_local.register_map import (
+    BATTERY_BLOCKS,
+    INVERTER_BLOCKS,
+    INVERTER_KEY_BLOCKS,
+    RegisterBlock,
+    blocks_for_keys,
+    blocks_for_registers,
+    registers_for_key,
+)
+
+
+def test_registers_for_composite_keys():
+    """Test values assembled from several registers resolve to all of them."""
+    assert registers_for_key("charge_slot_1") == {
+        HoldingRegister.CHARGE_SLOT_1_START,
+        HoldingRegister.CHARGE_SLOT_1_END,
+    }
+    assert registers_for_key("e_inverter_out_total") == {
+        InputRegister.E_INVERTER_OUT_TOTAL_H,
+        InputRegister.E_INVERTER_OUT_TOTAL_L,
+    }
+    assert INVERTER_KEY_BLOCKS["inverter_model"] == {RegisterBlock(HoldingRegister, 0)}
+
+
+def test_unknown_keys_read_everything():
+    """Test a key that can't be resolved falls back to reading every block."""
+    blocks = blocks_for_keys(INVERTER_KEY_BLOCKS, INVERTER_BLOCKS, ["p_pv", "p_pv1"])
+    assert blocks == INVERTER_BLOCKS
+
+
+async def test_read_plan_follows_tracked_keys(hass: HomeAssistant):
+    """Test the coordinator only reads blocks backing values that are in use."""
+    coordinator = GivEnergyUpdateCoordinator(hass, InverterConnection("host"), 2)
+    assert coordinator.read_plan(full_refresh=True) == (
+        INVERTER_BLOCKS,
+        (BATTERY_BLOCKS, BATTERY_BLOCKS),
+    )
+
+    untrack = coordinator.async_track_data_keys(["p_pv1", "p_pv2"])
+    assert coordinator.read_plan(full_refresh=False) == (
+        (RegisterBlock(InputRegister, 0),),
+        ((), ()),
+    )
+    assert coordinator.read_plan(full_refresh=True) == (
+        (
+            RegisterBlock(InputRegister, 0),
+            RegisterBlock(HoldingRegister, 0),
+            RegisterBlock(HoldingRegister, 60),
+        ),
+        ((), ()),
+    )
+
+    coordinator.async_track_data_keys(["battery_soc"], battery_id=1)
+    coordinator.async_track_data_keys(["e_battery_charge_total"])
+    untrack()
+    assert coordinator.read_plan(full_refresh=False) == (
+        (RegisterBlock(InputRegister, 0), RegisterBlock(InputRegister, 180)),
+        ((), BATTERY_BLOCKS),
+    )
+
+
+def test_blocks_for_registers():
+    """Test registers are read in the whole, aligned blocks holding them."""
+    assert blocks_for_registers(HoldingRegister, [20, 27, 59, 60, 96, 110, 116]) == [
+        RegisterBlock(HoldingRegister, 0),
+        RegisterBlock(HoldingRegister, 60),
+    ]
+    assert blocks_for_registers(HoldingRegister, []) == []
@@ -0,0 +1,130 @@
+"""Test replaying recorded register data through the integration."""
+from functools import partial
+from unittest.mock import patch
+
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from simulator import HOLDING_REGISTERS, INPUT_REGISTERS, battery_registers
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.const import (
+    CONF_HOST,
+    CONF_NUM_BATTERIES,
+    DOMAIN,
+)
+from custom_components.givenergy_local.recorder import RegisterRecorder, read_logs
+from custom_components.givenergy_local.register_map import (
+    BATTERY_BLOCKS,
+    INVERTER_BLOCKS,
+)
+from custom_components.givenergy_local.replay import ReplayTransport, async_replay
+from custom_components.givenergy_local.transport import TransportError
+
+_FLOW_SENSORS = (
+    "solar_to_house",
+    "solar_to_battery",
+    "solar_to_grid",
+    "battery_to_house",
+    "battery_to_grid",
+    "grid_to_battery",
+    "grid_to_house",
+)
+
+# Recorded power readings (p_pv1, p_pv2, p_load_demand, p_grid_out, p_battery), and
+# the power flow sensor states derived from them, in the order above.
+_FLOWS = (
+    # Solar covering the house, charging the battery and exporting the rest
+    ((1500, 900, 650, 350, -1400), (650, 1400, 350, 0, 0, 0, 0)),
+    # Battery covering the house in the evening
+    ((0, 0, 800, 0, 800), (0, 0, 0, 800, 0, 0, 0)),
+    # Battery covering the house and exporting
+    ((0, 0, 500, 1500, 2000), (0, 0, 0, 500, 1500, 0, 0)),
+    # Grid covering the house overnight
+    ((0, 0, 700, -700, 0), (0, 0, 0, 0, 0, 0, 700)),
+    # Grid charging the battery
+    ((0, 0, 300, -3300, -3000), (0, 0, 0, 0, 0, 3000, 300)),
+)
+
+
+def _record_capture(recorder: RegisterRecorder) -> None:
+    """Record a refresh for each set of power readings, with one battery."""
+    for i, (p_pv1, p_pv2, p_load_demand, p_grid_out, p_battery) in enumerate(
+        (powers for powers, _ in _FLOWS)
+    ):
+        input_registers = {
+            **INPUT_REGISTERS,
+            18: p_pv1,
+            20: p_pv2,
+            30: p_grid_out,
+            42: p_load_demand,
+            52: p_battery,
+        }
+        for block in INVERTER_BLOCKS:
+            # Holding registers are only read in full refreshes
+            if block.register_type is HoldingRegister and i:
+                continue
+            registers = (
+                HOLDING_REGISTERS
+                if block.register_type is HoldingRegister
+                else input_registers
+            )
+            recorder.record(block, None, registers, timestamp=1000.0 + i * 30)
+        for block in BATTERY_BLOCKS:
+            recorder.record(block, 0, battery_registers(0), timestamp=1000.0 + i * 30)
+    recorder.close()
+
+
+async def test_power_flows(hass: HomeAssistant, tmp_path):
+    """Test the power flow sensors derived from recorded readings don't change."""
+    _record_capture(RegisterRecorder(tmp_path))
+    transport = ReplayTransport(read_logs(tmp_path))
+    transport.advance()
+
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_HOST: "replay", CONF_NUM_BATTERIES: 1}, version=2
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.givenergy_local.InverterConnection",
+        partial(InverterConnection, transport=transport),
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    flows = []
+
+    def on_refresh(timestamp: float) -> None:
+        flows.append(
+            tuple(int(hass.states.get(f"sensor.{key}").state) for key in _FLOW_SENSORS)
+        )
+
+    # The first refresh was made during setup
+    on_refresh(1000.0)
+    assert await async_replay(coordinator, transport, on_refresh=on_refresh) == 4
+    assert flows == [expected for _, expected in _FLOWS]
+
+    # Readings are timed as they were recorded, 30 seconds apart, however fast they
+    # were replayed
+    assert not coordinator.plausibility.violations
+    for i, key in enumerate(_FLOW_SENSORS):
+        watts = [expected[i] for _, expected in _FLOWS]
+        kwh = sum(a + b for a, b in zip(watts, watts[1:])) / 2 * 30 / 3600 / 1000
+        assert coordinator.flow_energy.totals[key] == pytest.approx(kwh)
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_reads_are_answered_from_the_latest_refresh(tmp_path):
+    """Test each refresh replaces the blocks it read, and other blocks can't be read."""
+    _record_capture(RegisterRecorder(tmp_path))
+    transport = ReplayTransport(read_logs(tmp_path))
+
+    assert len(transport.advance()) == len(INVERTER_BLOCKS) + len(BATTERY_BLOCKS)
+    assert (await transport.read_registers(InputRegister, 18, 1)) == {18: 1500}
+    assert len(transport.advance()) == 3
+    assert (await transport.read_registers(InputRegister, 18, 1)) == {18: 0}
+    assert (await transport.read_registers(HoldingRegister, 19, 1)) == {19: 449}
+    with pytest.raises(TransportError):
+        await transport.read_registers(InputRegister, 120, 1)
@@ -0,0 +1,79 @@
+"""Test retry policies and circuit breaking."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    async_retry,
+)
+
+
+def test_delays_back_off_with_jitter():
+    """Test delays grow exponentially up to a limit, shortened by jitter."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0, jitter=0.25)
+    for attempt, expected in enumerate((1.0, 2.0, 4.0, 8.0, 8.0)):
+        assert expected * 0.75 <= policy.delay(attempt) <= expected
+
+
+async def test_retryable_errors_are_retried():
+    """Test transient errors are retried, and the eventual result returned."""
+    func = AsyncMock(side_effect=[ConnectionError(), asyncio.TimeoutError(), 42])
+    assert await async_retry(RetryPolicy(base_delay=0), func) == 42
+    assert func.await_count == 3
+
+
+async def test_fatal_errors_are_not_retried():
+    """Test errors that can't go away on their own are raised straight away."""
+    for err in (ValueError(), CircuitOpenError()):
+        func = AsyncMock(side_effect=err)
+        with pytest.raises(type(err)):
+            await async_retry(RetryPolicy(base_delay=0), func)
+        func.assert_awaited_once()
+
+
+async def test_retries_stop_at_deadline():
+    """Test no retry is attempted once it would run past the deadline."""
+    func = AsyncMock(side_effect=ConnectionError())
+    with pytest.raises(ConnectionError):
+        await async_retry(RetryPolicy(base_delay=10, deadline=5), func)
+    func.assert_awaited_once()
+
+
+async def test_breaker_opens_and_probes():
+    """Test the breaker fails fast after repeated failures, until a probe succeeds."""
+    probe = AsyncMock(side_effect=[ConnectionError(), None])
+    breaker = CircuitBreaker(
+        "Inverter", probe, failure_threshold=2, probe_policy=RetryPolicy(base_delay=0)
+    )
+
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert probe.await_count == 2
+    assert not breaker.is_open
+    breaker.check()
+
+
+async def test_connection_shares_breaker():
+    """Test polls and writes on a connection fail fast once the inverter is down."""
+    connection = InverterConnection("127.0.0.1")
+    connection.breaker.failure_threshold = 1
+    connection.breaker.record_failure()
+    try:
+        with pytest.raises(CircuitOpenError):
+            await connection.async_read_holding_registers([])
+        with pytest.raises(CircuitOpenError):
+            await connection.async_write_registers([])
+    finally:
+        await connection.async_close()
+    assert not connection.breaker.is_open
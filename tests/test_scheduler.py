@@ -0,0 +1,74 @@
+"""Test adaptive scheduling of inverter polls."""
+from datetime import time, timedelta
+
+from custom_components.givenergy_local.scheduler import PollScheduler
+
+_MIN = timedelta(seconds=10)
+_MAX = timedelta(seconds=60)
+_NO_SLOTS = {
+    "charge_slot_1": (time(0, 0), time(0, 0)),
+    "charge_slot_2": (time(0, 0), time(0, 0)),
+    "discharge_slot_1": (time(0, 0), time(0, 0)),
+    "discharge_slot_2": (time(0, 0), time(0, 0)),
+    "enable_charge": False,
+    "enable_discharge": False,
+}
+
+
+def _data(p_pv1=0, p_pv2=0, p_battery=0, p_load_demand=300, **kwargs):
+    return {
+        **_NO_SLOTS,
+        "p_pv1": p_pv1,
+        "p_pv2": p_pv2,
+        "p_battery": p_battery,
+        "p_load_demand": p_load_demand,
+        **kwargs,
+    }
+
+
+def _scheduler(*samples):
+    scheduler = PollScheduler(_MIN, _MAX)
+    for sample in samples:
+        scheduler.record(sample)
+    return scheduler
+
+
+def test_steady_power_polls_slowly():
+    """Test the interval backs off to the maximum when nothing is changing."""
+    data = _data()
+    interval, reason = _scheduler(data, data, data).next_interval(data, time(2, 0))
+    assert interval == _MAX
+    assert reason.startswith("power steady")
+
+
+def test_volatile_power_polls_quickly():
+    """Test swinging battery power brings the interval down to the minimum."""
+    samples = [_data(p_battery=power) for power in (-2000, 1500, -1800)]
+    interval, reason = _scheduler(*samples).next_interval(samples[-1], time(12, 0))
+    assert interval == _MIN
+    assert reason.startswith("power volatile")
+
+
+def test_active_slot_and_pending_write():
+    """Test active slots cap the interval, and pending writes poll fastest."""
+    data = _data(enable_charge=True, charge_slot_1=(time(0, 30), time(4, 30)))
+    scheduler = _scheduler(data, data)
+    assert scheduler.next_interval(data, time(1, 0)) == (
+        timedelta(seconds=35),
+        "charge slot 1 active",
+    )
+    assert scheduler.next_interval(data, time(5, 0))[0] == _MAX
+    assert scheduler.next_interval(data, time(5, 0), write_pending=True) == (
+        _MIN,
+        "write pending",
+    )
+
+
+def test_slot_past_midnight():
+    """Test a slot that runs past midnight is active either side of it."""
+    data = _data(enable_charge=True, charge_slot_1=(time(23, 30), time(5, 30)))
+    scheduler = _scheduler(data, data)
+    for now in (time(23, 45), time(0, 0), time(5, 0)):
+        assert scheduler.next_interval(data, now)[1] == "charge slot 1 active"
+    assert scheduler.next_interval(data, time(5, 30))[0] == _MAX
+    assert scheduler.next_interval(data, time(12, 0))[0] == _MAX
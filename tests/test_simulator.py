@@ -0,0 +1,87 @@
+"""Test the integration against a simulated inverter."""
+from givenergy_modbus.model.register import HoldingRegister
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+import pytest
+
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+
+
+async def test_refresh(hass: HomeAssistant, simulator, simulated_connection):
+    """Test a full refresh decodes the inverter and every battery."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    snapshot = await coordinator._async_update_data()
+
+    assert snapshot.inverter["inverter_serial_number"] == "SD2223G123"
+    assert snapshot.inverter["p_pv1"] == 1500
+    assert [battery["battery_serial_number"] for battery in snapshot.batteries] == [
+        "BG3G123000",
+        "BG3G123001",
+    ]
+    # Every block, and the empty slot after the last battery
+    assert simulator.requests == 8
+
+
+async def test_zeroed_frames_are_discarded(
+    hass: HomeAssistant, simulator, simulated_connection
+):
+    """Test input registers that are unexpectedly all zero are not used."""
+    simulator.zero_rate = 1.0
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+
+async def test_discarded_frames_leave_registers_untouched(
+    hass: HomeAssistant, simulator, simulated_connection
+):
+    """Test a discarded refresh doesn't overwrite the registers of the live data."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    simulator.zero_rate = 1.0
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    assert not coordinator.plant.inverter_rc
+
+    simulator.zero_rate = 0.0
+    snapshot = await coordinator._async_update_data()
+    assert coordinator.plant.inverter_rc.temp_inverter_heatsink == 31.5
+    assert snapshot.inverter["temp_inverter_heatsink"] == 31.5
+
+
+async def test_zeroed_frames_are_held(
+    hass: HomeAssistant, simulator, simulated_connection
+):
+    """Test values read from zeroed blocks are held once there are values to hold."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    first = await coordinator._async_update_data()
+
+    simulator.zero_rate = 1.0
+    snapshot = await coordinator._async_update_data()
+    assert snapshot.inverter["temp_inverter_heatsink"] == 31.5
+    assert snapshot.inverter["p_pv1"] == first.inverter["p_pv1"]
+    assert snapshot.batteries[0]["battery_soc"] == first.batteries[0]["battery_soc"]
+    # Both the heatsink and charger temperatures were zero
+    assert coordinator.plausibility.violations["zero_temperature"] == 2
+
+
+async def test_writes_are_applied(hass: HomeAssistant, simulator, simulated_connection):
+    """Test writes through the client methods reach the inverter."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 2)
+    await simulated_connection.async_call(
+        lambda client: client.set_battery_charge_limit(30)
+    )
+
+    assert simulator.writes == [(HoldingRegister.BATTERY_CHARGE_LIMIT.value, 30)]
+    values = await coordinator.connection.async_read_holding_registers(
+        [HoldingRegister.BATTERY_CHARGE_LIMIT]
+    )
+    assert values == {HoldingRegister.BATTERY_CHARGE_LIMIT: 30}
+
+
+async def test_dropped_frames_fail_the_request(simulator, simulated_connection):
+    """Test a request the inverter never answers fails, rather than hanging."""
+    simulator.drop_rate = 1.0
+    with pytest.raises(ConnectionError):
+        await simulated_connection.async_read_holding_registers(
+            [HoldingRegister.BATTERY_CHARGE_LIMIT]
+        )
@@ -0,0 +1,55 @@
+"""Test the decoded snapshot shared by all entities."""
+from operator import itemgetter
+
+from givenergy_modbus.model.plant import Plant
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+import pytest
+from simulator import InverterSimulator
+
+from custom_components.givenergy_local.snapshot import PlantSnapshot
+
+
+def _simulated_plant(num_batteries: int) -> Plant:
+    simulator = InverterSimulator(num_batteries=num_batteries, seed=0)
+    plant = Plant(number_batteries=num_batteries)
+    # Registers the simulator has no value for are served as zero
+    plant.inverter_rc.set_registers(
+        HoldingRegister, {i: simulator.holding_registers.get(i, 0) for i in range(180)}
+    )
+    plant.inverter_rc.set_registers(
+        InputRegister, {i: simulator.input_registers.get(i, 0) for i in range(240)}
+    )
+    for battery_rc, registers in zip(plant.batteries_rcs, simulator.battery_registers):
+        battery_rc.set_registers(
+            InputRegister, {i: registers.get(i, 0) for i in range(60, 120)}
+        )
+    return plant
+
+
+def test_snapshot_matches_models():
+    """Test a snapshot decodes the same values as the givenergy_modbus models."""
+    plant = _simulated_plant(2)
+    snapshot = PlantSnapshot.from_plant(plant)
+
+    inverter = plant.inverter
+    assert dict(snapshot.inverter) == inverter.dict()
+    # Entities read values by key, rather than by model attribute
+    for key in snapshot.inverter:
+        assert itemgetter(key)(snapshot.inverter) == getattr(inverter, key)
+
+    assert len(snapshot.batteries) == 2
+    for battery_snapshot, battery in zip(snapshot.batteries, plant.batteries):
+        assert dict(battery_snapshot) == battery.dict()
+        for key in battery_snapshot:
+            assert itemgetter(key)(battery_snapshot) == getattr(battery, key)
+
+
+def test_snapshot_is_read_only():
+    """Test entities sharing a snapshot can't change its values."""
+    snapshot = PlantSnapshot.from_plant(_simulated_plant(1))
+    with pytest.raises(TypeError):
+        snapshot.inverter["p_pv1"] = 0
+    with pytest.raises(TypeError):
+        snapshot.batteries[0]["battery_soc"] = 0
+    with pytest.raises(TypeError):
+        snapshot.batteries[0] = {}
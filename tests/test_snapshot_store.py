@@ -0,0 +1,95 @@
+"""Test restoring data saved before a restart."""
+from datetime import timedelta
+
+from givenergy_modbus.model.register import InputRegister
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+from custom_components.givenergy_local.snapshot_store import SnapshotStore
+
+_KEY = "givenergy_local.snapshot.test"
+
+
+async def test_restore(hass: HomeAssistant, simulator, simulated_connection):
+    """Test data saved on shutdown is restored, and stale until refreshed."""
+    coordinator = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 2, snapshot_store=SnapshotStore(hass, _KEY)
+    )
+    saved = await coordinator._async_update_data()
+    coordinator.data = saved
+    await coordinator.async_shutdown()
+
+    restored = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 2, snapshot_store=SnapshotStore(hass, _KEY)
+    )
+    assert await restored.async_restore()
+    assert restored.stale
+    assert dict(restored.data.inverter) == dict(saved.inverter)
+    assert restored.data.batteries[1]["battery_serial_number"] == "BG3G123001"
+
+    simulator.requests = 0
+    await restored._async_update_data()
+    assert not restored.stale
+    # The restored registers don't stand in for a full refresh, or a battery probe
+    assert simulator.requests == 8
+
+
+async def test_restore_battery_count(
+    hass: HomeAssistant, simulator, simulated_connection
+):
+    """Test the batteries counted before a restart are restored, whatever configured."""
+    coordinator = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 1, snapshot_store=SnapshotStore(hass, _KEY)
+    )
+    coordinator.data = await coordinator._async_update_data()
+    await coordinator.async_shutdown()
+
+    restored = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 1, snapshot_store=SnapshotStore(hass, _KEY)
+    )
+    assert await restored.async_restore()
+    assert len(restored.data.batteries) == 2
+
+
+async def test_restore_is_checked(hass: HomeAssistant, simulated_connection):
+    """Test implausible saved data isn't restored."""
+    coordinator = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 2, snapshot_store=SnapshotStore(hass, _KEY)
+    )
+    coordinator.data = await coordinator._async_update_data()
+    coordinator.plant.inverter_rc[InputRegister.TEMP_CHARGER] = 0
+    await coordinator.async_shutdown()
+
+    restored = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 2, snapshot_store=SnapshotStore(hass, _KEY)
+    )
+    assert not await restored.async_restore()
+    assert restored.data is None
+    assert not restored.plant.inverter_rc
+    assert restored.plausibility.violations == {"zero_temperature": 1}
+
+
+async def test_snapshot_is_saved_periodically(
+    hass: HomeAssistant, hass_storage, simulated_connection
+):
+    """Test the registers behind new data are saved on an interval."""
+    coordinator = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 2, snapshot_store=SnapshotStore(hass, _KEY)
+    )
+    stop = coordinator.async_start_saving()
+    now = dt.utcnow()
+    for minute in range(10):
+        await coordinator.async_refresh()
+        async_fire_time_changed(hass, now + timedelta(minutes=minute))
+        await hass.async_block_till_done()
+    assert hass_storage[_KEY]["data"]["inverter"]
+
+    # Unchanged registers aren't saved again
+    del hass_storage[_KEY]
+    async_fire_time_changed(hass, now + timedelta(minutes=20))
+    await hass.async_block_till_done()
+    assert _KEY not in hass_storage
+    stop()
+    await coordinator.async_shutdown()
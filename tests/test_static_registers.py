@@ -0,0 +1,62 @@
+"""Test caching the static registers describing an inverter."""
+from functools import partial
+from unittest.mock import patch
+
+from givenergy_modbus.model.register import HoldingRegister
+from homeassistant.core import HomeAssistant
+
+from custom_components.givenergy_local.config_flow import read_inverter_serial
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.const import CONF_HOST, CONF_NUM_BATTERIES
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+from custom_components.givenergy_local.static_registers import StaticRegisterCache
+
+_NUM_MPPT_AND_NUM_PHASES = HoldingRegister.NUM_MPPT_AND_NUM_PHASES
+
+
+async def test_read_inverter_serial(hass: HomeAssistant, simulator):
+    """Test the config flow reads the serial number in one request, and caches it."""
+    with patch(
+        "custom_components.givenergy_local.config_flow.InverterConnection",
+        partial(InverterConnection, port=simulator.port),
+    ):
+        serial_no = await read_inverter_serial(
+            hass, {CONF_HOST: "127.0.0.1", CONF_NUM_BATTERIES: 2}
+        )
+    await hass.async_block_till_done()
+
+    assert serial_no == "SD2223G123"
+    assert simulator.requests == 1
+    static_registers = StaticRegisterCache(hass, "127.0.0.1")
+    await static_registers.async_load()
+    assert static_registers.registers[19] == simulator.holding_registers[19]
+    assert static_registers.device_values() == {
+        "inverter_serial_number": "SD2223G123",
+        "inverter_model": "Hybrid",
+        "dsp_firmware_version": simulator.holding_registers[19],
+        "arm_firmware_version": simulator.holding_registers[21],
+        "firmware_version": (
+            f"D0.{simulator.holding_registers[19]}-A0.{simulator.holding_registers[21]}"
+        ),
+    }
+
+
+async def test_static_registers_are_kept_up_to_date(
+    hass: HomeAssistant, simulator, simulated_connection
+):
+    """Test full refreshes read static registers, and keep the cache up to date."""
+    static_registers = StaticRegisterCache(hass, "127.0.0.1")
+    coordinator = GivEnergyUpdateCoordinator(
+        hass, simulated_connection, 2, static_registers=static_registers
+    )
+    await coordinator._async_update_data()
+    num_mppt_and_num_phases = simulator.holding_registers[3]
+    assert static_registers.registers[3] == num_mppt_and_num_phases
+
+    simulator.holding_registers[3] = num_mppt_and_num_phases + 1
+    coordinator.require_full_refresh = True
+    await coordinator._async_update_data()
+    assert coordinator.plant.inverter_rc[_NUM_MPPT_AND_NUM_PHASES] == (
+        num_mppt_and_num_phases + 1
+    )
+    assert static_registers.registers[3] == num_mppt_and_num_phases + 1
@@ -0,0 +1,148 @@
+"""Test the asyncio Modbus transport against a minimal fake inverter."""
+import asyncio
+import struct
+
+from givenergy_modbus.decoder import GivEnergyRequestDecoder
+from givenergy_modbus.model.register import HoldingRegister, InputRegister
+from givenergy_modbus.pdu import (
+    ReadInputRegistersRequest,
+    ReadInputRegistersResponse,
+    WriteHoldingRegisterRequest,
+    WriteHoldingRegisterResponse,
+)
+import pytest
+
+from custom_components.givenergy_local.transport import ModbusTransport, RequestTimeout
+
+_HEAD = struct.Struct(">HHHBB")
+
+
+def _frame(pdu: bytes) -> bytes:
+    return _HEAD.pack(0x5959, 1, len(pdu) + 2, 1, 2) + pdu
+
+
+async def _serve(handler):
+    """Start a fake inverter on localhost, returning the server and its port."""
+
+    async def on_connect(reader, writer):
+        decoder = GivEnergyRequestDecoder()
+        try:
+            while True:
+                header = await reader.readexactly(_HEAD.size)
+                length = _HEAD.unpack(header)[2]
+                body = await reader.readexactly(length - 2)
+                for response in await handler(decoder.decode(b"\x02" + body)):
+                    writer.write(_frame(response.encode()))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    server = await asyncio.start_server(on_connect, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_read_registers_skips_stale_responses():
+    """Test a late response to an earlier request is ignored."""
+
+    async def handler(request):
+        assert isinstance(request, ReadInputRegistersRequest)
+        return [
+            ReadInputRegistersResponse(
+                base_register=180,
+                register_count=request.register_count,
+                register_values=[0] * request.register_count,
+                slave_address=request.slave_address,
+            ),
+            ReadInputRegistersResponse(
+                base_register=request.base_register,
+                register_count=request.register_count,
+                register_values=list(range(request.register_count)),
+                slave_address=request.slave_address,
+            ),
+        ]
+
+    server, port = await _serve(handler)
+    transport = ModbusTransport("127.0.0.1", port)
+    try:
+        values = await transport.read_registers(InputRegister, 60, 60)
+        assert values == {60 + i: i for i in range(60)}
+        assert transport.connected
+    finally:
+        transport.close()
+        server.close()
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_write_register_checks_echoed_value():
+    """Test a write is rejected when the inverter echoes a different value."""
+
+    async def handler(request):
+        assert isinstance(request, WriteHoldingRegisterRequest)
+        return [
+            WriteHoldingRegisterResponse(
+                register=request.register, value=request.value + 1
+            )
+        ]
+
+    server, port = await _serve(handler)
+    transport = ModbusTransport("127.0.0.1", port)
+    try:
+        with pytest.raises(AssertionError):
+            await transport.write_register(HoldingRegister.BATTERY_SOC_RESERVE, 4)
+    finally:
+        transport.close()
+        server.close()
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_unanswered_request_keeps_connection():
+    """Test a request that is never answered times out, but the connection is kept."""
+    answered = []
+
+    async def handler(request):
+        answered.append(bool(answered))
+        if not answered[-1]:
+            return []
+        return [
+            ReadInputRegistersResponse(
+                base_register=request.base_register,
+                register_count=request.register_count,
+                register_values=[1] * request.register_count,
+                slave_address=request.slave_address,
+            )
+        ]
+
+    server, port = await _serve(handler)
+    transport = ModbusTransport("127.0.0.1", port)
+    try:
+        with pytest.raises(RequestTimeout):
+            await transport.read_registers(InputRegister, 0, 60, timeout=0.1)
+        assert transport.connected
+        assert (await transport.read_registers(InputRegister, 0, 60))[0] == 1
+    finally:
+        transport.close()
+        server.close()
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_timeout_within_frame_closes_connection():
+    """Test a response cut off partway through drops the connection."""
+
+    async def on_connect(reader, writer):
+        await reader.readexactly(_HEAD.size)
+        # Only the header of a response ever arrives
+        writer.write(_HEAD.pack(0x5959, 1, 100, 1, 2))
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(on_connect, "127.0.0.1", 0)
+    transport = ModbusTransport("127.0.0.1", server.sockets[0].getsockname()[1])
+    try:
+        with pytest.raises(RequestTimeout):
+            await transport.read_registers(InputRegister, 0, 60, timeout=0.1)
+        assert not transport.connected
+    finally:
+        transport.close()
+        server.close()
@@ -0,0 +1,160 @@
+"""Test coalescing of register writes."""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from givenergy_modbus.model.register import HoldingRegister
+from homeassistant.core import HomeAssistant
+import pytest
+
+from custom_components.givenergy_local.connection import InverterConnection
+from custom_components.givenergy_local.coordinator import GivEnergyUpdateCoordinator
+from custom_components.givenergy_local.plausibility import (
+    INVERTER_RULES,
+    PlausibilityResult,
+)
+from custom_components.givenergy_local.retry import RetryPolicy
+
+
+@pytest.fixture(autouse=True)
+def no_delays(monkeypatch):
+    """Don't wait around between writes in tests."""
+    monkeypatch.setattr(
+        "custom_components.givenergy_local.write_queue._COALESCE_WINDOW", 0
+    )
+    monkeypatch.setattr(
+        "custom_components.givenergy_local.write_queue._RETRY_POLICY",
+        RetryPolicy(base_delay=0),
+    )
+
+
+async def test_writes_are_merged(hass: HomeAssistant):
+    """Test writes made together share a session, and superseded writes are dropped."""
+    coordinator = GivEnergyUpdateCoordinator(hass, InverterConnection("host"), 0)
+    read_back = {
+        HoldingRegister.BATTERY_DISCHARGE_LIMIT: 12,
+        HoldingRegister.BATTERY_CHARGE_LIMIT: 20,
+    }
+    with patch.object(
+        coordinator.connection, "async_write_registers", AsyncMock()
+    ) as write, patch.object(
+        coordinator.connection,
+        "async_read_holding_registers",
+        AsyncMock(return_value=read_back),
+    ) as read:
+        await asyncio.gather(
+            coordinator.write_queue.async_call(
+                lambda client: client.set_battery_charge_limit(10)
+            ),
+            coordinator.write_queue.async_call(
+                lambda client: client.set_battery_discharge_limit(12)
+            ),
+            coordinator.write_queue.async_call(
+                lambda client: client.set_battery_charge_limit(20)
+            ),
+        )
+
+    write.assert_awaited_once()
+    assert write.await_args.args[0] == [
+        (HoldingRegister.BATTERY_DISCHARGE_LIMIT, 12),
+        (HoldingRegister.BATTERY_CHARGE_LIMIT, 20),
+    ]
+    read.assert_awaited_once()
+    assert set(read.await_args.args[0]) == set(read_back)
+    assert coordinator.plant.inverter_rc[HoldingRegister.BATTERY_CHARGE_LIMIT] == 20
+    assert not coordinator.write_queue.pending
+
+
+async def test_failures_are_reported_to_each_caller(hass: HomeAssistant):
+    """Test only callers whose registers couldn't be written see an error."""
+    coordinator = GivEnergyUpdateCoordinator(hass, InverterConnection("host"), 0)
+
+    async def write_registers(writes, on_written):
+        for register, value in writes:
+            if register == HoldingRegister.BATTERY_DISCHARGE_MIN_POWER_RESERVE:
+                raise ConnectionError("Dropped")
+            on_written(register, value)
+
+    # The charge limit write is echoed correctly, but doesn't stick
+    read_back = {
+        HoldingRegister.BATTERY_DISCHARGE_LIMIT: 10,
+        HoldingRegister.BATTERY_CHARGE_LIMIT: 9,
+    }
+    with patch.object(
+        coordinator.connection, "async_write_registers", write_registers
+    ), patch.object(
+        coordinator.connection,
+        "async_read_holding_registers",
+        AsyncMock(return_value=read_back),
+    ):
+        results = await asyncio.gather(
+            coordinator.write_queue.async_call(
+                lambda client: client.set_battery_discharge_limit(10)
+            ),
+            coordinator.write_queue.async_call(
+                lambda client: client.set_battery_charge_limit(10)
+            ),
+            coordinator.write_queue.async_call(
+                lambda client: client.set_battery_power_reserve(20)
+            ),
+            return_exceptions=True,
+        )
+
+    assert results[0] is True
+    assert isinstance(results[1], AssertionError)
+    assert isinstance(results[2], ConnectionError)
+
+
+async def test_unchanged_registers_are_skipped(hass: HomeAssistant):
+    """Test registers recently read with the requested value aren't written."""
+    coordinator = GivEnergyUpdateCoordinator(hass, InverterConnection("host"), 0)
+    coordinator.async_update_holding_registers(
+        {HoldingRegister.BATTERY_CHARGE_LIMIT: 20}
+    )
+    with patch.object(
+        coordinator.connection, "async_write_registers", AsyncMock()
+    ) as write, patch.object(
+        coordinator.connection,
+        "async_read_holding_registers",
+        AsyncMock(return_value={HoldingRegister.BATTERY_CHARGE_LIMIT: 20}),
+    ):
+        assert not await coordinator.write_queue.async_call(
+            lambda client: client.set_battery_charge_limit(20)
+        )
+        write.assert_not_awaited()
+
+        assert await coordinator.write_queue.async_call(
+            lambda client: client.set_battery_charge_limit(20), force=True
+        )
+        write.assert_awaited_once()
+
+
+async def test_implausible_read_back_refreshes(
+    hass: HomeAssistant, simulated_connection
+):
+    """Test a full refresh is requested when the values read back are rejected."""
+    coordinator = GivEnergyUpdateCoordinator(hass, simulated_connection, 0)
+    coordinator.data = data = await coordinator._async_update_data()
+    charge_limit = coordinator.plant.inverter_rc[HoldingRegister.BATTERY_CHARGE_LIMIT]
+    with patch.object(
+        coordinator.connection, "async_write_registers", AsyncMock()
+    ), patch.object(
+        coordinator.connection,
+        "async_read_holding_registers",
+        AsyncMock(return_value={HoldingRegister.BATTERY_CHARGE_LIMIT: 10}),
+    ), patch.object(
+        coordinator.plausibility,
+        "check",
+        return_value=PlausibilityResult(data, INVERTER_RULES[0]),
+    ), patch.object(
+        coordinator, "async_request_full_refresh", AsyncMock()
+    ) as refresh:
+        assert await coordinator.write_queue.async_call(
+            lambda client: client.set_battery_charge_limit(10)
+        )
+
+    refresh.assert_awaited_once()
+    assert coordinator.data is data
+    assert (
+        coordinator.plant.inverter_rc[HoldingRegister.BATTERY_CHARGE_LIMIT]
+        == charge_limit
+    )